@@ -23,5 +23,24 @@ OPTS = {"openstack": [
     cfg.IntOpt("cleanup_threads",
                default=20,
                deprecated_group="cleanup",
-               help="Number of cleanup threads to run")
+               help="Number of cleanup threads to run"),
+    cfg.IntOpt("cleanup_managers_concurrency",
+               default=1,
+               min=1,
+               help="Number of resource managers to perform cleanup for "
+                    "simultaneously. Resource managers that depend on each "
+                    "other are never run at the same time."),
+    cfg.IntOpt("cleanup_list_page_size",
+               default=1000,
+               help="The number of resources to fetch by one list request "
+                    "while searching for resources to cleanup. It is used "
+                    "only by resource managers which support pagination."),
+    cfg.BoolOpt("cleanup_journal",
+                default=False,
+                help="Record ids of created resources to a journal of the "
+                     "task, so they can be removed by the cleanup of the "
+                     "environment even if the task process died."),
+    cfg.StrOpt("cleanup_journal_dir",
+               default="~/.rally/openstack/cleanup_journal",
+               help="Directory to store cleanup journals of tasks.")
 ]}
@@ -48,5 +48,28 @@ OPTS = {"openstack": [
                  default=1.0,
                  deprecated_group="benchmark",
                  help="Interval between checks when waiting for image "
-                      "creation.")
+                      "creation."),
+    cfg.StrOpt("glance_image_cache_dir",
+               default="~/.rally/openstack/image_cache",
+               help="Directory where images context stores local copies of "
+                    "remote images before uploading them to Glance."),
+    cfg.IntOpt("glance_image_cache_ttl",
+               default=24 * 60 * 60,
+               min=0,
+               help="Time in seconds after which a cached image without the "
+                    "expected checksum is downloaded again."),
+    cfg.IntOpt("glance_image_cache_size",
+               default=10240,
+               min=1,
+               help="Maximum size of the local image cache in MiB. Least "
+                    "recently used images are removed over the limit."),
+    cfg.FloatOpt("glance_image_cache_connect_timeout",
+                 default=10.0,
+                 help="Timeout in seconds to connect to the server of a "
+                      "remote image which is downloaded to the local "
+                      "cache."),
+    cfg.FloatOpt("glance_image_cache_read_timeout",
+                 default=60.0,
+                 help="Timeout in seconds to wait for the next chunk of a "
+                      "remote image which is downloaded to the local cache.")
 ]}
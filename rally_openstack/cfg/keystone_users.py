@@ -35,5 +35,16 @@ OPTS = {"openstack": [
                default="member",
                deprecated_group="users_context",
                help="The default role name of the keystone to assign to "
-                    "users.")
+                    "users."),
+    cfg.StrOpt("users_pool_dir",
+               default="~/.rally/openstack/users_pool",
+               help="Directory to store pools of rally-owned tenants and "
+                    "users, which are used by the users context in pooled "
+                    "mode. Only IDs and names are stored there, passwords "
+                    "of users are reset whenever they are leased."),
+    cfg.IntOpt("users_pool_lease_timeout",
+               default=86400,
+               help="Time in seconds after which a lease of pooled tenant "
+                    "is considered as stale and the tenant can be taken by "
+                    "another task.")
 ]}
@@ -28,5 +28,11 @@ OPTS = {"openstack": [
                 default=False,
                 help="Whether Neutron API is older then OpenStack Newton or "
                      "not. Based in this option, some external fields for "
-                     "identifying resources can be applied.")
+                     "identifying resources can be applied."),
+    cfg.IntOpt("neutron_capabilities_cache_ttl",
+               default=300,
+               help="Time in seconds for which the list of Neutron "
+                    "extensions of a cloud and the list of external "
+                    "networks of a project are cached (0 disables the "
+                    "cache).")
 ]}
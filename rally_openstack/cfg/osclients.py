@@ -22,5 +22,40 @@ OPTS = {
             "openstack_client_http_timeout",
             default=180.0,
             help="HTTP timeout for any of OpenStack service in seconds")
+    ],
+    "openstack": [
+        cfg.BoolOpt(
+            "share_keystone_auth",
+            default=False,
+            help="Share keystone tokens and service catalogs between all "
+                 "clients of the same credential within the process"),
+        cfg.IntOpt(
+            "keystone_token_refresh_ahead",
+            default=300,
+            help="Refresh keystone token if it expires within the given "
+                 "amount of seconds"),
+        cfg.BoolOpt(
+            "share_http_connection_pool",
+            default=False,
+            help="Share HTTP connection pools of endpoint hosts between "
+                 "all clients instead of creating new pools for each "
+                 "credential"),
+        cfg.IntOpt(
+            "http_pool_maxsize",
+            default=100,
+            help="Max number of connections to keep in a pool of one "
+                 "endpoint host, if share_http_connection_pool is enabled"),
+        cfg.BoolOpt(
+            "http_tcp_keepalive",
+            default=True,
+            help="Enable TCP keep-alive for connections of the shared pool, "
+                 "if share_http_connection_pool is enabled"),
+        cfg.BoolOpt(
+            "trace_http_requests",
+            default=False,
+            help="Record method, service type, url, status, latency and size "
+                 "of every HTTP request made by clients in scenarios. The "
+                 "requests are nested into atomic actions and their latency "
+                 "statistics per endpoint are added to the scenario output")
     ]
 }
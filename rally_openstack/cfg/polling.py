@@ -0,0 +1,36 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+from rally.common import cfg
+
+OPTS = {"openstack": [
+    cfg.BoolOpt("adaptive_polling",
+                default=False,
+                help="Poll statuses of resources with exponential backoff "
+                     "and poll more often around the time in which earlier "
+                     "resources of the same kind became ready, instead of "
+                     "using fixed poll intervals. Poll intervals of "
+                     "resources become the upper bound of the backoff. "
+                     "Number of polls and wasted wait of every atomic "
+                     "action are added to the scenario output."),
+    cfg.FloatOpt("adaptive_polling_min_interval",
+                 default=0.2,
+                 help="The smallest interval in seconds between polls of a "
+                      "resource, if adaptive_polling is enabled."),
+    cfg.IntOpt("adaptive_polling_history_size",
+               default=50,
+               help="Number of the latest waits for resources of the same "
+                    "kind used to predict when a resource becomes ready, if "
+                    "adaptive_polling is enabled.")
+]}
@@ -15,9 +15,11 @@
 
 
 from rally.common import cfg
+from rally.common import logging
 from rally.task import utils
 
 CONF = cfg.CONF
+LOG = logging.getLogger(__name__)
 
 cleanup_group = cfg.OptGroup(name="cleanup", title="Cleanup Options")
 
@@ -41,7 +43,8 @@ class NoName(object):
 def resource(service, resource, order=0, admin_required=False,
              perform_for_admin_only=False, tenant_resource=False,
              max_attempts=3, timeout=CONF.openstack.resource_deletion_timeout,
-             interval=1, threads=CONF.openstack.cleanup_threads):
+             interval=1, threads=CONF.openstack.cleanup_threads,
+             bulk_deletion_check=False, depends_on=None):
     """Decorator that overrides resource specification.
 
     Just put it on top of your resource class and specify arguments that you
@@ -61,6 +64,16 @@ def resource(service, resource, order=0, admin_required=False,
     :param interval: Resource status pooling interval
     :param threads: Amount of threads (workers) that are deleting resources
                     simultaneously
+    :param bulk_deletion_check: Confirm deletion of all resources of one
+                                tenant with a single list() call per poll
+                                cycle instead of polling is_deleted() of
+                                each resource
+    :param depends_on: List of names in format <service> or
+                       <service>.<resource> of resource managers which
+                       should finish cleanup before this one starts. "*"
+                       means all resource managers of other services.
+                       Resource managers of the same service are always
+                       cleaned up one by one in order of `order` value
     """
 
     def inner(cls):
@@ -75,6 +88,8 @@ def resource(service, resource, order=0, admin_required=False,
         cls._interval = interval
         cls._threads = threads
         cls._tenant_resource = tenant_resource
+        cls._bulk_deletion_check = bulk_deletion_check
+        cls._depends_on = tuple(depends_on or ())
 
         return cls
 
@@ -92,11 +107,16 @@ class ResourceManager(object):
     list() and is_deleted() methods to make them fit to your case.
     """
 
-    def __init__(self, resource=None, admin=None, user=None, tenant_uuid=None):
+    def __init__(self, resource=None, admin=None, user=None, tenant_uuid=None,
+                 name_prefix=None):
         self.admin = admin
         self.user = user
         self.raw_resource = resource
         self.tenant_uuid = tenant_uuid
+        # NOTE: names of all resources which should be cleaned up start
+        #   with this prefix, so list() can use it to filter resources
+        #   on server side where the API supports it.
+        self.name_prefix = name_prefix
 
     def _manager(self):
         client = self._admin_required and self.admin or self.user
@@ -128,6 +148,64 @@ class ResourceManager(object):
         """Delete resource that corresponds to instance of this class."""
         self._manager().delete(self.id())
 
+    def get_resource(self, resource_id):
+        """Fetch raw resource by its id."""
+        return self._manager().get(resource_id)
+
     def list(self):
         """List all resources specific for admin or user."""
         return self._manager().list()
+
+    def _paginate(self, list_method, search_opts=None, marker_attr="id"):
+        """Iterate over resources fetching them page by page.
+
+        :param list_method: a method of client which supports limit and
+            marker arguments
+        :param search_opts: server side filters. If the first request with
+            them fails, listing is restarted without filters, since
+            resources are filtered on client side anyway
+        :param marker_attr: an attribute of resource to use as a marker
+        """
+        limit = CONF.openstack.cleanup_list_page_size
+        marker = None
+        while True:
+            try:
+                page = list_method(search_opts=search_opts, limit=limit,
+                                   marker=marker)
+            except Exception as e:
+                if marker is not None or not search_opts:
+                    raise
+                LOG.debug("Failed to list %s.%s with filters %s, listing "
+                          "all of them: %s" % (self._service, self._resource,
+                                               search_opts, e))
+                search_opts = None
+                continue
+            if not page:
+                break
+            for resource in page:
+                yield resource
+            # NOTE: a page can be shorter than the limit if the limit is
+            #   bigger than the maximum page size of the service, so pages
+            #   are fetched until an empty one.
+            new_marker = getattr(page[-1], marker_attr)
+            if new_marker == marker:
+                break
+            marker = new_marker
+
+    def list_ids(self):
+        """Returns a set of ids of resources which are not deleted yet.
+
+        It is used for bulk deletion checks (see `bulk_deletion_check`
+        argument of @resource decorator), so all resources of one tenant can
+        be checked with a single list() call.
+        """
+        ids = set()
+        for raw_resource in self.list():
+            if utils.get_status(raw_resource) in ("DELETED",
+                                                  "DELETE_COMPLETE"):
+                continue
+            manager = self.__class__(resource=raw_resource, admin=self.admin,
+                                     user=self.user,
+                                     tenant_uuid=self.tenant_uuid)
+            ids.add(manager.id())
+        return ids
@@ -0,0 +1,155 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Append-only journal of resources created by tasks.
+
+Every task has its own journal file with one json record per line. Records
+are appended with a single write call to a file opened in append mode, so
+scenario runner processes and threads can share the same journal.
+"""
+
+import functools
+import json
+import os
+
+from rally.common import cfg
+from rally.common import logging
+
+
+LOG = logging.getLogger(__name__)
+
+CONF = cfg.CONF
+
+
+def _get_path(task_uuid):
+    journal_dir = os.path.expanduser(CONF.openstack.cleanup_journal_dir)
+    return os.path.join(journal_dir, "%s.jsonl" % task_uuid)
+
+
+def _get_context(obj):
+    # NOTE: services do not have a context, but their name generator is
+    #   usually a method of scenario or context object.
+    if hasattr(obj, "_name_generator"):
+        obj = getattr(obj._name_generator, "__self__", None)
+    return getattr(obj, "context", None) or {}
+
+
+def _get_id(raw_resource):
+    if isinstance(raw_resource, dict):
+        if "id" not in raw_resource and len(raw_resource) == 1:
+            # neutron-like {"network": {...}} response
+            raw_resource = list(raw_resource.values())[0]
+        return raw_resource["id"]
+    return raw_resource.id
+
+
+def record(obj, resource, raw_resource):
+    """Append a created resource to the journal of the current task.
+
+    :param obj: scenario, context or service object which created resource
+    :param resource: name of resource in format <service>.<resource> of
+        the cleanup resource manager
+    :param raw_resource: the created resource
+    """
+    context = _get_context(obj)
+    task_uuid = context.get("task", {}).get("uuid")
+    if not task_uuid:
+        return
+    entry = {"resource": resource,
+             "id": _get_id(raw_resource),
+             "tenant_id": context.get("tenant", {}).get("id")}
+    path = _get_path(task_uuid)
+    journal_dir = os.path.dirname(path)
+    if not os.path.exists(journal_dir):
+        try:
+            os.makedirs(journal_dir)
+        except OSError:
+            # created by another thread in the meantime
+            pass
+    _append(path, [entry])
+
+
+def _append(path, entries):
+    with open(path, "a") as f:
+        f.write("".join("%s\n" % json.dumps(e) for e in entries))
+
+
+def forget(task_uuid, resource, ids):
+    """Exclude resources from the journal of the task.
+
+    Forgotten resources are not returned by `read()`, so they are not
+    deleted by the cleanup, e.g. tenants and users added to the users pool.
+
+    :param task_uuid: The UUID of task
+    :param resource: name of resource in format <service>.<resource> of
+        the cleanup resource manager
+    :param ids: ids of resources to forget
+    """
+    path = _get_path(task_uuid)
+    if ids and os.path.exists(path):
+        _append(path, [{"resource": resource, "id": id_, "forget": True}
+                       for id_ in ids])
+
+
+def journaled(resource):
+    """Record resources returned by the decorated method to the journal.
+
+    :param resource: name of resource in format <service>.<resource> of
+        the cleanup resource manager
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            result = func(self, *args, **kwargs)
+            if CONF.openstack.cleanup_journal:
+                raw_resources = (result if isinstance(result, list)
+                                 else [result])
+                for raw_resource in raw_resources:
+                    try:
+                        record(self, resource, raw_resource)
+                    except Exception as e:
+                        LOG.warning("Failed to record %s to the cleanup "
+                                    "journal: %s" % (resource, e))
+            return result
+        return wrapper
+    return decorator
+
+
+def read(task_uuid):
+    """Returns all records of the journal of the task."""
+    path = _get_path(task_uuid)
+    if not os.path.exists(path):
+        return []
+    entries = []
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    # the last record can be incomplete if the process died
+                    LOG.warning("Skipping broken record of cleanup journal "
+                                "%s: %s" % (path, line))
+    forgotten = set((e["resource"], e["id"]) for e in entries
+                    if e.get("forget"))
+    return [e for e in entries if not e.get("forget")
+            and (e["resource"], e["id"]) not in forgotten]
+
+
+def remove(task_uuid):
+    """Remove the journal of the task."""
+    path = _get_path(task_uuid)
+    if os.path.exists(path):
+        os.remove(path)
@@ -13,16 +13,22 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import os
+import threading
 import time
 
 from rally.common import broker
+from rally.common import cfg
 from rally.common import logging
 from rally.common.plugin import discover
 from rally.common.plugin import plugin
 from rally.common import utils as rutils
+from rally import exceptions
 from rally_openstack.cleanup import base
+from rally_openstack.cleanup import journal
 
 
+CONF = cfg.CONF
 LOG = logging.getLogger(__name__)
 
 
@@ -50,6 +56,24 @@ class SeekAndDestroy(object):
         self.resource_classes = resource_classes or [
             rutils.RandomNameGeneratorMixin]
         self.task_id = task_id
+        try:
+            self.name_prefix = get_name_prefix(self.resource_classes,
+                                               task_id)
+        except Exception as e:
+            # NOTE: the prefix is used only to narrow down listing of
+            #   resources, so cleanup can be done without it.
+            LOG.debug("Failed to find a common prefix of resource names: "
+                      "%s" % e)
+            self.name_prefix = None
+        # resources which deletion is requested, but is not confirmed yet by
+        # bulk deletion check, with deadlines of the check. Grouped by tenant
+        # uuid.
+        self._pending = {}
+        self._pending_lock = threading.Lock()
+
+    @property
+    def _bulk_deletion_check(self):
+        return getattr(self.manager_cls, "_bulk_deletion_check", False)
 
     def _get_cached_client(self, user):
         """Simplifies initialization and caching OpenStack clients."""
@@ -66,6 +90,10 @@ class SeekAndDestroy(object):
 
         Writes in LOG warning with UUID of resource that wasn't deleted
 
+        In case of resource managers with enabled bulk deletion check,
+        resource is not polled here, but is added to pending resources
+        which are checked by _wait_for_bulk_deletion.
+
         :param resource: instance of resource manager initiated with resource
                          that should be deleted.
         """
@@ -92,6 +120,14 @@ class SeekAndDestroy(object):
             else:
                 LOG.warning("%(msg)s Reason: %(e)s" % {"msg": msg, "e": e})
         else:
+            if self._bulk_deletion_check:
+                with self._pending_lock:
+                    pending = self._pending.setdefault(resource.tenant_uuid,
+                                                       {})
+                    pending[resource.id()] = (
+                        resource, time.time() + resource._timeout)
+                return
+
             started = time.time()
             failures_count = 0
             while time.time() - started < resource._timeout:
@@ -116,6 +152,61 @@ class SeekAndDestroy(object):
             LOG.warning("Resource deletion failed, timeout occurred for "
                         "%(service)s.%(resource)s: %(uuid)s." % msg_kw)
 
+    @staticmethod
+    def _is_deleted(resource):
+        """Checks deletion of the resource, it is pending if check fails."""
+        try:
+            return resource.is_deleted()
+        except Exception:
+            LOG.exception(
+                "Seems like %s.%s.is_deleted(self) method is broken "
+                "It shouldn't raise any exceptions."
+                % (resource.__module__, type(resource).__name__))
+            return False
+
+    def _wait_for_bulk_deletion(self):
+        """Wait until all pending resources are deleted.
+
+        Instead of fetching every single resource, one list() call per tenant
+        is made on each poll cycle and its result is compared with ids of
+        pending resources. If list() fails, is_deleted() of every pending
+        resource of the tenant is used as a fallback. Every resource is
+        awaited for its own timeout since its deletion was requested.
+
+        Writes in LOG warning with UUID of resources that weren't deleted
+        """
+        while self._pending:
+            for tenant_uuid, pending in list(self._pending.items()):
+                resource = next(iter(pending.values()))[0]
+                try:
+                    existing = resource.list_ids()
+                except Exception:
+                    LOG.exception(
+                        "Seems like %s.%s.list_ids(self) method is broken. "
+                        "Falling back to checking resources one by one."
+                        % (resource.__module__, type(resource).__name__))
+                    existing = set(res_id
+                                   for res_id, (res, deadline)
+                                   in pending.items()
+                                   if not self._is_deleted(res))
+                now = time.time()
+                for res_id, (res, deadline) in list(pending.items()):
+                    if res_id not in existing:
+                        pending.pop(res_id)
+                    elif now >= deadline:
+                        pending.pop(res_id)
+                        LOG.warning(
+                            "Resource deletion failed, timeout occurred for "
+                            "%(service)s.%(resource)s: %(uuid)s."
+                            % {"uuid": res_id, "service": res._service,
+                               "resource": res._resource})
+                if not pending:
+                    self._pending.pop(tenant_uuid)
+
+            if not self._pending:
+                break
+            rutils.interruptable_sleep(self.manager_cls._interval)
+
     def _publisher(self, queue):
         """Publisher for deletion jobs.
 
@@ -141,7 +232,8 @@ class SeekAndDestroy(object):
         if self.admin and (not self.users
                            or self.manager_cls._perform_for_admin_only):
             manager = self.manager_cls(
-                admin=self._get_cached_client(self.admin))
+                admin=self._get_cached_client(self.admin),
+                name_prefix=self.name_prefix)
             _publish(self.admin, None, manager)
 
         else:
@@ -156,7 +248,8 @@ class SeekAndDestroy(object):
                 manager = self.manager_cls(
                     admin=admin_client,
                     user=self._get_cached_client(user),
-                    tenant_uuid=user["tenant_id"])
+                    tenant_uuid=user["tenant_id"],
+                    name_prefix=self.name_prefix)
                 _publish(self.admin, user, manager)
 
     def _consumer(self, cache, args):
@@ -167,7 +260,8 @@ class SeekAndDestroy(object):
             resource=raw_resource,
             admin=self._get_cached_client(admin),
             user=self._get_cached_client(user),
-            tenant_uuid=user and user["tenant_id"])
+            tenant_uuid=user and user["tenant_id"],
+            name_prefix=self.name_prefix)
 
         if (isinstance(manager.name(), base.NoName) or
                 rutils.name_matches_object(
@@ -180,6 +274,32 @@ class SeekAndDestroy(object):
 
         broker.run(self._publisher, self._consumer,
                    consumers_count=self.manager_cls._threads)
+        if self._pending:
+            self._wait_for_bulk_deletion()
+
+
+def get_name_prefix(resource_classes, task_id=None):
+    """Returns a prefix which names of all given resource classes start with.
+
+    :param resource_classes: Resource classes to match resource names against
+    :param task_id: The UUID of task to match resource names against
+    :returns: the longest common prefix of names or None if there is no
+        such prefix or if names of some classes do not follow the
+        RandomNameGeneratorMixin format
+    """
+    prefixes = []
+    for cls in resource_classes:
+        match = rutils.RandomNameGeneratorMixin._resource_name_placeholder_re\
+            .match(cls._get_resource_name_format())
+        if match is None:
+            return None
+        parts = match.groupdict()
+        prefix = parts["prefix"]
+        if task_id:
+            prefix += cls._generate_task_id_part(task_id, len(parts["task"]))
+            prefix += parts["sep"]
+        prefixes.append(prefix)
+    return os.path.commonprefix(prefixes) or None
 
 
 def list_resource_names(admin_required=None):
@@ -239,6 +359,92 @@ def find_resource_managers(names=None, admin_required=None):
     return resource_managers
 
 
+def get_dependencies(resource_managers):
+    """Returns resource managers which should be cleaned up before each one.
+
+    Resource managers of the same service depend on the previous resource
+    manager of this service (in order of `_order` value). Other
+    dependencies are taken from `_depends_on` attribute.
+
+    :param resource_managers: List of resource managers sorted by `_order`
+    :returns: dict where keys are resource managers and values are sets of
+              resource managers they depend on
+    """
+    dependencies = {}
+    last_of_service = {}
+    for mgr in resource_managers:
+        depends_on = set(mgr._depends_on)
+        required = set()
+        if mgr._service in last_of_service:
+            required.add(last_of_service[mgr._service])
+        for other in resource_managers:
+            if other._service == mgr._service:
+                continue
+            if ("*" in depends_on or other._service in depends_on
+                    or "%s.%s" % (other._service,
+                                  other._resource) in depends_on):
+                required.add(other)
+        dependencies[mgr] = required
+        last_of_service[mgr._service] = mgr
+    return dependencies
+
+
+def run_with_dependencies(resource_managers, func, concurrency=1):
+    """Call func for each resource manager respecting their dependencies.
+
+    Resource managers which do not depend on each other are processed
+    simultaneously, but no more than `concurrency` at the same time.
+
+    :param resource_managers: List of resource managers sorted by `_order`
+    :param func: Function that accepts resource manager as a single argument
+    :param concurrency: Max amount of resource managers to process
+                        simultaneously
+    """
+    concurrency = max(concurrency, 1)
+    dependencies = get_dependencies(resource_managers)
+    pending = list(resource_managers)
+    finished = set()
+    running = set()
+    errors = []
+    condition = threading.Condition()
+
+    def worker(mgr):
+        try:
+            func(mgr)
+        except Exception as e:
+            errors.append(e)
+        finally:
+            with condition:
+                running.discard(mgr)
+                finished.add(mgr)
+                condition.notify_all()
+
+    with condition:
+        while pending and not errors:
+            ready = [mgr for mgr in pending
+                     if dependencies[mgr].issubset(finished)]
+            if not ready and not running:
+                # dependencies of the rest resource managers are circular,
+                # so let's process them one by one
+                LOG.warning("Circular dependencies are found between "
+                            "resource managers: %s" % ", ".join(
+                                "%s.%s" % (mgr._service, mgr._resource)
+                                for mgr in pending))
+                ready = pending[:1]
+            for mgr in ready[:max(concurrency - len(running), 0)]:
+                pending.remove(mgr)
+                running.add(mgr)
+                thread = threading.Thread(target=worker, args=(mgr,))
+                thread.daemon = True
+                thread.start()
+            condition.wait()
+        while running:
+            condition.wait()
+
+    if errors:
+        raise errors[0]
+
+
 def cleanup(names=None, admin_required=None, admin=None, users=None,
             api_versions=None, superclass=plugin.Plugin, task_id=None):
     """Generic cleaner.
@@ -280,7 +486,8 @@ def cleanup(names=None, admin_required=None, admin=None, users=None,
     if not resource_classes and issubclass(superclass,
                                            rutils.RandomNameGeneratorMixin):
         resource_classes.append(superclass)
-    for manager in find_resource_managers(names, admin_required):
+
+    def exterminate(manager):
         LOG.debug("Cleaning up %(service)s %(resource)s objects"
                   % {"service": manager._service,
                      "resource": manager._resource})
@@ -288,3 +495,103 @@ def cleanup(names=None, admin_required=None, admin=None, users=None,
                        api_versions=api_versions,
                        resource_classes=resource_classes,
                        task_id=task_id).exterminate()
+
+    run_with_dependencies(
+        find_resource_managers(names, admin_required), exterminate,
+        concurrency=CONF.openstack.cleanup_managers_concurrency)
+
+
+def _is_not_found(e):
+    # NOTE: rally services raise their own exceptions instead of 404 errors
+    #   of clients.
+    return (isinstance(e, (exceptions.GetResourceNotFound,
+                           exceptions.NotFoundException))
+            or getattr(e, "code", getattr(e, "http_status", 400)) == 404)
+
+
+def cleanup_by_journal(task_uuid, admin):
+    """Delete resources recorded to the cleanup journal of the task.
+
+    Unlike cleanup(), it doesn't scan the cloud for resources with matching
+    names: every recorded resource is fetched by its id and deleted using
+    admin credentials. Resource managers are processed in order of their
+    `order` value. The journal is removed if all resources are deleted.
+
+    :param task_uuid: The UUID of task
+    :param admin: admin credential like in context["admin"]
+    :returns: a dict with cleanup statistics in the format expected from
+        cleanup() method of rally platform plugins
+    """
+    result = {"discovered": 0, "deleted": 0, "failed": 0,
+              "resources": {}, "errors": []}
+    records = {}
+    for record in journal.read(task_uuid):
+        ids = records.setdefault(record["resource"], [])
+        if (record["tenant_id"], record["id"]) not in ids:
+            ids.append((record["tenant_id"], record["id"]))
+    if not records:
+        journal.remove(task_uuid)
+        return result
+
+    clients = admin["credential"].clients()
+    for manager_cls in find_resource_managers(records):
+        name = "%s.%s" % (manager_cls._service, manager_cls._resource)
+        stats = {"discovered": 0, "deleted": 0, "failed": 0}
+        lock = threading.Lock()
+
+        def publish(queue):
+            for tenant_uuid, resource_id in records.get(name, []):
+                queue.append((tenant_uuid, resource_id))
+
+        def consume(cache, args):
+            tenant_uuid, resource_id = args
+            manager = manager_cls(admin=clients, user=clients,
+                                  tenant_uuid=tenant_uuid)
+            try:
+                manager.raw_resource = manager.get_resource(resource_id)
+            except Exception as e:
+                if _is_not_found(e):
+                    # the resource was removed by the task itself
+                    return
+                manager.raw_resource = None
+                error = e
+            else:
+                error = None
+            with lock:
+                stats["discovered"] += 1
+
+            if error is None:
+                try:
+                    rutils.retry(manager._max_attempts, manager.delete)
+                    started = time.time()
+                    while not manager.is_deleted():
+                        if time.time() - started > manager._timeout:
+                            raise exceptions.TimeoutException(
+                                desired_status="deleted",
+                                resource_name=resource_id,
+                                resource_type=name,
+                                resource_id=resource_id,
+                                resource_status="n/a",
+                                timeout=manager._timeout)
+                        rutils.interruptable_sleep(manager._interval)
+                except Exception as e:
+                    error = e
+
+            with lock:
+                if error is None:
+                    stats["deleted"] += 1
+                    return
+                stats["failed"] += 1
+                result["errors"].append({"resource_id": resource_id,
+                                         "resource_type": name,
+                                         "message": str(error)})
+
+        broker.run(publish, consume, consumers_count=manager_cls._threads)
+
+        result["resources"][name] = stats
+        for key, value in stats.items():
+            result[key] += value
+
+    if not result["failed"]:
+        journal.remove(task_uuid)
+    return result
@@ -15,9 +15,10 @@
 
 from rally.common import cfg
 from rally.common import logging
-from rally.task import utils as task_utils
 
 from rally_openstack.cleanup import base
+from rally_openstack.contexts.keystone import users_pool
+from rally_openstack import polling
 from rally_openstack.services.identity import identity
 from rally_openstack.services.image import glance_v2
 from rally_openstack.services.image import image
@@ -32,6 +33,10 @@ def get_order(start):
     return iter(range(start, start + 99))
 
 
+# resource managers that create or own Nova servers
+_servers_owners = ("magnum", "heat", "senlin", "nova.servers", "ec2.servers")
+
+
 class SynchronizedDeletion(object):
 
     def is_deleted(self):
@@ -92,7 +97,8 @@ class MagnumClusterTemplate(MagnumMixin):
 
 # HEAT
 
-@base.resource("heat", "stacks", order=100, tenant_resource=True)
+@base.resource("heat", "stacks", order=100, tenant_resource=True,
+               bulk_deletion_check=True, depends_on=["magnum"])
 class HeatStack(base.ResourceManager):
     def name(self):
         return self.raw_resource.stack_name
@@ -140,11 +146,16 @@ _nova_order = get_order(200)
 
 
 @base.resource("nova", "servers", order=next(_nova_order),
-               tenant_resource=True)
+               tenant_resource=True, bulk_deletion_check=True,
+               depends_on=["magnum", "heat", "senlin"])
 class NovaServer(base.ResourceManager):
     def list(self):
         """List all servers."""
-        return self._manager().list(limit=-1)
+        search_opts = {}
+        if self.name_prefix:
+            # NOTE: nova treats the name filter as a regular expression
+            search_opts["name"] = "^%s" % self.name_prefix
+        return self._paginate(self._manager().list, search_opts=search_opts)
 
     def delete(self):
         if getattr(self.raw_resource, "OS-EXT-STS:locked", False):
@@ -264,6 +275,10 @@ class NeutronMixin(SynchronizedDeletion, base.ResourceManager):
         delete_method = getattr(self._manager(), "delete_%s" % self._resource)
         delete_method(self.id())
 
+    def get_resource(self, resource_id):
+        show_method = getattr(self._manager(), "show_%s" % self._resource)
+        return show_method(resource_id)[self._resource]
+
     def list(self):
         if self._resource.endswith("y"):
             resources = self._resource[:-1] + "ies"
@@ -387,14 +402,15 @@ class NeutronFloatingIP(NeutronMixin):
 
 
 @base.resource("neutron", "trunk", order=next(_neutron_order),
-               tenant_resource=True)
+               tenant_resource=True, depends_on=_servers_owners)
 class NeutronTrunk(NeutronMixin):
     # Trunks must be deleted before the parent/subports are deleted
     pass
 
 
 @base.resource("neutron", "port", order=next(_neutron_order),
-               tenant_resource=True)
+               tenant_resource=True,
+               depends_on=_servers_owners + ("octavia",))
 class NeutronPort(NeutronMixin):
     # NOTE(andreykurilin): port is the kind of resource that can be created
     #   automatically. In this case it doesn't have name field which matches
@@ -411,7 +427,11 @@ class NeutronPort(NeutronMixin):
 
     def _get_resources(self, resource):
         if resource not in self._cache:
-            resources = getattr(self._manager(), "list_%s" % resource)()
+            kwargs = {}
+            if self.tenant_uuid:
+                kwargs["tenant_id"] = self.tenant_uuid
+            resources = getattr(self._manager(), "list_%s" % resource)(
+                **kwargs)
             self._cache[resource] = [r for r in resources[resource]
                                      if r["tenant_id"] == self.tenant_uuid]
         return self._cache[resource]
@@ -506,9 +526,27 @@ class NeutronQuota(QuotaMixin):
 _cinder_order = get_order(400)
 
 
+class CinderNameFilterMixin(object):
+
+    def _supports_like_filter(self):
+        # NOTE: the "like" filter is supported since 3.34 microversion.
+        #   Older APIs return nothing for unknown filters, so resources are
+        #   listed without it and filtered by name on client side.
+        api_version = getattr(self._manager().api, "api_version", None)
+        if api_version is None or api_version.is_null():
+            return False
+        return (api_version.ver_major, api_version.ver_minor) >= (3, 34)
+
+    def list(self):
+        search_opts = {}
+        if self.name_prefix and self._supports_like_filter():
+            search_opts["name~"] = self.name_prefix
+        return self._paginate(self._manager().list, search_opts=search_opts)
+
+
 @base.resource("cinder", "backups", order=next(_cinder_order),
-               tenant_resource=True)
-class CinderVolumeBackup(base.ResourceManager):
+               tenant_resource=True, bulk_deletion_check=True)
+class CinderVolumeBackup(CinderNameFilterMixin, base.ResourceManager):
     pass
 
 
@@ -519,8 +557,8 @@ class CinderVolumeType(base.ResourceManager):
 
 
 @base.resource("cinder", "volume_snapshots", order=next(_cinder_order),
-               tenant_resource=True)
-class CinderVolumeSnapshot(base.ResourceManager):
+               tenant_resource=True, bulk_deletion_check=True)
+class CinderVolumeSnapshot(CinderNameFilterMixin, base.ResourceManager):
     pass
 
 
@@ -531,8 +569,9 @@ class CinderVolumeTransfer(base.ResourceManager):
 
 
 @base.resource("cinder", "volumes", order=next(_cinder_order),
-               tenant_resource=True)
-class CinderVolume(base.ResourceManager):
+               tenant_resource=True, bulk_deletion_check=True,
+               depends_on=_servers_owners)
+class CinderVolume(CinderNameFilterMixin, base.ResourceManager):
     pass
 
 
@@ -578,7 +617,7 @@ _manila_order = get_order(450)
 
 
 @base.resource("manila", "shares", order=next(_manila_order),
-               tenant_resource=True)
+               tenant_resource=True, bulk_deletion_check=True)
 class ManilaShare(base.ResourceManager):
     pass
 
@@ -597,12 +636,16 @@ class ManilaSecurityService(base.ResourceManager):
 
 # GLANCE
 
-@base.resource("glance", "images", order=500, tenant_resource=True)
+@base.resource("glance", "images", order=500, tenant_resource=True,
+               depends_on=["cinder.image_volumes_cache"])
 class GlanceImage(base.ResourceManager):
 
     def _client(self):
         return image.Image(self.admin or self.user)
 
+    def get_resource(self, resource_id):
+        return self._client().get_image(resource_id)
+
     def list(self):
         images = (self._client().list_images(owner=self.tenant_uuid)
                   + self._client().list_images(status="deactivated",
@@ -615,7 +658,7 @@ class GlanceImage(base.ResourceManager):
             glancev2 = glance_v2.GlanceV2Service(self.admin or self.user)
             glancev2.reactivate_image(self.raw_resource.id)
         client.delete_image(self.raw_resource.id)
-        task_utils.wait_for_status(
+        polling.wait_for_status(
             self.raw_resource, ["deleted"],
             check_deletion=True,
             update_resource=self._client().get_image,
@@ -659,7 +702,7 @@ class SaharaDataSource(SynchronizedDeletion, base.ResourceManager):
 
 
 @base.resource("sahara", "clusters", order=next(_sahara_order),
-               tenant_resource=True)
+               tenant_resource=True, depends_on=_servers_owners)
 class SaharaCluster(base.ResourceManager):
 
     # Need special treatment for Sahara Cluster because of the way the
@@ -869,7 +912,7 @@ _murano_order = get_order(1200)
 
 
 @base.resource("murano", "environments", tenant_resource=True,
-               order=next(_murano_order))
+               order=next(_murano_order), depends_on=["heat"])
 class MuranoEnvironments(SynchronizedDeletion, base.ResourceManager):
     pass
 
@@ -888,7 +931,8 @@ _ironic_order = get_order(1300)
 
 
 @base.resource("ironic", "node", admin_required=True,
-               order=next(_ironic_order), perform_for_admin_only=True)
+               order=next(_ironic_order), perform_for_admin_only=True,
+               depends_on=_servers_owners)
 class IronicNodes(base.ResourceManager):
 
     def id(self):
@@ -1038,31 +1082,49 @@ class KeystoneMixin(SynchronizedDeletion):
         delete_method = getattr(self._manager(), "delete_%s" % self._resource)
         delete_method(self.id())
 
+    def get_resource(self, resource_id):
+        get_method = getattr(self._manager(), "get_%s" % self._resource)
+        return get_method(resource_id)
+
     def list(self):
         resources = self._resource + "s"
         return getattr(self._manager(), "list_%s" % resources)()
 
 
+class KeystonePooledMixin(KeystoneMixin):
+
+    def list(self):
+        # NOTE: tenants and users of users pools have names of rally
+        #   resources, but they are reused by next tasks.
+        pooled = users_pool.get_pooled_ids()
+        return [r for r in super(KeystonePooledMixin, self).list()
+                if r.id not in pooled]
+
+
 @base.resource("keystone", "user", order=next(_keystone_order),
-               admin_required=True, perform_for_admin_only=True)
-class KeystoneUser(KeystoneMixin, base.ResourceManager):
+               admin_required=True, perform_for_admin_only=True,
+               depends_on=["*"])
+class KeystoneUser(KeystonePooledMixin, base.ResourceManager):
     pass
 
 
 @base.resource("keystone", "project", order=next(_keystone_order),
-               admin_required=True, perform_for_admin_only=True)
-class KeystoneProject(KeystoneMixin, base.ResourceManager):
+               admin_required=True, perform_for_admin_only=True,
+               depends_on=["*"])
+class KeystoneProject(KeystonePooledMixin, base.ResourceManager):
     pass
 
 
 @base.resource("keystone", "service", order=next(_keystone_order),
-               admin_required=True, perform_for_admin_only=True)
+               admin_required=True, perform_for_admin_only=True,
+               depends_on=["*"])
 class KeystoneService(KeystoneMixin, base.ResourceManager):
     pass
 
 
 @base.resource("keystone", "role", order=next(_keystone_order),
-               admin_required=True, perform_for_admin_only=True)
+               admin_required=True, perform_for_admin_only=True,
+               depends_on=["*"])
 class KeystoneRole(KeystoneMixin, base.ResourceManager):
     pass
 
@@ -1071,7 +1133,7 @@ class KeystoneRole(KeystoneMixin, base.ResourceManager):
 #   and id fields. It makes impossible to identify resources belonging to
 #   particular task.
 @base.resource("keystone", "ec2", tenant_resource=True,
-               order=next(_keystone_order))
+               order=next(_keystone_order), depends_on=["*"])
 class KeystoneEc2(SynchronizedDeletion, base.ResourceManager):
     def _manager(self):
         return identity.Identity(self.user)
@@ -14,6 +14,7 @@
 
 import time
 
+from rally.common import broker
 from rally.common import logging
 from rally.common import utils as rutils
 from rally.common import validation
@@ -90,6 +91,13 @@ class CeilometerSampleGenerator(context.Context):
             "batches_allow_lose": {
                 "type": "integer",
                 "minimum": 0
+            },
+            "resource_management_workers": {
+                "description": "The number of resources to store samples "
+                               "of (or to check for readiness) "
+                               "simultaneously.",
+                "type": "integer",
+                "minimum": 1
             }
         },
         "required": ["counter_name", "counter_type", "counter_unit",
@@ -100,9 +108,14 @@ class CeilometerSampleGenerator(context.Context):
     DEFAULT_CONFIG = {
         "resources_per_tenant": 5,
         "samples_per_resource": 5,
-        "timestamp_interval": 60
+        "timestamp_interval": 60,
+        "resource_management_workers": 1
     }
 
+    # the time to wait for all stored resources to be processed
+    RESOURCES_READY_TIMEOUT = 180
+    RESOURCES_READY_CHECK_INTERVAL = 3
+
     def _store_batch_samples(self, scenario, batches, batches_allow_lose):
         batches_allow_lose = batches_allow_lose or 0
         unsuccess = 0
@@ -127,52 +140,83 @@ class CeilometerSampleGenerator(context.Context):
             "counter_unit": self.config["counter_unit"],
             "counter_volume": self.config["counter_volume"],
         }
+        workers = self.config["resource_management_workers"]
         resources = []
-
-        for user, tenant_id in rutils.iterate_per_tenants(
-                self.context["users"]):
-            self.context["tenants"][tenant_id]["samples"] = []
-            self.context["tenants"][tenant_id]["resources"] = []
+        errors = []
+
+        def publish(queue):
+            for user, tenant_id in rutils.iterate_per_tenants(
+                    self.context["users"]):
+                self.context["tenants"][tenant_id]["samples"] = []
+                self.context["tenants"][tenant_id]["resources"] = []
+                for i in moves.xrange(self.config["resources_per_tenant"]):
+                    queue.append((user, tenant_id))
+
+        def consume(cache, args):
+            user, tenant_id = args
             scenario = ceilo_utils.CeilometerScenario(
-                context={"user": user, "task": self.context["task"]}
-            )
-            for i in moves.xrange(self.config["resources_per_tenant"]):
-                samples_to_create = scenario._make_samples(
-                    count=self.config["samples_per_resource"],
-                    interval=self.config["timestamp_interval"],
-                    metadata_list=self.config.get("metadata_list"),
-                    batch_size=self.config.get("batch_size"),
-                    **new_sample)
+                context={"user": user, "task": self.context["task"]})
+            # NOTE: _make_samples is a generator, so only one batch of
+            #   samples is kept in memory at once
+            samples_to_create = scenario._make_samples(
+                count=self.config["samples_per_resource"],
+                interval=self.config["timestamp_interval"],
+                metadata_list=self.config.get("metadata_list"),
+                batch_size=self.config.get("batch_size"),
+                **new_sample)
+            try:
                 samples = self._store_batch_samples(
                     scenario, samples_to_create,
-                    self.config.get("batches_allow_lose")
-                )
-                for sample in samples:
-                    self.context["tenants"][tenant_id]["samples"].append(
-                        sample.to_dict())
-                self.context["tenants"][tenant_id]["resources"].append(
-                    samples[0].resource_id)
-                resources.append((user, samples[0].resource_id))
+                    self.config.get("batches_allow_lose"))
+            except Exception as e:
+                errors.append(e)
+                raise
+            tenant = self.context["tenants"][tenant_id]
+            tenant["samples"].extend(sample.to_dict() for sample in samples)
+            tenant["resources"].append(samples[0].resource_id)
+            resources.append((user, samples[0].resource_id))
+
+        broker.run(publish, consume, workers)
+
+        if errors:
+            if isinstance(errors[0], exceptions.ContextSetupFailure):
+                raise errors[0]
+            raise exceptions.ContextSetupFailure(
+                ctx_name=self.get_name(),
+                msg="Failed to store samples of %d resource(s): %s"
+                    % (len(errors), errors[0]))
+
+        self._wait_for_resources(resources, workers)
 
+    def _wait_for_resources(self, resources, workers):
         # NOTE(boris-42): Context should wait until samples are processed
         from ceilometerclient import exc
 
-        for user, resource_id in resources:
+        deadline = time.time() + self.RESOURCES_READY_TIMEOUT
+        pending = list(resources)
+
+        def consume(cache, args):
+            user, resource_id = args
             scenario = ceilo_utils.CeilometerScenario(
                 context={"user": user, "task": self.context["task"]})
-
-            success = False
-            for i in range(60):
-                try:
-                    scenario._get_resource(resource_id)
-                    success = True
-                    break
-                except exc.HTTPNotFound:
-                    time.sleep(3)
-            if not success:
-                raise exceptions.ContextSetupFailure(
-                    ctx_name=self.get_name(),
-                    msg="Ceilometer Resource %s is not found" % resource_id)
+            try:
+                scenario._get_resource(resource_id)
+            except exc.HTTPNotFound:
+                return
+            ready.append(resource_id)
+
+        while True:
+            ready = []
+            broker.run(lambda queue: queue.extend(pending), consume, workers)
+            pending = [r for r in pending if r[1] not in ready]
+            if not pending or time.time() >= deadline:
+                break
+            time.sleep(self.RESOURCES_READY_CHECK_INTERVAL)
+
+        if pending:
+            raise exceptions.ContextSetupFailure(
+                ctx_name=self.get_name(),
+                msg="Ceilometer Resource %s is not found" % pending[0][1])
 
     def cleanup(self):
         # We don't have API for removal of samples and resources
@@ -0,0 +1,175 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import contextlib
+import errno
+import fcntl
+import hashlib
+import os
+import time
+
+from rally.common import cfg
+from rally.common import logging
+from rally import exceptions
+import requests
+
+
+LOG = logging.getLogger(__name__)
+
+CONF = cfg.CONF
+
+CHUNK_SIZE = 1024 * 1024
+
+
+class ImageCache(object):
+    """Local on-disk cache of remote images.
+
+    Every image is downloaded only once and stored under
+    `CONF.openstack.glance_image_cache_dir` in a file, which name is based
+    on the url of the image and its expected md5 checksum (if any). The
+    download is made under an exclusive file lock, so several rally
+    processes can share the same cache.
+
+    An image without the checksum may change remotely, so it is downloaded
+    again once it is older than `CONF.openstack.glance_image_cache_ttl`.
+    If the cache grows over `CONF.openstack.glance_image_cache_size`, least
+    recently used images are removed, except ones which are being used by
+    other processes at the moment.
+    """
+
+    def __init__(self, cache_dir=None):
+        self.cache_dir = os.path.expanduser(
+            cache_dir or CONF.openstack.glance_image_cache_dir)
+
+    def _get_path(self, url, checksum=None):
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        if checksum:
+            key = "%s-%s" % (key, checksum)
+        return os.path.join(self.cache_dir, key)
+
+    @contextlib.contextmanager
+    def use(self, url, checksum=None):
+        """Yields a path to the local copy of the image.
+
+        The image is not evicted from the cache until the block is left.
+
+        :param url: url of the image
+        :param checksum: expected md5 checksum of the image data
+        """
+        path = self._get_path(url, checksum)
+        if not os.path.exists(self.cache_dir):
+            try:
+                os.makedirs(self.cache_dir)
+            except OSError:
+                # created by another process in the meantime
+                pass
+        with open("%s.lock" % path, "a") as lock_file:
+            # NOTE: a shared lock allows other processes to use the image at
+            #   the same time, but not to download or evict it.
+            fcntl.flock(lock_file, fcntl.LOCK_SH)
+            try:
+                if not self._is_fresh(path, checksum):
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                    # the conversion of the lock is not atomic
+                    if not self._is_fresh(path, checksum):
+                        self._download(url, path, checksum)
+                    fcntl.flock(lock_file, fcntl.LOCK_SH)
+                self._touch(path)
+                self._evict(keep=path)
+                yield path
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _is_fresh(self, path, checksum=None):
+        if not os.path.exists(path):
+            return False
+        if checksum:
+            # the data is verified, it can not be outdated
+            return True
+        return (time.time() - os.path.getmtime(path)
+                < CONF.openstack.glance_image_cache_ttl)
+
+    @staticmethod
+    def _touch(path):
+        # access time is the last use, modification time is the download
+        os.utime(path, (time.time(), os.path.getmtime(path)))
+
+    def _evict(self, keep):
+        """Removes least recently used images over the size limit.
+
+        An image is removed only under the exclusive lock of its entry, so
+        images which are being downloaded or used are skipped.
+        """
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            if name.endswith((".lock", ".tmp")) or path == keep:
+                continue
+            try:
+                stat = os.stat(path)
+            except OSError as e:
+                if e.errno != errno.ENOENT:
+                    raise
+                # removed by another process in the meantime
+                continue
+            entries.append((stat.st_atime, stat.st_size, path))
+        size = sum(e[1] for e in entries) + os.path.getsize(keep)
+        limit = CONF.openstack.glance_image_cache_size * 1024 * 1024
+        for atime, entry_size, path in sorted(entries):
+            if size <= limit:
+                break
+            with open("%s.lock" % path, "a") as lock_file:
+                try:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except (IOError, OSError):
+                    LOG.debug("Image %s of the local cache is in use, "
+                              "skipping its removal." % path)
+                    continue
+                try:
+                    LOG.info("Removing image %s from the local cache."
+                             % path)
+                    os.remove(path)
+                except OSError as e:
+                    if e.errno != errno.ENOENT:
+                        raise
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+            size -= entry_size
+
+    def _download(self, url, path, checksum=None):
+        LOG.info("Downloading image %s to the local cache." % url)
+        tmp_path = "%s.tmp" % path
+        md5 = hashlib.md5()
+        response = requests.get(
+            url, stream=True,
+            timeout=(CONF.openstack.glance_image_cache_connect_timeout,
+                     CONF.openstack.glance_image_cache_read_timeout))
+        try:
+            response.raise_for_status()
+            with open(tmp_path, "wb") as f:
+                for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                    md5.update(chunk)
+                    f.write(chunk)
+            if checksum and md5.hexdigest() != checksum:
+                raise exceptions.RallyException(
+                    "Checksum of image %s is %s, but %s is expected."
+                    % (url, md5.hexdigest(), checksum))
+            os.rename(tmp_path, path)
+        except Exception:
+            # NOTE: do not leave partially downloaded images in the cache
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        finally:
+            response.close()
@@ -12,14 +12,20 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import contextlib
+import os
+
+from rally.common import broker
 from rally.common import cfg
 from rally.common import logging
 from rally.common import utils as rutils
 from rally.common import validation
+from rally import exceptions
 from rally.task import context
 
 from rally_openstack.cleanup import manager as resource_manager
 from rally_openstack import consts
+from rally_openstack.contexts.glance import image_cache
 from rally_openstack import osclients
 from rally_openstack.services.image import image
 
@@ -79,6 +85,35 @@ class ImageGenerator(context.Context):
                 "type": "integer",
                 "minimum": 1
             },
+            "image_checksum": {
+                "description": "The expected md5 checksum of data of the "
+                               "remote image. It is verified after the "
+                               "image is downloaded to the local cache.",
+                "type": "string"
+            },
+            "use_image_cache": {
+                "description": "Download a remote image to the local cache "
+                               "once and upload it to Glance from there "
+                               "instead of downloading it for every image. "
+                               "Without image_checksum the cached image is "
+                               "refreshed after [openstack] "
+                               "glance_image_cache_ttl.",
+                "type": "boolean"
+            },
+            "share_images": {
+                "description": "Upload images only once with the admin user "
+                               "and share them with all tenants instead of "
+                               "uploading a copy to every tenant. Private "
+                               "images are shared via Glance members (it "
+                               "requires Glance V2).",
+                "type": "boolean"
+            },
+            "resource_management_workers": {
+                "description": "The number of tenants to upload images to "
+                               "(or to share images with) simultaneously.",
+                "type": "integer",
+                "minimum": 1
+            },
             "image_args": {
                 "description": "This param is deprecated since Rally-0.10.0, "
                                "specify exact arguments in a root section of "
@@ -113,7 +148,10 @@ class ImageGenerator(context.Context):
         "additionalProperties": False
     }
 
-    DEFAULT_CONFIG = {"images_per_tenant": 1}
+    DEFAULT_CONFIG = {"images_per_tenant": 1,
+                      "use_image_cache": False,
+                      "share_images": False,
+                      "resource_management_workers": 1}
 
     def setup(self):
         image_url = self.config.get("image_url")
@@ -159,27 +197,126 @@ class ImageGenerator(context.Context):
         if "image_name" in self.config and images_per_tenant == 1:
             image_name = self.config["image_name"]
 
-        for user, tenant_id in rutils.iterate_per_tenants(
-                self.context["users"]):
+        with self._get_image_location(image_url) as image_location:
+            image_args = {"image_name": image_name,
+                          "container_format": container_format,
+                          "image_location": image_location,
+                          "disk_format": disk_format,
+                          "visibility": visibility,
+                          "min_disk": min_disk,
+                          "min_ram": min_ram}
+            if self.config["share_images"]:
+                self._setup_shared_images(images_per_tenant, image_args)
+            else:
+                self._setup_images(images_per_tenant, image_args)
+
+    @contextlib.contextmanager
+    def _get_image_location(self, image_url):
+        """Yields the location to upload the image from."""
+        if (image_url and self.config["use_image_cache"]
+                and not os.path.isfile(os.path.expanduser(image_url))):
+            with image_cache.ImageCache().use(
+                    image_url,
+                    checksum=self.config.get("image_checksum")) as path:
+                yield path
+        else:
+            yield image_url
+
+    def _setup_images(self, images_per_tenant, image_args):
+        errors = []
+
+        def publish(queue):
+            for user, tenant_id in rutils.iterate_per_tenants(
+                    self.context["users"]):
+                queue.append((user, tenant_id))
+
+        def consume(cache, args):
+            user, tenant_id = args
             current_images = []
             clients = osclients.Clients(user["credential"])
             image_service = image.Image(
                 clients, name_generator=self.generate_random_name)
 
-            for i in range(images_per_tenant):
-                image_obj = image_service.create_image(
-                    image_name=image_name,
-                    container_format=container_format,
-                    image_location=image_url,
-                    disk_format=disk_format,
-                    visibility=visibility,
-                    min_disk=min_disk,
-                    min_ram=min_ram)
-                current_images.append(image_obj.id)
+            try:
+                for i in range(images_per_tenant):
+                    image_obj = image_service.create_image(**image_args)
+                    current_images.append(image_obj.id)
+            except Exception as e:
+                errors.append((tenant_id, e))
+                raise
+            finally:
+                self.context["tenants"][tenant_id]["images"] = current_images
+
+        broker.run(publish, consume,
+                   self.config["resource_management_workers"])
+
+        if errors:
+            raise exceptions.ContextSetupFailure(
+                ctx_name=self.get_name(),
+                msg="Failed to upload images to %d tenant(s): %s"
+                    % (len(errors), errors[0][1]))
+
+    def _setup_shared_images(self, images_per_tenant, image_args):
+        if not self.context.get("admin"):
+            raise exceptions.ContextSetupFailure(
+                ctx_name=self.get_name(),
+                msg="The admin user is required for sharing images.")
+        if image_args["visibility"] == "private":
+            # NOTE: private images of Glance V2 can not have members
+            image_args = dict(image_args, visibility="shared")
+
+        admin_clients = osclients.Clients(self.context["admin"]["credential"])
+        image_service = image.Image(
+            admin_clients, name_generator=self.generate_random_name)
+        self.context["shared_images"] = []
+        for i in range(images_per_tenant):
+            image_obj = image_service.create_image(**image_args)
+            self.context["shared_images"].append(image_obj.id)
+        images = list(self.context["shared_images"])
+
+        errors = []
 
-            self.context["tenants"][tenant_id]["images"] = current_images
+        def publish(queue):
+            for user, tenant_id in rutils.iterate_per_tenants(
+                    self.context["users"]):
+                queue.append((user, tenant_id))
+
+        def consume(cache, args):
+            user, tenant_id = args
+            if "admin_service" not in cache:
+                cache["admin_service"] = image.Image(
+                    osclients.Clients(self.context["admin"]["credential"]))
+            user_service = image.Image(osclients.Clients(user["credential"]))
+            try:
+                if image_args["visibility"] == "shared":
+                    for image_id in images:
+                        cache["admin_service"].add_member(
+                            image_id=image_id, member_id=tenant_id)
+                        user_service.accept_member(
+                            image_id=image_id, member_id=tenant_id)
+            except Exception as e:
+                errors.append((tenant_id, e))
+                raise
+            self.context["tenants"][tenant_id]["images"] = images
+
+        broker.run(publish, consume,
+                   self.config["resource_management_workers"])
+
+        if errors:
+            raise exceptions.ContextSetupFailure(
+                ctx_name=self.get_name(),
+                msg="Failed to share images with %d tenant(s): %s"
+                    % (len(errors), errors[0][1]))
 
     def cleanup(self):
+        if self.context.get("shared_images"):
+            image_service = image.Image(
+                osclients.Clients(self.context["admin"]["credential"]))
+            for image_id in self.context["shared_images"]:
+                with logging.ExceptionLogger(
+                        LOG, "Failed to delete shared image %s" % image_id):
+                    image_service.delete_image(image_id=image_id)
+
         if self.context.get("admin", {}):
             # NOTE(andreykurilin): Glance does not require the admin for
             #   listing tenant images, but the admin is required for
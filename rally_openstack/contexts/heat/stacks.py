@@ -13,8 +13,12 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import json
+
+from rally.common import broker
 from rally.common import utils as rutils
 from rally.common import validation
+from rally import exceptions
 from rally.task import context
 
 from rally_openstack.cleanup import manager as resource_manager
@@ -47,6 +51,12 @@ class StackGenerator(context.Context):
             "resources_per_stack": {
                 "type": "integer",
                 "minimum": 1
+            },
+            "resource_management_workers": {
+                "description": "The number of tenants to create stacks in "
+                               "simultaneously.",
+                "type": "integer",
+                "minimum": 1
             }
         },
         "additionalProperties": False
@@ -54,7 +64,8 @@ class StackGenerator(context.Context):
 
     DEFAULT_CONFIG = {
         "stacks_per_tenant": 2,
-        "resources_per_stack": 10
+        "resources_per_stack": 10,
+        "resource_management_workers": 1
     }
 
     @staticmethod
@@ -70,17 +81,42 @@ class StackGenerator(context.Context):
         return template
 
     def setup(self):
-        template = self._prepare_stack_template(
-            self.config["resources_per_stack"])
-        for user, tenant_id in rutils.iterate_per_tenants(
-                self.context["users"]):
+        # NOTE: the template is serialized only once and then sent as is
+        #   for every stack
+        template = json.dumps(self._prepare_stack_template(
+            self.config["resources_per_stack"]))
+        errors = []
+
+        def publish(queue):
+            for user, tenant_id in rutils.iterate_per_tenants(
+                    self.context["users"]):
+                self.context["tenants"][tenant_id]["stacks"] = []
+                queue.append((user, tenant_id))
+
+        def consume(cache, args):
+            user, tenant_id = args
             heat_scenario = heat_utils.HeatScenario(
                 {"user": user, "task": self.context["task"],
                  "owner_id": self.context["owner_id"]})
-            self.context["tenants"][tenant_id]["stacks"] = []
-            for i in range(self.config["stacks_per_tenant"]):
-                stack = heat_scenario._create_stack(template)
-                self.context["tenants"][tenant_id]["stacks"].append(stack.id)
+            try:
+                stacks = heat_scenario._create_stacks(
+                    template, self.config["stacks_per_tenant"])
+            except Exception as e:
+                errors.append((tenant_id, e))
+                raise
+            self.context["tenants"][tenant_id]["stacks"] = [
+                stack.id for stack in stacks]
+
+        broker.run(publish, consume,
+                   self.config["resource_management_workers"])
+
+        if errors:
+            # NOTE: stacks of failed tenants are removed at cleanup by
+            #   their names
+            raise exceptions.ContextSetupFailure(
+                ctx_name=self.get_name(),
+                msg="Failed to create stacks in %d tenant(s): %s"
+                    % (len(errors), errors[0][1]))
 
     def cleanup(self):
         resource_manager.cleanup(names=["heat.stacks"],
@@ -15,6 +15,8 @@
 
 import collections
 import copy
+import itertools
+import threading
 import uuid
 
 from rally.common import broker
@@ -24,10 +26,15 @@ from rally.common import utils as rutils
 from rally.common import validation
 from rally import exceptions
 from rally.task import context
+from six.moves import queue
 
+from rally_openstack.cleanup import journal
+from rally_openstack.cleanup import manager as resource_manager
 from rally_openstack import consts
+from rally_openstack.contexts.keystone import users_pool
 from rally_openstack import credential
 from rally_openstack import osclients
+from rally_openstack import scenario
 from rally_openstack.services.identity import identity
 from rally_openstack.wrappers import network
 
@@ -40,6 +47,10 @@ RESOURCE_MANAGEMENT_WORKERS_DESCR = ("The number of concurrent threads to use "
                                      "for serving users context.")
 PROJECT_DOMAIN_DESCR = "ID of domain in which projects will be created."
 USER_DOMAIN_DESCR = "ID of domain in which users will be created."
+POOLED_DESCR = ("Lease users and tenants from a persistent pool of rally-owned"
+                " users instead of creating and deleting them for every task."
+                " Missing users and tenants are created and added to the "
+                "pool.")
 
 
 @validation.add("required_platform", platform="openstack", users=True)
@@ -73,6 +84,9 @@ class UserGenerator(context.Context):
                  "user_domain": {
                      "type": "string",
                      "description": USER_DOMAIN_DESCR},
+                 "pooled": {
+                     "type": "boolean",
+                     "description": POOLED_DESCR},
                  "user_choice_method": {
                      "$ref": "#/definitions/user_choice_method"}},
              "additionalProperties": False},
@@ -86,9 +100,16 @@ class UserGenerator(context.Context):
         ],
         "definitions": {
             "user_choice_method": {
-                "enum": ["random", "round_robin"],
+                # NOTE: there is no mode which binds users to workers,
+                #   since runners start a new thread for every iteration
+                #   and do not expose any stable id of a worker.
+                "enum": ["random", "round_robin", "random_tenant",
+                         "least_recently_used"],
                 "description": "The mode of balancing usage of users between "
-                               "scenario iterations."}
+                               "scenario iterations: a random user, users "
+                               "of tenants in turn, a random user of a "
+                               "random tenant or the least recently used "
+                               "user of a worker process."}
 
         }
     }
@@ -104,6 +125,7 @@ class UserGenerator(context.Context):
 
     def __init__(self, context):
         super(UserGenerator, self).__init__(context)
+        self._deletion_failed = False
 
         creds = self.env["platforms"]["openstack"]
         if creds.get("admin"):
@@ -130,6 +152,11 @@ class UserGenerator(context.Context):
             with self.config.unlocked():
                 for key, value in self.DEFAULT_FOR_NEW_USERS.items():
                     self.config.setdefault(key, value)
+            if self.config.get("pooled"):
+                self._users_pool = users_pool.UsersPool(
+                    self.credential,
+                    project_domain=self.config["project_domain"],
+                    user_domain=self.config["user_domain"])
 
     def _remove_default_security_group(self):
         """Delete default security group for tenants."""
@@ -156,140 +183,319 @@ class UserGenerator(context.Context):
                 if default:
                     clients.neutron().delete_security_group(default[0]["id"])
 
-    def _create_tenants(self):
-        threads = self.config["resource_management_workers"]
-
-        tenants = collections.deque()
-
-        def publish(queue):
-            for i in range(self.config["tenants"]):
-                args = (self.config["project_domain"], self.task["uuid"], i)
-                queue.append(args)
-
-        def consume(cache, args):
-            domain, task_id, i = args
-            if "client" not in cache:
-                clients = osclients.Clients(self.credential)
-                cache["client"] = identity.Identity(
-                    clients, name_generator=self.generate_random_name)
-            tenant = cache["client"].create_project(domain_name=domain)
-            tenant_dict = {"id": tenant.id, "name": tenant.name, "users": []}
-            tenants.append(tenant_dict)
-
-        # NOTE(msdubov): consume() will fill the tenants list in the closure.
-        broker.run(publish, consume, threads)
-        tenants_dict = {}
-        for t in tenants:
-            tenants_dict[t["id"]] = t
-
-        return tenants_dict
-
-    def _create_users(self):
-        # NOTE(msdubov): This should be called after _create_tenants().
+    def _get_user_credential(self, username, password, tenant_name):
+        return credential.OpenStackCredential(
+            auth_url=self.credential["auth_url"],
+            username=username,
+            password=password,
+            tenant_name=tenant_name,
+            permission=consts.EndpointPermission.USER,
+            project_domain_name=self.config["project_domain"],
+            user_domain_name=self.config["user_domain"],
+            endpoint_type=self.credential["endpoint_type"],
+            https_insecure=self.credential["https_insecure"],
+            https_cacert=self.credential["https_cacert"],
+            region_name=self.credential["region_name"],
+            profiler_hmac_key=self.credential["profiler_hmac_key"],
+            profiler_conn_str=self.credential["profiler_conn_str"],
+            api_info=self.credential["api_info"])
+
+    def _create_tenants_and_users(self, tenants_num=None):
+        """Create tenants and users without a barrier between them.
+
+        Workers take jobs from a shared priority queue. A job of a tenant
+        creates the tenant and puts jobs of its users to the queue, which
+        are taken before jobs of the remaining tenants, so users creation
+        doesn't wait for all tenants to be created and no worker waits for
+        a tenant being created by another one.
+
+        :param tenants_num: the number of tenants to create. Defaults to the
+            number of tenants from context config
+        :returns: a tuple of tenants dict and users list
+        """
+        if tenants_num is None:
+            tenants_num = self.config["tenants"]
         threads = self.config["resource_management_workers"]
         users_per_tenant = self.config["users_per_tenant"]
         default_role = cfg.CONF.openstack.keystone_default_role
 
+        tenants = {}
         users = collections.deque()
-
-        def publish(queue):
-            for tenant_id in self.context["tenants"]:
-                for user_id in range(users_per_tenant):
-                    username = self.generate_random_name()
-                    password = str(uuid.uuid4())
-                    args = (username, password, self.config["project_domain"],
-                            self.config["user_domain"], tenant_id)
-                    queue.append(args)
-
-        def consume(cache, args):
-            username, password, project_dom, user_dom, tenant_id = args
-            if "client" not in cache:
-                clients = osclients.Clients(self.credential)
-                cache["client"] = identity.Identity(
-                    clients, name_generator=self.generate_random_name)
-            client = cache["client"]
-            user = client.create_user(username, password=password,
-                                      project_id=tenant_id,
-                                      domain_name=user_dom,
-                                      default_role=default_role)
-            user_credential = credential.OpenStackCredential(
-                auth_url=self.credential["auth_url"],
-                username=user.name,
-                password=password,
-                tenant_name=self.context["tenants"][tenant_id]["name"],
-                permission=consts.EndpointPermission.USER,
-                project_domain_name=project_dom,
-                user_domain_name=user_dom,
-                endpoint_type=self.credential["endpoint_type"],
-                https_insecure=self.credential["https_insecure"],
-                https_cacert=self.credential["https_cacert"],
-                region_name=self.credential["region_name"],
-                profiler_hmac_key=self.credential["profiler_hmac_key"],
-                profiler_conn_str=self.credential["profiler_conn_str"],
-                api_info=self.credential["api_info"])
-            users.append({"id": user.id,
-                          "credential": user_credential,
-                          "tenant_id": tenant_id})
-
-        # NOTE(msdubov): consume() will fill the users list in the closure.
-        broker.run(publish, consume, threads)
-        return list(users)
+        timings = {"tenants": collections.deque(),
+                   "users": collections.deque()}
+        jobs = queue.PriorityQueue()
+        # the sequence number keeps the order of jobs of the same priority
+        counter = itertools.count()
+
+        def create_tenant(client, i):
+            with rutils.Timer() as timer:
+                tenant = client.create_project(
+                    domain_name=self.config["project_domain"])
+            timings["tenants"].append(
+                (timer.timestamp(), timer.finish_timestamp()))
+            tenants[i] = {"id": tenant.id, "name": tenant.name, "users": []}
+            for j in range(users_per_tenant):
+                jobs.put((0, next(counter), create_user, tenants[i]))
+
+        def create_user(client, tenant):
+            username = self.generate_random_name()
+            password = str(uuid.uuid4())
+            with rutils.Timer() as timer:
+                user = client.create_user(
+                    username, password=password, project_id=tenant["id"],
+                    domain_name=self.config["user_domain"],
+                    default_role=default_role)
+            timings["users"].append(
+                (timer.timestamp(), timer.finish_timestamp()))
+            # NOTE: the credential is built right away, since other contexts
+            #   and scenarios expect context["users"] to hold credential
+            #   objects. It is a plain object, so no request to keystone is
+            #   made until the credential is used.
+            users.append({
+                "id": user.id,
+                "credential": self._get_user_credential(
+                    user.name, password, tenant["name"]),
+                "tenant_id": tenant["id"]})
+
+        def worker():
+            client = None
+            while True:
+                priority, seq, func, arg = jobs.get()
+                try:
+                    if func is None:
+                        return
+                    if client is None:
+                        client = identity.Identity(
+                            osclients.Clients(self.credential),
+                            name_generator=self.generate_random_name)
+                    func(client, arg)
+                except Exception as e:
+                    msg = "Failed to %s" % func.__name__.replace("_", " ")
+                    if logging.is_debug():
+                        LOG.exception(msg)
+                    else:
+                        LOG.warning("%s: %s" % (msg, e))
+                finally:
+                    jobs.task_done()
+
+        for i in range(tenants_num):
+            jobs.put((1, next(counter), create_tenant, i))
+        workers = [threading.Thread(target=worker) for i in range(threads)]
+        for thread in workers:
+            thread.start()
+        # jobs of users are put to the queue before their tenant job is done
+        jobs.join()
+        for thread in workers:
+            jobs.put((2, next(counter), None, None))
+        for thread in workers:
+            thread.join()
+
+        for phase in ("tenants", "users"):
+            self._report_phase_timing(phase, timings[phase])
+
+        tenants = dict((t["id"], t) for t in tenants.values())
+        return tenants, list(users)
+
+    def _report_phase_timing(self, phase, timings):
+        """Save the duration of provisioning phase as an atomic action.
+
+        :param phase: the name of phase
+        :param timings: list of start and finish timestamps of every
+            operation made in scope of the phase
+        """
+        if not timings:
+            return
+        started_at = min(started for started, finished in timings)
+        finished_at = max(finished for started, finished in timings)
+        LOG.debug("%(count)d %(phase)s are created in %(duration).3f seconds"
+                  % {"count": len(timings), "phase": phase,
+                     "duration": finished_at - started_at})
+        self.atomic_actions().append({"name": "users.create_%s" % phase,
+                                      "children": [],
+                                      "started_at": started_at,
+                                      "finished_at": finished_at})
 
     def _get_consumer_for_deletion(self, func_name):
         def consume(cache, resource_id):
             if "client" not in cache:
                 clients = osclients.Clients(self.credential)
                 cache["client"] = identity.Identity(clients)
-            getattr(cache["client"], func_name)(resource_id)
+            try:
+                getattr(cache["client"], func_name)(resource_id)
+            except Exception:
+                self._deletion_failed = True
+                raise
         return consume
 
-    def _delete_tenants(self):
+    def _delete_tenants(self, tenant_ids=None):
+        """Delete tenants of the context or the given ones."""
         threads = self.config["resource_management_workers"]
+        if tenant_ids is None:
+            tenant_ids = list(self.context["tenants"])
+            self.context["tenants"] = {}
 
         def publish(queue):
-            for tenant_id in self.context["tenants"]:
+            for tenant_id in tenant_ids:
                 queue.append(tenant_id)
 
         broker.run(publish, self._get_consumer_for_deletion("delete_project"),
                    threads)
-        self.context["tenants"] = {}
 
-    def _delete_users(self):
+    def _delete_users(self, user_ids=None):
+        """Delete users of the context or the given ones."""
         threads = self.config["resource_management_workers"]
+        if user_ids is None:
+            user_ids = [user["id"] for user in self.context["users"]]
+            self.context["users"] = []
 
         def publish(queue):
-            for user in self.context["users"]:
-                queue.append(user["id"])
+            for user_id in user_ids:
+                queue.append(user_id)
 
         broker.run(publish, self._get_consumer_for_deletion("delete_user"),
                    threads)
-        self.context["users"] = []
 
     def create_users(self):
         """Create tenants and users, using the broker pattern."""
         threads = self.config["resource_management_workers"]
 
-        LOG.debug("Creating %(tenants)d tenants using %(threads)s threads"
-                  % {"tenants": self.config["tenants"], "threads": threads})
-        self.context["tenants"] = self._create_tenants()
+        users_num = self.config["users_per_tenant"] * self.config["tenants"]
+        LOG.debug("Creating %(tenants)d tenants and %(users)d users using "
+                  "%(threads)s threads" % {"tenants": self.config["tenants"],
+                                           "users": users_num,
+                                           "threads": threads})
+        self.context["tenants"], self.context["users"] = (
+            self._create_tenants_and_users())
+        for user in self.context["users"]:
+            self.context["tenants"][user["tenant_id"]]["users"].append(user)
 
+        self._check_users_amount()
+
+    def _check_users_amount(self):
+        users_num = self.config["users_per_tenant"] * self.config["tenants"]
         if len(self.context["tenants"]) < self.config["tenants"]:
             raise exceptions.ContextSetupFailure(
                 ctx_name=self.get_name(),
                 msg="Failed to create the requested number of tenants.")
 
-        users_num = self.config["users_per_tenant"] * self.config["tenants"]
-        LOG.debug("Creating %(users)d users using %(threads)s threads"
-                  % {"users": users_num, "threads": threads})
-        self.context["users"] = self._create_users()
-        for user in self.context["users"]:
-            self.context["tenants"][user["tenant_id"]]["users"].append(user)
-
         if len(self.context["users"]) < users_num:
             raise exceptions.ContextSetupFailure(
                 ctx_name=self.get_name(),
                 msg="Failed to create the requested number of users.")
 
+    def use_users_pool(self):
+        """Lease tenants and users from the pool, create the missing ones."""
+        owner_id = self.get_owner_id()
+        users_per_tenant = self.config["users_per_tenant"]
+
+        leased = self._users_pool.lease(owner_id, self.config["tenants"],
+                                        users_per_tenant)
+        users = self._check_pooled_users(leased)
+        for tenant in leased:
+            if tenant["id"] not in users:
+                continue
+            self.context["tenants"][tenant["id"]] = {
+                "id": tenant["id"], "name": tenant["name"],
+                "users": users[tenant["id"]]}
+            self.context["users"].extend(users[tenant["id"]])
+        LOG.debug("%d tenants are leased from users pool %s."
+                  % (len(users), self._users_pool.path))
+
+        missing = self.config["tenants"] - len(users)
+        if missing:
+            LOG.debug("Creating %d tenants to extend users pool." % missing)
+            tenants, users = self._create_tenants_and_users(missing)
+            pooled = dict((t["id"], dict(t, users=[]))
+                          for t in tenants.values())
+            for user in users:
+                tenants[user["tenant_id"]]["users"].append(user)
+                pooled[user["tenant_id"]]["users"].append({
+                    "id": user["id"],
+                    "name": user["credential"]["username"]})
+            self._users_pool.add(owner_id, list(pooled.values()))
+            # NOTE: pooled tenants and users outlive the task, so they must
+            #   not be deleted by the cleanup by journal
+            task_uuid = self.context["task"]["uuid"]
+            journal.forget(task_uuid, "keystone.project", list(tenants))
+            journal.forget(task_uuid, "keystone.user",
+                           [u["id"] for u in users])
+            self.context["tenants"].update(tenants)
+            self.context["users"].extend(users)
+
+        self._check_users_amount()
+
+    def _check_pooled_users(self, tenants):
+        """Reset passwords of leased users and authenticate them.
+
+        Passwords are not kept in the pool, so every leased user gets a new
+        one. A token is scoped to the tenant of the user, so it proves that
+        both the tenant and the user (with its role) still exist. Tenants
+        with users which are missing or rejected by keystone are removed
+        from the pool and deleted, tenants which failed to be checked for
+        other reasons are released.
+
+        :param tenants: leased tenants of the pool
+        :returns: a dict of users of context format by ID of working tenant
+        """
+        users_per_tenant = self.config["users_per_tenant"]
+        users = dict((t["id"], []) for t in tenants)
+        rejected = set()
+        failed = set()
+
+        def publish(queue):
+            for tenant in tenants:
+                for user in tenant["users"][:users_per_tenant]:
+                    queue.append((tenant, user))
+
+        def consume(cache, args):
+            tenant, user = args
+            if "client" not in cache:
+                cache["client"] = identity.Identity(
+                    osclients.Clients(self.credential))
+            password = str(uuid.uuid4())
+            try:
+                cache["client"].update_user(user["id"], password=password)
+            except Exception as e:
+                if getattr(e, "http_status", None) == 404:
+                    rejected.add(tenant["id"])
+                else:
+                    failed.add(tenant["id"])
+                raise
+            user_credential = self._get_user_credential(
+                user["name"], password, tenant["name"])
+            try:
+                osclients.Clients(user_credential).keystone.auth_ref
+            except osclients.AuthenticationFailed as e:
+                if getattr(e.kwargs["error"], "http_status", None) == 401:
+                    rejected.add(tenant["id"])
+                else:
+                    failed.add(tenant["id"])
+                raise
+            users[tenant["id"]].append({"id": user["id"],
+                                        "credential": user_credential,
+                                        "tenant_id": tenant["id"]})
+
+        broker.run(publish, consume,
+                   self.config["resource_management_workers"])
+
+        if rejected:
+            LOG.warning("Removing %d tenants with users rejected by keystone "
+                        "from users pool %s."
+                        % (len(rejected), self._users_pool.path))
+            self._users_pool.remove(rejected)
+            # NOTE: such tenants are not usable anymore, so they are deleted
+            #   with all their users instead of being leaked.
+            self._delete_users([user["id"] for tenant in tenants
+                                if tenant["id"] in rejected
+                                for user in tenant["users"]])
+            self._delete_tenants(list(rejected))
+        failed -= rejected
+        if failed:
+            self._users_pool.release(self.get_owner_id(), tenant_ids=failed)
+        return dict((tenant_id, tenant_users)
+                    for tenant_id, tenant_users in users.items()
+                    if tenant_id not in rejected and tenant_id not in failed)
+
     def use_existing_users(self):
         LOG.debug("Using existing users for OpenStack platform.")
         api_info = copy.deepcopy(self.env["platforms"]["openstack"].get(
@@ -323,15 +529,40 @@ class UserGenerator(context.Context):
 
         if self.existing_users:
             self.use_existing_users()
+        elif self.config.get("pooled"):
+            self.use_users_pool()
         else:
             self.create_users()
 
+        # NOTE: precomputed order of tenants for choosing users in scenarios
+        self.context["tenant_ids"] = sorted(self.context["tenants"])
+
     def cleanup(self):
         """Delete tenants and users, using the broker pattern."""
+        task_uuid = self.context["task"]["uuid"]
+        scenario.forget_user_choices(task_uuid)
         if self.existing_users:
             # nothing to do here.
-            return
+            pass
+        elif self.config.get("pooled"):
+            # NOTE: quotas of pooled tenants are reset to default ones by
+            #   the quotas context, so releasing the lease is enough here.
+            self._users_pool.release(self.get_owner_id())
+            self.context["users"] = []
+            self.context["tenants"] = {}
         else:
             self._remove_default_security_group()
             self._delete_users()
             self._delete_tenants()
+        if not self._deletion_failed and self.context.get("admin"):
+            # NOTE: users context is cleaned up the last one, but failures
+            #   of cleanup of other contexts are only logged by rally. So
+            #   the journal is processed once more to delete leftovers, and
+            #   it is kept for `rally env cleanup --task` if some of them
+            #   can not be deleted.
+            result = resource_manager.cleanup_by_journal(
+                task_uuid, self.context["admin"])
+            if result["failed"]:
+                LOG.warning("Failed to delete %d resources of the task, the "
+                            "cleanup journal is kept."
+                            % result["failed"])
@@ -0,0 +1,178 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import contextlib
+import fcntl
+import hashlib
+import json
+import os
+import time
+
+from rally.common import cfg
+from rally.common import logging
+
+
+LOG = logging.getLogger(__name__)
+
+CONF = cfg.CONF
+
+
+class UsersPool(object):
+    """Persistent pool of rally-owned tenants and users of one cloud.
+
+    The pool is stored as a json file on the local filesystem. Every entry
+    of the pool is a tenant with its users which can be leased by a single
+    task at a time. Passwords of users are not stored: they are reset by
+    the task which leases the tenant. A lease is released at cleanup of
+    the task or is considered as stale after
+    `CONF.openstack.users_pool_lease_timeout` seconds (i.e. the task, which
+    took it, was killed).
+
+    All modifications of the pool are made under an exclusive file lock, so
+    the pool can be shared between several rally processes.
+    """
+
+    def __init__(self, credential, project_domain, user_domain,
+                 pool_dir=None):
+        pool_dir = os.path.expanduser(
+            pool_dir or CONF.openstack.users_pool_dir)
+        key = "|".join([credential["auth_url"], credential["username"],
+                        credential["region_name"] or "",
+                        project_domain, user_domain])
+        key = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        self.path = os.path.join(pool_dir, "%s.json" % key)
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return {"tenants": []}
+        with open(self.path) as f:
+            return json.load(f)
+
+    def _save(self, data):
+        tmp_path = "%s.tmp" % self.path
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f, indent=2)
+        os.rename(tmp_path, self.path)
+
+    @contextlib.contextmanager
+    def _locked(self):
+        pool_dir = os.path.dirname(self.path)
+        if not os.path.exists(pool_dir):
+            os.makedirs(pool_dir, mode=0o700)
+        with open("%s.lock" % self.path, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                data = self._load()
+                yield data
+                self._save(data)
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _is_free(self, tenant):
+        if not tenant.get("leased_by"):
+            return True
+        timeout = CONF.openstack.users_pool_lease_timeout
+        if time.time() - tenant["leased_at"] > timeout:
+            LOG.warning("Lease of tenant %s by task %s is expired."
+                        % (tenant["id"], tenant["leased_by"]))
+            return True
+        return False
+
+    def lease(self, task_id, tenants, users_per_tenant):
+        """Lease free tenants of the pool.
+
+        :param task_id: ID of the task which takes the lease
+        :param tenants: the maximum number of tenants to lease
+        :param users_per_tenant: the minimum number of users a tenant
+            should have
+        :returns: a list of leased tenants
+        """
+        leased = []
+        with self._locked() as data:
+            for tenant in data["tenants"]:
+                if len(leased) == tenants:
+                    break
+                if (self._is_free(tenant)
+                        and len(tenant["users"]) >= users_per_tenant):
+                    tenant["leased_by"] = task_id
+                    tenant["leased_at"] = time.time()
+                    leased.append(tenant)
+        return leased
+
+    def add(self, task_id, tenants):
+        """Add new tenants to the pool, leased by the task.
+
+        :param task_id: ID of the task which creates the tenants
+        :param tenants: a list of dicts with id, name and users of tenant,
+            where every user is a dict with id and name
+        """
+        with self._locked() as data:
+            for tenant in tenants:
+                tenant = dict(tenant, leased_by=task_id,
+                              leased_at=time.time())
+                data["tenants"].append(tenant)
+
+    def remove(self, tenant_ids):
+        """Remove tenants from the pool, e.g. ones which do not work anymore.
+
+        :param tenant_ids: IDs of tenants to remove
+        """
+        tenant_ids = set(tenant_ids)
+        with self._locked() as data:
+            data["tenants"] = [t for t in data["tenants"]
+                               if t["id"] not in tenant_ids]
+
+    def release(self, task_id, tenant_ids=None):
+        """Release tenants leased by the task.
+
+        :param task_id: ID of the task which holds the lease
+        :param tenant_ids: IDs of tenants to release. Defaults to all the
+            tenants leased by the task
+        """
+        with self._locked() as data:
+            for tenant in data["tenants"]:
+                if tenant.get("leased_by") != task_id:
+                    continue
+                if tenant_ids is None or tenant["id"] in tenant_ids:
+                    tenant["leased_by"] = None
+                    tenant["leased_at"] = None
+
+
+def get_pooled_ids(pool_dir=None):
+    """Returns IDs of all tenants and users of all pools in the directory.
+
+    Pooled tenants and users outlive tasks, so they should be skipped by
+    the cleanup.
+
+    :param pool_dir: the directory of pools. Defaults to
+        `CONF.openstack.users_pool_dir`
+    """
+    pool_dir = os.path.expanduser(pool_dir or CONF.openstack.users_pool_dir)
+    if not os.path.isdir(pool_dir):
+        return set()
+    ids = set()
+    for filename in os.listdir(pool_dir):
+        if not filename.endswith(".json"):
+            continue
+        try:
+            with open(os.path.join(pool_dir, filename)) as f:
+                tenants = json.load(f)["tenants"]
+        except (IOError, ValueError, KeyError) as e:
+            LOG.warning("Failed to read users pool %s: %s" % (filename, e))
+            continue
+        for tenant in tenants:
+            ids.add(tenant["id"])
+            ids.update(user["id"] for user in tenant["users"])
+    return ids
@@ -12,16 +12,24 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import time
+
 from six import moves
 
+from rally.common import broker
+from rally.common import logging
 from rally.common import utils as rutils
 from rally.common import validation
+from rally import exceptions
 from rally.task import context
 
 from rally_openstack import consts
 from rally_openstack.scenarios.monasca import utils as monasca_utils
 
 
+LOG = logging.getLogger(__name__)
+
+
 @validation.add("required_platform", platform="openstack", users=True)
 @context.configure(name="monasca_metrics", platform="openstack", order=510)
 class MonascaMetricGenerator(context.Context):
@@ -70,13 +78,27 @@ class MonascaMetricGenerator(context.Context):
                     },
                     "additionalProperties": False
                 }
+            },
+            "batch_size": {
+                "description": "Enables the bulk mode: metrics are created "
+                               "by batches of the given size with a single "
+                               "request per batch.",
+                "type": "integer",
+                "minimum": 1
+            },
+            "resource_management_workers": {
+                "description": "The number of tenants to create metrics in "
+                               "simultaneously (only in the bulk mode).",
+                "type": "integer",
+                "minimum": 1
             }
         },
         "additionalProperties": False
     }
 
     DEFAULT_CONFIG = {
-        "metrics_per_tenant": 2
+        "metrics_per_tenant": 2,
+        "resource_management_workers": 1
     }
 
     def setup(self):
@@ -87,18 +109,62 @@ class MonascaMetricGenerator(context.Context):
                 "dimensions": self.config["dimensions"]
             }
 
-        for user, tenant_id in rutils.iterate_per_tenants(
-                self.context["users"]):
-            scenario = monasca_utils.MonascaScenario(
-                context={"user": user, "task": self.context["task"]}
-            )
-            for i in moves.xrange(self.config["metrics_per_tenant"]):
-                scenario._create_metrics(**new_metric)
-                rutils.interruptable_sleep(0.001)
+        if self.config.get("batch_size"):
+            self._create_metrics_in_bulk(new_metric)
+        else:
+            for user, tenant_id in rutils.iterate_per_tenants(
+                    self.context["users"]):
+                scenario = monasca_utils.MonascaScenario(
+                    context={"user": user, "task": self.context["task"]}
+                )
+                for i in moves.xrange(self.config["metrics_per_tenant"]):
+                    scenario._create_metrics(**new_metric)
+                    rutils.interruptable_sleep(0.001)
         rutils.interruptable_sleep(
             monasca_utils.CONF.openstack.monasca_metric_create_prepoll_delay,
             atomic_delay=1)
 
+    def _create_metrics_in_bulk(self, new_metric):
+        errors = []
+        created = []
+
+        def publish(queue):
+            for user, tenant_id in rutils.iterate_per_tenants(
+                    self.context["users"]):
+                queue.append(user)
+
+        def consume(cache, user):
+            scenario = monasca_utils.MonascaScenario(
+                context={"user": user, "task": self.context["task"]})
+            try:
+                for batch in scenario._make_metrics(
+                        self.config["metrics_per_tenant"],
+                        batch_size=self.config["batch_size"], **new_metric):
+                    scenario._create_metrics_batch(batch)
+                    created.append(len(batch))
+            except Exception as e:
+                errors.append(e)
+                raise
+
+        started_at = time.time()
+        broker.run(publish, consume,
+                   self.config["resource_management_workers"])
+        duration = time.time() - started_at
+
+        metrics_num = sum(created)
+        self.context["monasca_metrics"] = {
+            "metrics": metrics_num,
+            "duration": duration,
+            "throughput": metrics_num / duration if duration else None}
+        LOG.info("%d Monasca metrics are created in %.2f seconds."
+                 % (metrics_num, duration))
+
+        if errors:
+            raise exceptions.ContextSetupFailure(
+                ctx_name=self.get_name(),
+                msg="Failed to create metrics in %d tenant(s): %s"
+                    % (len(errors), errors[0]))
+
     def cleanup(self):
         # We don't have API for removal of metrics
         pass
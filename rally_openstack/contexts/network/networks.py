@@ -13,9 +13,11 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+from rally.common import broker
 from rally.common import logging
 from rally.common import utils
 from rally.common import validation
+from rally import exceptions
 from rally.task import context
 
 from rally_openstack import consts
@@ -81,6 +83,12 @@ class Network(context.Context):
                     }
                 },
                 "additionalProperties": False
+            },
+            "resource_management_workers": {
+                "description": "The number of tenants to create or delete "
+                               "networks in simultaneously.",
+                "type": "integer",
+                "minimum": 1
             }
         },
         "additionalProperties": False
@@ -93,43 +101,70 @@ class Network(context.Context):
         "network_create_args": {},
         "dns_nameservers": None,
         "router": {"external": True},
-        "dualstack": False
+        "dualstack": False,
+        "resource_management_workers": 1
     }
 
-    def setup(self):
+    def _get_wrapper(self, cache):
         # NOTE(rkiran): Some clients are not thread-safe. Thus during
         #               multithreading/multiprocessing, it is likely the
         #               sockets are left open. This problem is eliminated by
         #               creating a connection in setup and cleanup separately.
-        net_wrapper = network_wrapper.wrap(
-            osclients.Clients(self.context["admin"]["credential"]),
-            self, config=self.config)
+        if "wrapper" not in cache:
+            cache["wrapper"] = network_wrapper.wrap(
+                osclients.Clients(self.context["admin"]["credential"]),
+                self, config=self.config)
+        return cache["wrapper"]
+
+    def setup(self):
         kwargs = {}
         if self.config["dns_nameservers"] is not None:
             kwargs["dns_nameservers"] = self.config["dns_nameservers"]
-        for user, tenant_id in (utils.iterate_per_tenants(
-                self.context.get("users", []))):
-            self.context["tenants"][tenant_id]["networks"] = []
-            for i in range(self.config["networks_per_tenant"]):
-                # NOTE(amaretskiy): router_create_args and subnets_num take
-                #                   effect for Neutron only.
-                network_create_args = self.config["network_create_args"].copy()
-                network = net_wrapper.create_network(
-                    tenant_id,
+        errors = []
+
+        def publish(queue):
+            for user, tenant_id in utils.iterate_per_tenants(
+                    self.context.get("users", [])):
+                queue.append(tenant_id)
+
+        def consume(cache, tenant_id):
+            # NOTE(amaretskiy): router_create_args and subnets_num take
+            #                   effect for Neutron only.
+            network_create_args = self.config["network_create_args"].copy()
+            try:
+                networks = self._get_wrapper(cache).create_networks(
+                    tenant_id, self.config["networks_per_tenant"],
                     dualstack=self.config["dualstack"],
                     subnets_num=self.config["subnets_per_network"],
                     network_create_args=network_create_args,
                     router_create_args=self.config["router"],
                     **kwargs)
-                self.context["tenants"][tenant_id]["networks"].append(network)
+            except Exception as e:
+                errors.append((tenant_id, e))
+                raise
+            self.context["tenants"][tenant_id]["networks"] = networks
+
+        broker.run(publish, consume,
+                   self.config["resource_management_workers"])
+
+        if errors:
+            raise exceptions.ContextSetupFailure(
+                ctx_name=self.get_name(),
+                msg="Failed to create networks in %d tenant(s): %s"
+                    % (len(errors), errors[0][1]))
 
     def cleanup(self):
-        net_wrapper = network_wrapper.wrap(
-            osclients.Clients(self.context["admin"]["credential"]),
-            self, config=self.config)
-        for tenant_id, tenant_ctx in self.context["tenants"].items():
-            for network in tenant_ctx.get("networks", []):
-                with logging.ExceptionLogger(
-                        LOG,
-                        "Failed to delete network for tenant %s" % tenant_id):
-                    net_wrapper.delete_network(network)
+        def publish(queue):
+            for tenant_id, tenant_ctx in self.context["tenants"].items():
+                for network in tenant_ctx.get("networks", []):
+                    queue.append((tenant_id, network))
+
+        def consume(cache, args):
+            tenant_id, network = args
+            with logging.ExceptionLogger(
+                    LOG,
+                    "Failed to delete network for tenant %s" % tenant_id):
+                self._get_wrapper(cache).delete_network(network)
+
+        broker.run(publish, consume,
+                   self.config["resource_management_workers"])
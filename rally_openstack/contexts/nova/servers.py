@@ -12,9 +12,14 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import threading
+import time
+
+from rally.common import broker
 from rally.common import logging
 from rally.common import utils as rutils
 from rally.common import validation
+from rally import exceptions
 from rally.task import context
 
 from rally_openstack.cleanup import manager as resource_manager
@@ -75,6 +80,20 @@ class ServerGenerator(context.Context):
                     }
                 ]},
                 "minItems": 1
+            },
+            "resource_management_workers": {
+                "description": "The number of tenants to boot servers in "
+                               "simultaneously.",
+                "type": "integer",
+                "minimum": 1
+            },
+            "boot_requests_per_second": {
+                "description": "The maximum rate of server boot requests "
+                               "made by all workers. Not limited by "
+                               "default.",
+                "type": "number",
+                "minimum": 0,
+                "exclusiveMinimum": True
             }
         },
         "required": ["image", "flavor"],
@@ -83,7 +102,8 @@ class ServerGenerator(context.Context):
 
     DEFAULT_CONFIG = {
         "servers_per_tenant": 5,
-        "auto_assign_nic": False
+        "auto_assign_nic": False,
+        "resource_management_workers": 1
     }
 
     def setup(self):
@@ -105,9 +125,30 @@ class ServerGenerator(context.Context):
         flavor_id = types.Flavor(self.context).pre_process(
             resource_spec=flavor, config={})
 
-        for iter_, (user, tenant_id) in enumerate(rutils.iterate_per_tenants(
-                self.context["users"])):
-            LOG.debug("Booting servers for user tenant %s" % user["tenant_id"])
+        rate = self.config.get("boot_requests_per_second")
+        rate_lock = threading.Lock()
+        next_boot_at = [0]
+        errors = []
+
+        def wait_for_rate_limit():
+            # NOTE: every tenant makes servers_per_tenant boot requests, so
+            #   tenants are spaced to keep the average rate of requests.
+            with rate_lock:
+                now = time.time()
+                delay = next_boot_at[0] - now
+                next_boot_at[0] = (max(next_boot_at[0], now)
+                                   + float(servers_per_tenant) / rate)
+            if delay > 0:
+                time.sleep(delay)
+
+        def publish(queue):
+            for iter_, (user, tenant_id) in enumerate(
+                    rutils.iterate_per_tenants(self.context["users"])):
+                queue.append((iter_, user, tenant_id))
+
+        def consume(cache, args):
+            iter_, user, tenant_id = args
+            LOG.debug("Booting servers for user tenant %s" % tenant_id)
             tmp_context = {"user": user,
                            "tenant": self.context["tenants"][tenant_id],
                            "task": self.context["task"],
@@ -122,10 +163,15 @@ class ServerGenerator(context.Context):
                          "flavor_id": flavor_id,
                          "servers_per_tenant": servers_per_tenant})
 
-            servers = nova_scenario._boot_servers(image_id, flavor_id,
-                                                  requests=servers_per_tenant,
-                                                  auto_assign_nic=auto_nic,
-                                                  **kwargs)
+            if rate:
+                wait_for_rate_limit()
+            try:
+                servers = nova_scenario._boot_servers(
+                    image_id, flavor_id, requests=servers_per_tenant,
+                    auto_assign_nic=auto_nic, **kwargs)
+            except Exception as e:
+                errors.append((tenant_id, e))
+                raise
 
             current_servers = [server.id for server in servers]
 
@@ -134,6 +180,17 @@ class ServerGenerator(context.Context):
             self.context["tenants"][tenant_id][
                 "servers"] = current_servers
 
+        broker.run(publish, consume,
+                   self.config["resource_management_workers"])
+
+        if errors:
+            # NOTE: servers of failed tenants are removed at cleanup by
+            #   their names, so there is no need to track them here.
+            raise exceptions.ContextSetupFailure(
+                ctx_name=self.get_name(),
+                msg="Failed to boot servers in %d tenant(s): %s"
+                    % (len(errors), errors[0][1]))
+
     def cleanup(self):
         resource_manager.cleanup(names=["nova.servers"],
                                  users=self.context.get("users", []),
@@ -13,6 +13,8 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import time
+
 from rally.common import logging
 from rally.common import validation
 from rally import exceptions
@@ -81,10 +83,21 @@ class SwiftObjectGenerator(swift_utils.SwiftObjectMixin, context.Context):
         objects_num = containers_num * objects_per_container
         LOG.debug("Creating %d objects using %d threads."
                   % (objects_num, threads))
+        started_at = time.time()
         objects_count = len(self._create_objects(self.context,
                                                  objects_per_container,
                                                  self.config["object_size"],
                                                  threads))
+        duration = time.time() - started_at
+
+        bytes_num = objects_count * self.config["object_size"]
+        self.context["swift_objects"] = {
+            "objects": objects_count,
+            "bytes": bytes_num,
+            "duration": duration,
+            "throughput": bytes_num / duration if duration else None}
+        LOG.info("%d Swift objects (%d bytes) are created in %.2f seconds."
+                 % (objects_count, bytes_num, duration))
         if objects_count != objects_num:
             raise exceptions.ContextSetupFailure(
                 ctx_name=self.get_name(),
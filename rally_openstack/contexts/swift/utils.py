@@ -13,7 +13,7 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
-import tempfile
+import mmap
 
 from rally.common import broker
 from rally.common import utils as rutils
@@ -21,6 +21,62 @@ from rally.common import utils as rutils
 from rally_openstack.scenarios.swift import utils as swift_utils
 
 
+class ObjectPayload(object):
+    """Read-only zero-filled content of swift objects.
+
+    The content is an anonymous read-only memory map, so its pages are not
+    allocated by the OS, and one map is shared by all the uploads. Every
+    upload streams it through its own reader, which copies only the chunk
+    being sent, so concurrent uploads do not share a file position.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self._buffer = mmap.mmap(-1, size, prot=mmap.PROT_READ)
+
+    def reader(self):
+        """Returns a new file-like object which reads the payload."""
+        return PayloadReader(self._buffer)
+
+    def close(self):
+        self._buffer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        self.close()
+
+
+class PayloadReader(object):
+    """File-like reader of ObjectPayload with its own position."""
+
+    def __init__(self, buffer):
+        self._buffer = buffer
+        self._position = 0
+
+    def read(self, size=-1):
+        # NOTE: slicing the map copies the chunk; a memoryview over mmap is
+        #   not available on Python 2.7
+        start = self._position
+        end = len(self._buffer)
+        if size is not None and size >= 0:
+            end = min(start + size, end)
+        self._position = end
+        return self._buffer[start:end]
+
+    def tell(self):
+        return self._position
+
+    def seek(self, offset, whence=0):
+        if whence == 1:
+            offset += self._position
+        elif whence == 2:
+            offset += len(self._buffer)
+        self._position = max(0, min(offset, len(self._buffer)))
+        return self._position
+
+
 class SwiftObjectMixin(object):
     """Mix-in method for Swift Object Context."""
 
@@ -63,6 +119,9 @@ class SwiftObjectMixin(object):
                         threads):
         """Create objects and store results in Rally context.
 
+        Every broker thread uploads objects with its own swift connection
+        per user, so HTTP connections are reused between the uploads.
+
         :param context: dict, Rally context environment
         :param objects_per_container: int, number of objects to create
                                       per container
@@ -73,9 +132,7 @@ class SwiftObjectMixin(object):
         """
         objects = []
 
-        with tempfile.TemporaryFile() as dummy_file:
-            # set dummy file to specified object size
-            dummy_file.truncate(object_size)
+        with ObjectPayload(object_size) as payload:
 
             def publish(queue):
                 for tenant_id in context["tenants"]:
@@ -89,10 +146,9 @@ class SwiftObjectMixin(object):
                 if user["id"] not in cache:
                     cache[user["id"]] = swift_utils.SwiftScenario(
                         {"user": user, "task": context.get("task", {})})
-                dummy_file.seek(0)
                 object_name = cache[user["id"]]._upload_object(
-                    container["container"],
-                    dummy_file)[1]
+                    container["container"], payload.reader(),
+                    content_length=payload.size)[1]
                 container["objects"].append(object_name)
                 objects.append((user["tenant_id"], container["container"],
                                 object_name))
@@ -0,0 +1,191 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Tracing of HTTP requests made by OpenStack clients.
+
+If `CONF.openstack.trace_http_requests` is enabled, every keystoneauth
+session created by `osclients.Keystone` is instrumented, so all the requests
+made by clients in a thread which started the recording are saved together
+with their latency. Scenarios nest the requests into their atomic actions
+and add latency statistics of each endpoint to the output.
+"""
+
+import bisect
+import re
+import threading
+import time
+
+from six.moves.urllib import parse
+
+
+_local = threading.local()
+
+_ID_RE = re.compile(r"^([0-9a-f]{8}-?[0-9a-f]{4}-?[0-9a-f]{4}-?[0-9a-f]{4}-?"
+                    r"[0-9a-f]{12}|[0-9]+)$", re.IGNORECASE)
+
+
+def start():
+    """Start recording HTTP requests made in the current thread."""
+    _local.records = []
+
+
+def stop():
+    """Stop recording HTTP requests and return the recorded ones."""
+    records = pop()
+    _local.records = None
+    return records
+
+
+def is_started():
+    """Check whether HTTP requests of the current thread are recorded."""
+    return getattr(_local, "records", None) is not None
+
+
+def pop():
+    """Return HTTP requests recorded in the current thread so far."""
+    records = getattr(_local, "records", None)
+    if not records:
+        return []
+    _local.records = []
+    return records
+
+
+def get_url_template(url):
+    """Return path of the url with ids replaced by a placeholder."""
+    path = parse.urlparse(url).path
+    return "/".join("{id}" if _ID_RE.match(part) else part
+                    for part in path.split("/")) or "/"
+
+
+def _get_service_type(url, kwargs):
+    endpoint_filter = kwargs.get("endpoint_filter") or {}
+    return (endpoint_filter.get("service_type")
+            or kwargs.get("service_type")
+            or parse.urlparse(url).netloc
+            or "-")
+
+
+def _update_record(record, response):
+    if response is None:
+        return
+    record["url"] = get_url_template(response.url or record["url"])
+    record["status"] = response.status_code
+    content_length = response.headers.get("Content-Length")
+    if content_length is not None and content_length.isdigit():
+        record["bytes"] = int(content_length)
+
+
+def install(session):
+    """Instrument keystoneauth session to record its HTTP requests.
+
+    Requests are recorded only in threads which called `start()`, in other
+    threads the only overhead is a lookup of a thread-local attribute.
+
+    :param session: keystoneauth1.session.Session instance
+    :returns: the same session
+    """
+    request = session.request
+
+    def traced_request(url, method, **kwargs):
+        records = getattr(_local, "records", None)
+        if records is None:
+            return request(url, method, **kwargs)
+
+        record = {"method": method.upper(),
+                  "service_type": _get_service_type(url, kwargs),
+                  "url": get_url_template(url),
+                  "status": None,
+                  "bytes": None,
+                  "started_at": time.time()}
+        try:
+            response = request(url, method, **kwargs)
+        except Exception as e:
+            _update_record(record, getattr(e, "response", None))
+            record["status"] = getattr(e, "http_status", record["status"])
+            raise
+        else:
+            _update_record(record, response)
+        finally:
+            record["finished_at"] = time.time()
+            records.append(record)
+        return response
+
+    session.request = traced_request
+    return session
+
+
+def get_action_name(record):
+    return "%(method)s %(service_type)s %(url)s" % record
+
+
+def _find_parent(atomic_actions, record):
+    for action in atomic_actions:
+        started_at = action.get("started_at")
+        if started_at is None or started_at > record["started_at"]:
+            continue
+        if action.get("finished_at", record["started_at"]) >= (
+                record["started_at"]):
+            return _find_parent(action["children"], record)
+    return atomic_actions
+
+
+def add_to_atomic_actions(atomic_actions, records):
+    """Nest HTTP requests into atomic actions which made them.
+
+    Every request becomes a sub-action of the innermost atomic action which
+    was running when the request started. Sub-actions are inserted in
+    chronological order, so atomic actions which are still running stay the
+    last ones at their level.
+
+    :param atomic_actions: list of atomic actions of scenario
+    :param records: list of recorded HTTP requests
+    """
+    for record in records:
+        parent = _find_parent(atomic_actions, record)
+        action = {"name": get_action_name(record),
+                  "children": [],
+                  "started_at": record["started_at"],
+                  "finished_at": record["finished_at"]}
+        if record["status"] is None or record["status"] >= 400:
+            action["failed"] = True
+        idx = bisect.bisect_right([a.get("started_at") or 0 for a in parent],
+                                  record["started_at"])
+        parent.insert(idx, action)
+
+
+def get_output(records):
+    """Return additive and complete output of HTTP requests.
+
+    :param records: list of recorded HTTP requests
+    :returns: tuple of additive output with latency statistics per endpoint
+        and complete output with a table of all requests
+    """
+    additive = {
+        "title": "HTTP requests latency",
+        "description": "Latency of HTTP requests per endpoint",
+        "chart_plugin": "StatsTable",
+        "data": [[get_action_name(r), r["finished_at"] - r["started_at"]]
+                 for r in records]}
+    complete = {
+        "title": "HTTP requests",
+        "description": "HTTP requests made in the iteration",
+        "chart_plugin": "Table",
+        "data": {"cols": ["Method", "Service", "URL", "Status",
+                          "Latency (sec)", "Bytes"],
+                 "rows": [[r["method"], r["service_type"], r["url"],
+                           r["status"] or "n/a",
+                           round(r["finished_at"] - r["started_at"], 3),
+                           r["bytes"] if r["bytes"] is not None else "n/a"]
+                          for r in records]}}
+    return additive, complete
@@ -14,7 +14,10 @@
 #    under the License.
 
 import abc
+import datetime as dt
+import hashlib
 import os
+import threading
 
 from rally.cli import envutils
 from rally.common import cfg
@@ -25,6 +28,7 @@ from six.moves.urllib import parse
 
 from rally_openstack import consts
 from rally_openstack import credential as oscred
+from rally_openstack import http_trace
 
 
 LOG = logging.getLogger(__name__)
@@ -75,6 +79,106 @@ class AuthenticationFailed(exceptions.AuthenticationFailed):
         return self._helpful_trace
 
 
+def _will_expire_soon(auth_ref):
+    """Checks that token of auth_ref should be refreshed."""
+    if not isinstance(getattr(auth_ref, "expires", None), dt.datetime):
+        return False
+    return auth_ref.will_expire_soon(
+        CONF.openstack.keystone_token_refresh_ahead)
+
+
+class _AuthCache(object):
+    """Process-wide thread-safe cache of keystone tokens.
+
+    An access info object which is stored here includes both token and
+    service catalog, so all clients of the same credential can share them
+    instead of authenticating separately.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._locks = {}
+        self._auth_refs = {}
+
+    def lock(self, key):
+        """Returns a lock to prevent simultaneous authentication by key."""
+        with self._lock:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def get(self, key):
+        auth_ref = self._auth_refs.get(key)
+        if auth_ref is None or _will_expire_soon(auth_ref):
+            return None
+        return auth_ref
+
+    def set(self, key, auth_ref):
+        with self._lock:
+            self._auth_refs[key] = auth_ref
+
+    def invalidate(self, key, auth_ref):
+        """Drops the token (e.g. revoked one) of key.
+
+        The entry is kept if another client has already stored a new token.
+        The lock of key is kept as well, since other clients may hold or wait
+        for it.
+        """
+        with self._lock:
+            if self._auth_refs.get(key) is auth_ref:
+                self._auth_refs.pop(key)
+
+    def clear(self):
+        with self._lock:
+            self._auth_refs.clear()
+            self._locks.clear()
+
+
+_auth_cache = _AuthCache()
+
+_http_adapters = {}
+_http_adapters_lock = threading.Lock()
+
+
+def _get_http_adapter(url):
+    """Returns HTTP adapter shared by all clients of the endpoint host.
+
+    The adapter holds a connection pool, so connections to the endpoint
+    are reused by all credentials instead of being opened by each of them.
+
+    :param url: URL of the request
+    """
+    from keystoneauth1 import session
+    import requests
+
+    url = parse.urlparse(url)
+    key = (url.scheme, url.netloc)
+    with _http_adapters_lock:
+        if key not in _http_adapters:
+            if CONF.openstack.http_tcp_keepalive:
+                adapter_cls = session.TCPKeepAliveAdapter
+            else:
+                adapter_cls = requests.adapters.HTTPAdapter
+            _http_adapters[key] = adapter_cls(
+                pool_connections=1,
+                pool_maxsize=CONF.openstack.http_pool_maxsize)
+        return _http_adapters[key]
+
+
+def _get_http_session():
+    """Returns new requests session which uses shared HTTP adapters.
+
+    Every keystoneauth session creates its own requests session (and
+    connection pool) by default. Cookies and default headers have to stay
+    private to the session, so only the adapters are shared.
+    """
+    import requests
+
+    http_session = requests.Session()
+    # NOTE: requests asks for an adapter for every request, so the pool of
+    #   the endpoint host is picked here instead of mounting it in advance.
+    http_session.get_adapter = _get_http_adapter
+    return http_session
+
+
 def configure(name, default_version=None, default_service_type=None,
               supported_versions=None):
     """OpenStack client class wrapper.
@@ -117,6 +221,9 @@ class OSClient(plugin.Plugin):
                         " argument." % self.__class__.__name__)
             self.credential.api_info.update(api_info)
         self.cache = cache_obj if cache_obj is not None else {}
+        # NOTE: the key of client without arguments is computed only once,
+        #   since it is the most frequent call
+        self._cache_key = None
 
     def choose_version(self, version=None):
         """Return version string.
@@ -237,9 +344,14 @@ class OSClient(plugin.Plugin):
 
     def __call__(self, *args, **kwargs):
         """Return initialized client instance."""
-        key = "{0}{1}{2}".format(self.get_name(),
-                                 str(args) if args else "",
-                                 str(kwargs) if kwargs else "")
+        if self._cache_key is None:
+            self._cache_key = self.get_name()
+        if args or kwargs:
+            key = "{0}{1}{2}".format(self._cache_key,
+                                     str(args) if args else "",
+                                     str(kwargs) if kwargs else "")
+        else:
+            key = self._cache_key
         if key not in self.cache:
             self.cache[key] = self.create_client(*args, **kwargs)
         return self.cache[key]
@@ -268,9 +380,9 @@ class Keystone(OSClient):
     @property
     def auth_ref(self):
         try:
-            if "keystone_auth_ref" not in self.cache:
-                sess, plugin = self.get_session()
-                self.cache["keystone_auth_ref"] = plugin.get_access(sess)
+            if ("keystone_auth_ref" not in self.cache
+                    or _will_expire_soon(self.cache["keystone_auth_ref"])):
+                self.cache["keystone_auth_ref"] = self._get_auth_ref()
         except Exception as original_e:
             e = AuthenticationFailed(
                 error=original_e,
@@ -288,6 +400,64 @@ class Keystone(OSClient):
             raise e
         return self.cache["keystone_auth_ref"]
 
+    def _get_auth_cache_key(self):
+        # NOTE: the cache lives as long as the process, so the password is
+        #   not kept in the key as is.
+        password = (self.credential.password or "").encode("utf-8")
+        return (self.credential.auth_url, self.credential.username,
+                hashlib.sha256(password).hexdigest(),
+                self.credential.tenant_name,
+                self.credential.domain_name,
+                self.credential.user_domain_name,
+                self.credential.project_domain_name,
+                self.credential.region_name,
+                self.choose_version())
+
+    @staticmethod
+    def _authenticate(sess, plugin):
+        if _will_expire_soon(plugin.auth_ref):
+            plugin.invalidate()
+        return plugin.get_access(sess)
+
+    def _get_auth_ref(self):
+        """Authenticate or take a fresh token from the process-wide cache."""
+        sess, plugin = self.get_session()
+        if not CONF.openstack.share_keystone_auth:
+            return self._authenticate(sess, plugin)
+
+        key = self._get_auth_cache_key()
+        with _auth_cache.lock(key):
+            auth_ref = _auth_cache.get(key)
+            if auth_ref is None:
+                auth_ref = self._authenticate(sess, plugin)
+                _auth_cache.set(key, auth_ref)
+            else:
+                # otherwise the session authenticates again by itself
+                plugin.auth_ref = auth_ref
+        return auth_ref
+
+    def _evict_on_invalidate(self, plugin):
+        """Drop the shared token once the plugin invalidates it.
+
+        keystoneauth invalidates the plugin if a request fails with 401, so
+        a revoked token is not handed out to other clients anymore.
+        """
+        key = self._get_auth_cache_key()
+        invalidate = plugin.invalidate
+
+        def evicting_invalidate():
+            if plugin.auth_ref is not None:
+                _auth_cache.invalidate(key, plugin.auth_ref)
+            return invalidate()
+
+        plugin.invalidate = evicting_invalidate
+
+    @staticmethod
+    def _get_session_kwargs():
+        if CONF.openstack.share_http_connection_pool:
+            return {"session": _get_http_session()}
+        return {}
+
     def get_session(self, version=None):
         key = "keystone_session_and_plugin_%s" % version
         if key not in self.cache:
@@ -315,7 +485,10 @@ class Keystone(OSClient):
                     verify=(self.credential.https_cacert or
                             not self.credential.https_insecure),
                     cert=self.credential.https_cert,
-                    timeout=CONF.openstack_client_http_timeout)
+                    timeout=CONF.openstack_client_http_timeout,
+                    **self._get_session_kwargs())
+                if CONF.openstack.trace_http_requests:
+                    http_trace.install(temp_session)
                 version = str(discover.Discover(
                     temp_session,
                     password_args["auth_url"]).version_data()[0]["version"][0])
@@ -327,12 +500,20 @@ class Keystone(OSClient):
                     "project_domain_name": self.credential.project_domain_name
                 })
             identity_plugin = identity.Password(**password_args)
+            if CONF.openstack.share_keystone_auth:
+                auth_ref = _auth_cache.get(self._get_auth_cache_key())
+                if auth_ref is not None:
+                    identity_plugin.auth_ref = auth_ref
+                self._evict_on_invalidate(identity_plugin)
             sess = session.Session(
                 auth=identity_plugin,
                 verify=(self.credential.https_cacert or
                         not self.credential.https_insecure),
                 cert=self.credential.https_cert,
-                timeout=CONF.openstack_client_http_timeout)
+                timeout=CONF.openstack_client_http_timeout,
+                **self._get_session_kwargs())
+            if CONF.openstack.trace_http_requests:
+                http_trace.install(sess)
             self.cache[key] = (sess, identity_plugin)
         return self.cache[key]
 
@@ -892,11 +1073,19 @@ class Clients(object):
         self.credential = credential
         self.api_info = api_info or {}
         self.cache = cache or {}
+        self._handles = []
 
     def __getattr__(self, client_name):
         """Lazy load of clients."""
-        return OSClient.get(client_name)(self.credential, self.api_info,
-                                         self.cache)
+        if client_name.startswith("_"):
+            raise AttributeError(client_name)
+        handle = OSClient.get(client_name)(self.credential, self.api_info,
+                                           self.cache)
+        # NOTE: the resolved handle is stored as an attribute, so next
+        #   lookups of the client do not reach __getattr__ at all
+        setattr(self, client_name, handle)
+        self._handles.append(client_name)
+        return handle
 
     @classmethod
     def create_from_env(cls):
@@ -919,6 +1108,9 @@ class Clients(object):
     def clear(self):
         """Remove all cached client handles."""
         self.cache = {}
+        for client_name in self._handles:
+            self.__dict__.pop(client_name, None)
+        self._handles = []
 
     def verified_keystone(self):
         """Ensure keystone endpoints are valid and then authenticate
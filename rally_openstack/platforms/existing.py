@@ -19,6 +19,8 @@ import traceback
 from rally.common import cfg
 from rally.common import logging
 from rally.env import platform
+from rally_openstack.cleanup import manager as resource_manager
+from rally_openstack import credential
 from rally_openstack import osclients
 
 
@@ -161,14 +163,24 @@ class OpenStack(platform.Platform):
         pass
 
     def cleanup(self, task_uuid=None):
-        return {
-            "message": "Coming soon!",
-            "discovered": 0,
-            "deleted": 0,
-            "failed": 0,
-            "resources": {},
-            "errors": []
-        }
+        """Delete resources recorded to the cleanup journal of the task.
+
+        Resources are recorded to the journal only if
+        `[openstack] cleanup_journal` option is enabled.
+        """
+        if not task_uuid or not (self.platform_data or {}).get("admin"):
+            return {
+                "message": "Coming soon!",
+                "discovered": 0,
+                "deleted": 0,
+                "failed": 0,
+                "resources": {},
+                "errors": []
+            }
+        admin = copy.deepcopy(self.platform_data["admin"])
+        admin["api_info"] = self.platform_data.get("api_info", {})
+        admin = {"credential": credential.OpenStackCredential(**admin)}
+        return resource_manager.cleanup_by_journal(task_uuid, admin)
 
     def check_health(self):
         """Check whatever platform is alive."""
@@ -0,0 +1,292 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+"""Adaptive polling of resource statuses.
+
+Fixed poll intervals either load the APIs by polling too often or inflate
+the measured duration of atomic actions by up to one interval. If
+`CONF.openstack.adaptive_polling` is enabled, `wait_for_status` polls with
+exponential backoff and jitter, which is capped by the configured poll
+interval of the resource. Once a few resources of the same kind became
+ready, it sleeps until the time in which most of them became ready and
+polls more often while the resource is expected to become ready.
+
+Number of polls and wasted wait (the time between the last poll which
+found the resource not ready and the poll which found it ready) of every
+wait are recorded for scenarios, which add them to their output.
+"""
+
+import collections
+import random
+import threading
+import time
+
+from rally.common import cfg
+from rally import exceptions
+from rally.task import utils
+
+
+CONF = cfg.CONF
+
+# the minimum number of earlier waits to predict when a resource is ready
+MIN_HISTORY_SIZE = 5
+# the lower and upper percentiles of the time range in which resources are
+#   polled more often
+WINDOW_PERCENTILES = (0.1, 0.9)
+# the maximum number of polls within the time range
+WINDOW_POLLS = 10
+JITTER = 0.25
+
+_history = {}
+_history_lock = threading.Lock()
+
+_local = threading.local()
+
+
+def start():
+    """Start recording polls made in the current thread."""
+    _local.records = []
+
+
+def stop():
+    """Stop recording polls and return the recorded ones."""
+    records = pop()
+    _local.records = None
+    return records
+
+
+def is_started():
+    """Check whether polls of the current thread are recorded."""
+    return getattr(_local, "records", None) is not None
+
+
+def pop():
+    """Return polls recorded in the current thread so far."""
+    records = getattr(_local, "records", None)
+    if not records:
+        return []
+    _local.records = []
+    return records
+
+
+def reset_history():
+    """Forget durations of earlier waits."""
+    with _history_lock:
+        _history.clear()
+
+
+def _percentile(sorted_values, percent):
+    return sorted_values[int(round((len(sorted_values) - 1) * percent))]
+
+
+class Poller(object):
+    """Computes delays between polls of a resource.
+
+    :param key: kind of the resource, durations of earlier waits for
+        resources of the same kind are used to predict when the resource
+        becomes ready
+    :param check_interval: the maximum delay between polls
+    """
+
+    def __init__(self, key, check_interval):
+        self.key = key
+        self.max_interval = check_interval
+        self.min_interval = min(CONF.openstack.adaptive_polling_min_interval,
+                                check_interval)
+        self.attempt = 0
+        self.window = None
+        with _history_lock:
+            durations = sorted(_history.get(self.key, []))
+        if len(durations) >= MIN_HISTORY_SIZE:
+            self.window = tuple(_percentile(durations, p)
+                                for p in WINDOW_PERCENTILES)
+
+    def _backoff(self):
+        delay = min(self.max_interval, self.min_interval * 2 ** self.attempt)
+        self.attempt += 1
+        return delay * random.uniform(1 - JITTER, 1)
+
+    def get_delay(self, elapsed):
+        """Returns delay before the next poll.
+
+        :param elapsed: seconds elapsed since the beginning of the wait
+        """
+        if self.window is not None:
+            start, end = self.window
+            if elapsed < start:
+                # the resource is unlikely to be ready yet
+                return start - elapsed
+            if elapsed <= end:
+                self.attempt = 0
+                return max(self.min_interval,
+                           min(self.max_interval,
+                               (end - start) / WINDOW_POLLS))
+        return self._backoff()
+
+    def add_duration(self, duration):
+        """Saves the duration of the wait to predict the next waits."""
+        with _history_lock:
+            if self.key not in _history:
+                _history[self.key] = collections.deque(
+                    maxlen=CONF.openstack.adaptive_polling_history_size)
+            _history[self.key].append(duration)
+
+
+def _get_key(resource, ready_statuses, check_deletion):
+    return (resource.__class__.__name__, tuple(sorted(ready_statuses)),
+            check_deletion)
+
+
+def _record(resource, started_at, finished_at, polls, wasted):
+    records = getattr(_local, "records", None)
+    if records is not None:
+        records.append({"resource": resource.__class__.__name__,
+                        "started_at": started_at,
+                        "finished_at": finished_at,
+                        "polls": polls,
+                        "wasted": wasted})
+
+
+def wait_for_status(*args, **kwargs):
+    """Waits for the resource to get one of ready statuses.
+
+    It has the same arguments as `rally.task.utils.wait_for_status`, which
+    is used if adaptive polling is disabled.
+    """
+    if not CONF.openstack.adaptive_polling:
+        return utils.wait_for_status(*args, **kwargs)
+    return _wait_for_status(*args, **kwargs)
+
+
+def _wait_for_status(resource, ready_statuses, failure_statuses=["error"],
+                     status_attr="status", update_resource=None,
+                     timeout=60, check_interval=1, check_deletion=False,
+                     id_attr="id"):
+    resource_repr = getattr(resource, "name", repr(resource))
+    if not isinstance(ready_statuses, (set, list, tuple)):
+        raise ValueError("Ready statuses should be supplied as set, list or "
+                         "tuple")
+    if failure_statuses and not isinstance(failure_statuses,
+                                           (set, list, tuple)):
+        raise ValueError("Failure statuses should be supplied as set, list or "
+                         "tuple")
+    ready_statuses = set(s.upper() for s in ready_statuses)
+    failure_statuses = set(s.upper() for s in failure_statuses or [])
+    if ready_statuses & failure_statuses:
+        raise ValueError(
+            "Can't wait for resource's %s status. Ready and Failure "
+            "statuses conflict." % resource_repr)
+    if not ready_statuses:
+        raise ValueError(
+            "Can't wait for resource's %s status. No ready "
+            "statuses provided" % resource_repr)
+    if not update_resource:
+        raise ValueError(
+            "Can't wait for resource's %s status. No update method."
+            % resource_repr)
+
+    poller = Poller(_get_key(resource, ready_statuses, check_deletion),
+                    check_interval)
+    start = time.time()
+    polls = 0
+    last_poll = None
+
+    def finish():
+        finished_at = time.time()
+        if last_poll is None:
+            # the first poll found the resource ready, nothing was wasted
+            wasted = 0
+            poller.add_duration(finished_at - start)
+        else:
+            wasted = finished_at - last_poll
+            poller.add_duration((last_poll + finished_at) / 2 - start)
+        _record(resource, start, finished_at, polls, wasted)
+
+    while True:
+        polls += 1
+        try:
+            if id_attr == "id":
+                resource = update_resource(resource)
+            else:
+                resource = update_resource(resource, id_attr=id_attr)
+        except exceptions.GetResourceNotFound:
+            if check_deletion:
+                finish()
+                return
+            raise
+        status = utils.get_status(resource, status_attr)
+
+        if status in ready_statuses:
+            finish()
+            return resource
+        if status in failure_statuses:
+            raise exceptions.GetResourceErrorStatus(
+                resource=resource,
+                status=status,
+                fault="Status in failure list %s" % str(failure_statuses))
+
+        last_poll = time.time()
+        elapsed = last_poll - start
+        # do not sleep much longer than the timeout
+        time.sleep(min(poller.get_delay(elapsed),
+                       max(timeout - elapsed, 0) + poller.min_interval))
+        if time.time() - start > timeout:
+            raise exceptions.TimeoutException(
+                desired_status="('%s')" % "', '".join(ready_statuses),
+                resource_name=resource_repr,
+                resource_type=resource.__class__.__name__,
+                resource_id=getattr(resource, id_attr, "<no id>"),
+                resource_status=status,
+                timeout=timeout)
+
+
+def _find_action(atomic_actions, started_at):
+    for action in atomic_actions:
+        if (action.get("started_at") is not None
+                and action["started_at"] <= started_at
+                and action.get("finished_at", started_at) >= started_at):
+            return _find_action(action["children"], started_at) or action
+    return None
+
+
+def get_output(atomic_actions, records):
+    """Return additive and complete output of polls.
+
+    :param atomic_actions: list of atomic actions of scenario
+    :param records: list of recorded waits
+    :returns: tuple of additive output with wasted wait per atomic action and
+        complete output with a table of all waits
+    """
+    rows = []
+    for record in records:
+        action = _find_action(atomic_actions, record["started_at"])
+        rows.append([action["name"] if action else "n/a",
+                     record["resource"],
+                     record["polls"],
+                     round(record["wasted"], 3),
+                     round(record["finished_at"] - record["started_at"], 3)])
+    additive = {
+        "title": "Wasted wait per atomic action",
+        "description": "Time between the last poll which found a resource "
+                       "not ready and the poll which found it ready",
+        "chart_plugin": "StatsTable",
+        "data": [[row[0], row[3]] for row in rows]}
+    complete = {
+        "title": "Polls",
+        "description": "Waits for statuses of resources in the iteration",
+        "chart_plugin": "Table",
+        "data": {"cols": ["Atomic action", "Resource", "Polls",
+                          "Wasted wait (sec)", "Duration (sec)"],
+                 "rows": rows}}
+    return additive, complete
@@ -13,22 +13,37 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import collections
 import functools
 import random
+import threading
 
-from osprofiler import profiler
 from rally.common import cfg
 from rally.common.plugin import plugin
 from rally.task import context
 from rally.task import scenario
 
+from rally_openstack import http_trace
 from rally_openstack import osclients
+from rally_openstack import polling
 
 
 configure = functools.partial(scenario.configure, platform="openstack")
 
 CONF = cfg.CONF
 
+# NOTE: the context is copied for every iteration, so the state of user
+#   choice methods which depend on previous iterations is kept per process
+#   (and per task) until the users context is cleaned up.
+_user_choice_lock = threading.Lock()
+_lru_users = {}
+
+
+def forget_user_choices(task_uuid):
+    """Drop the state of user choice methods of the task."""
+    with _user_choice_lock:
+        _lru_users.pop(task_uuid, None)
+
 
 @context.add_default_context("users@openstack", {})
 @plugin.default_meta(inherit=False)
@@ -57,30 +72,68 @@ class OpenStackScenario(scenario.Scenario):
 
         self._init_profiler(context)
 
+        if ((CONF.openstack.trace_http_requests
+                or CONF.openstack.adaptive_polling)
+                and callable(getattr(self, "run", None))):
+            self.run = self._record_iteration(self.run)
+
     def _choose_user(self, context):
         """Choose one user from users context
 
         We are choosing on each iteration one user
 
         """
-        if context["user_choice_method"] == "random":
+        method = context["user_choice_method"]
+        if method == "random":
             user = random.choice(context["users"])
-            tenant = context["tenants"][user["tenant_id"]]
+            tenant_id = user["tenant_id"]
+        elif method == "random_tenant":
+            # every tenant is chosen equally often, no matter how many users
+            #   it has
+            tenant_ids = self._get_tenant_ids(context)
+            tenant_id = random.choice(tenant_ids)
+            user = random.choice(context["tenants"][tenant_id]["users"])
+        elif method == "least_recently_used":
+            user = context["users"][self._get_lru_user_index(context)]
+            tenant_id = user["tenant_id"]
         else:
-            # Second and last case - 'round_robin'.
-            tenants_amount = len(context["tenants"])
+            # The last case - 'round_robin'.
+            tenant_ids = self._get_tenant_ids(context)
+            tenants_amount = len(tenant_ids)
             # NOTE(amaretskiy): iteration is subtracted by `1' because it
             #                   starts from `1' but we count from `0'
             iteration = context["iteration"] - 1
             tenant_index = int(iteration % tenants_amount)
-            tenant_id = sorted(context["tenants"].keys())[tenant_index]
-            tenant = context["tenants"][tenant_id]
+            tenant_id = tenant_ids[tenant_index]
             users = context["tenants"][tenant_id]["users"]
             user_index = int((iteration / tenants_amount) % len(users))
             user = users[user_index]
+        tenant = context["tenants"][tenant_id]
 
         context["user"], context["tenant"] = user, tenant
 
+    @staticmethod
+    def _get_tenant_ids(context):
+        # NOTE: sorted ids of tenants are precomputed by users context
+        return context.get("tenant_ids") or sorted(context["tenants"])
+
+    @staticmethod
+    def _get_lru_user_index(context):
+        """Returns index of the user which was not chosen for the longest time.
+
+        Users are rotated in a queue shuffled once per process, which makes
+        the choice O(1).
+        """
+        task_uuid = context.get("task", {}).get("uuid")
+        with _user_choice_lock:
+            queue = _lru_users.get(task_uuid)
+            if queue is None or len(queue) != len(context["users"]):
+                indexes = list(range(len(context["users"])))
+                random.shuffle(indexes)
+                queue = _lru_users[task_uuid] = collections.deque(indexes)
+            queue.rotate(-1)
+            return queue[-1]
+
     def clients(self, client_type, version=None):
         """Returns a python openstack client of the requested type.
 
@@ -107,6 +160,41 @@ class OpenStackScenario(scenario.Scenario):
 
         return client(version) if version is not None else client()
 
+    def _record_iteration(self, run):
+        """Record HTTP requests and polls made while the iteration runs.
+
+        Recording stops as soon as the iteration ends, so requests made by
+        other code in the same thread (e.g. cleanup of contexts with the
+        serial runner) are not recorded. Requests are nested into atomic
+        actions and added with polls to the output of the scenario.
+        """
+        @functools.wraps(run)
+        def wrapper(*args, **kwargs):
+            # NOTE: scenarios may run other scenarios, which must not take
+            #   over the recording of the outer one.
+            trace = (CONF.openstack.trace_http_requests
+                     and not http_trace.is_started())
+            poll = CONF.openstack.adaptive_polling and not polling.is_started()
+            if trace:
+                http_trace.start()
+            if poll:
+                polling.start()
+            try:
+                return run(*args, **kwargs)
+            finally:
+                if trace:
+                    records = http_trace.stop()
+                    if records:
+                        http_trace.add_to_atomic_actions(
+                            self._atomic_actions, records)
+                        self.add_output(*http_trace.get_output(records))
+                if poll:
+                    polls = polling.stop()
+                    if polls:
+                        self.add_output(*polling.get_output(
+                            self._atomic_actions, polls))
+        return wrapper
+
     def _init_profiler(self, context):
         """Inits the profiler."""
         if not CONF.openstack.enable_profiler:
@@ -128,6 +216,9 @@ class OpenStackScenario(scenario.Scenario):
                     profiler_conn_str = cred.profiler_conn_str
             if profiler_hmac_key is None:
                 return
+
+            from osprofiler import profiler
+
             profiler.init(profiler_hmac_key)
             trace_id = profiler.get().get_base_id()
             complete_data = {"title": "OSProfiler Trace-ID",
@@ -15,8 +15,8 @@
 
 from rally.common import cfg
 from rally.task import atomic
-from rally.task import utils
 
+from rally_openstack import polling
 from rally_openstack import scenario
 
 
@@ -55,7 +55,7 @@ class EC2Scenario(scenario.OpenStackScenario):
         servers = [instance for instance in reservation.instances]
 
         self.sleep_between(CONF.openstack.ec2_server_boot_prepoll_delay)
-        servers = [utils.wait_for_status(
+        servers = [polling.wait_for_status(
             server,
             ready_statuses=["RUNNING"],
             update_resource=self._update_resource,
@@ -19,6 +19,7 @@ from rally.task import utils
 from rally.task import validation
 
 from rally_openstack import consts
+from rally_openstack import polling
 from rally_openstack import scenario
 from rally_openstack.services.grafana import grafana as grafana_service
 
@@ -67,7 +68,7 @@ class PushMetricsInstance(scenario.OpenStackScenario):
                                                      userdata=userdata)
         LOG.info("Server %s create started" % seed)
         self.sleep_between(CONF.openstack.nova_server_boot_prepoll_delay)
-        utils.wait_for_status(
+        polling.wait_for_status(
             server,
             ready_statuses=["ACTIVE"],
             update_resource=utils.get_from_manager(),
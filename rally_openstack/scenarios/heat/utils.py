@@ -13,6 +13,8 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import time
+
 from rally.common import cfg
 from rally.common import logging
 from rally import exceptions
@@ -20,6 +22,8 @@ from rally.task import atomic
 from rally.task import utils
 import requests
 
+from rally_openstack.cleanup import journal
+from rally_openstack import polling
 from rally_openstack import scenario
 
 
@@ -38,6 +42,7 @@ class HeatScenario(scenario.OpenStackScenario):
 
         return list(self.clients("heat").stacks.list())
 
+    @journal.journaled("heat.stacks")
     @atomic.action_timer("heat.create_stack")
     def _create_stack(self, template, parameters=None,
                       files=None, environment=None):
@@ -67,7 +72,7 @@ class HeatScenario(scenario.OpenStackScenario):
 
         self.sleep_between(CONF.openstack.heat_stack_create_prepoll_delay)
 
-        stack = utils.wait_for_status(
+        stack = polling.wait_for_status(
             stack,
             ready_statuses=["CREATE_COMPLETE"],
             failure_statuses=["CREATE_FAILED", "ERROR"],
@@ -77,6 +82,93 @@ class HeatScenario(scenario.OpenStackScenario):
 
         return stack
 
+    @journal.journaled("heat.stacks")
+    @atomic.action_timer("heat.create_stacks")
+    def _create_stacks(self, template, count, parameters=None,
+                       files=None, environment=None):
+        """Create several stacks at once.
+
+        All create requests are sent first and then the stacks are awaited
+        together by a single poller.
+
+        :param template: template with stack description. It is sent as is,
+            so a template serialized once can be reused for all stacks.
+        :param count: the number of stacks to create
+        :param parameters: template parameters used during stack creation
+        :param files: additional files used in template
+        :param environment: stack environment definition
+
+        :returns: list of stacks
+        """
+        stack_ids = []
+        for i in range(count):
+            stack = self.clients("heat").stacks.create(
+                stack_name=self.generate_random_name(),
+                disable_rollback=True,
+                parameters=parameters or {},
+                template=template,
+                files=files or {},
+                environment=environment or {})
+            stack_ids.append(stack["stack"]["id"])
+
+        self.sleep_between(CONF.openstack.heat_stack_create_prepoll_delay)
+
+        return self._wait_for_stacks_status(
+            stack_ids,
+            ready_statuses=["CREATE_COMPLETE"],
+            failure_statuses=["CREATE_FAILED", "ERROR"],
+            timeout=CONF.openstack.heat_stack_create_timeout,
+            check_interval=CONF.openstack.heat_stack_create_poll_interval)
+
+    def _wait_for_stacks_status(self, stack_ids, ready_statuses,
+                                failure_statuses, timeout=60,
+                                check_interval=1):
+        """Wait for all stacks to reach one of the ready statuses.
+
+        All pending stacks are refreshed by a single stacks.list call per
+        check interval.
+
+        :param stack_ids: list of IDs of stacks to wait for
+        :param ready_statuses: list of statuses which stacks should reach
+        :param failure_statuses: list of statuses which mean a failure
+        :param timeout: timeout in seconds after which a TimeoutException
+            will be raised
+        :param check_interval: interval in seconds between the two
+            consecutive list calls
+        :returns: list of stacks in the order of stack_ids
+        """
+        pending = set(stack_ids)
+        ready = {}
+        start = time.time()
+        while True:
+            listed = dict((stack.id, stack)
+                          for stack in self.clients("heat").stacks.list())
+            for stack_id in list(pending):
+                if stack_id not in listed:
+                    raise exceptions.GetResourceNotFound(resource=stack_id)
+                stack = listed[stack_id]
+                status = utils.get_status(stack)
+                if status in ready_statuses:
+                    ready[stack_id] = stack
+                    pending.remove(stack_id)
+                elif status in failure_statuses:
+                    raise exceptions.GetResourceErrorStatus(
+                        resource=stack, status=status,
+                        fault=getattr(stack, "stack_status_reason", "n/a"))
+            if not pending:
+                break
+            if time.time() - start > timeout:
+                stack = listed[list(pending)[0]]
+                raise exceptions.TimeoutException(
+                    desired_status="('%s')" % "', '".join(ready_statuses),
+                    resource_name=getattr(stack, "stack_name", stack.id),
+                    resource_type=stack.__class__.__name__,
+                    resource_id=stack.id,
+                    resource_status=utils.get_status(stack),
+                    timeout=timeout)
+            time.sleep(check_interval)
+        return [ready[stack_id] for stack_id in stack_ids]
+
     @atomic.action_timer("heat.update_stack")
     def _update_stack(self, stack, template, parameters=None,
                       files=None, environment=None):
@@ -103,7 +195,7 @@ class HeatScenario(scenario.OpenStackScenario):
 
         self.sleep_between(CONF.openstack.heat_stack_update_prepoll_delay)
 
-        stack = utils.wait_for_status(
+        stack = polling.wait_for_status(
             stack,
             ready_statuses=["UPDATE_COMPLETE"],
             failure_statuses=["UPDATE_FAILED", "ERROR"],
@@ -121,7 +213,7 @@ class HeatScenario(scenario.OpenStackScenario):
         :param stack: stack that needs to be checked
         """
         self.clients("heat").actions.check(stack.id)
-        utils.wait_for_status(
+        polling.wait_for_status(
             stack,
             ready_statuses=["CHECK_COMPLETE"],
             failure_statuses=["CHECK_FAILED", "ERROR"],
@@ -138,7 +230,7 @@ class HeatScenario(scenario.OpenStackScenario):
         :param stack: stack object
         """
         stack.delete()
-        utils.wait_for_status(
+        polling.wait_for_status(
             stack,
             ready_statuses=["DELETE_COMPLETE"],
             failure_statuses=["DELETE_FAILED", "ERROR"],
@@ -155,7 +247,7 @@ class HeatScenario(scenario.OpenStackScenario):
         """
 
         self.clients("heat").actions.suspend(stack.id)
-        utils.wait_for_status(
+        polling.wait_for_status(
             stack,
             ready_statuses=["SUSPEND_COMPLETE"],
             failure_statuses=["SUSPEND_FAILED", "ERROR"],
@@ -171,7 +263,7 @@ class HeatScenario(scenario.OpenStackScenario):
         """
 
         self.clients("heat").actions.resume(stack.id)
-        utils.wait_for_status(
+        polling.wait_for_status(
             stack,
             ready_statuses=["RESUME_COMPLETE"],
             failure_statuses=["RESUME_FAILED", "ERROR"],
@@ -188,7 +280,7 @@ class HeatScenario(scenario.OpenStackScenario):
         """
         snapshot = self.clients("heat").stacks.snapshot(
             stack.id)
-        utils.wait_for_status(
+        polling.wait_for_status(
             stack,
             ready_statuses=["SNAPSHOT_COMPLETE"],
             failure_statuses=["SNAPSHOT_FAILED", "ERROR"],
@@ -205,7 +297,7 @@ class HeatScenario(scenario.OpenStackScenario):
         :param snapshot_id: id of given snapshot
         """
         self.clients("heat").stacks.restore(stack.id, snapshot_id)
-        utils.wait_for_status(
+        polling.wait_for_status(
             stack,
             ready_statuses=["RESTORE_COMPLETE"],
             failure_statuses=["RESTORE_FAILED", "ERROR"],
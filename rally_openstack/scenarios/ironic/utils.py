@@ -19,6 +19,7 @@ from rally.common import cfg
 from rally.task import atomic
 from rally.task import utils
 
+from rally_openstack import polling
 from rally_openstack import scenario
 
 
@@ -58,7 +59,7 @@ class IronicScenario(scenario.OpenStackScenario):
                                                         **kwargs)
 
         self.sleep_between(CONF.openstack.ironic_node_create_poll_interval)
-        node = utils.wait_for_status(
+        node = polling.wait_for_status(
             node,
             ready_statuses=["AVAILABLE"],
             update_resource=utils.get_from_manager(),
@@ -101,7 +102,7 @@ class IronicScenario(scenario.OpenStackScenario):
         """
         self.admin_clients("ironic").node.delete(node.uuid)
 
-        utils.wait_for_status(
+        polling.wait_for_status(
             node,
             ready_statuses=["deleted"],
             check_deletion=True,
@@ -17,17 +17,13 @@ import random
 import string
 import time
 
-from kubernetes import client as k8s_config
-from kubernetes.client import api_client
-from kubernetes.client.apis import core_v1_api
-from kubernetes.client.rest import ApiException
-
 from rally.common import cfg
 from rally.common import utils as common_utils
 from rally import exceptions
 from rally.task import atomic
 from rally.task import utils
 
+from rally_openstack import polling
 from rally_openstack import scenario
 
 
@@ -112,7 +108,7 @@ class MagnumScenario(scenario.OpenStackScenario):
 
         common_utils.interruptable_sleep(
             CONF.openstack.magnum_cluster_create_prepoll_delay)
-        cluster = utils.wait_for_status(
+        cluster = polling.wait_for_status(
             cluster,
             ready_statuses=["CREATE_COMPLETE"],
             failure_statuses=["CREATE_FAILED", "ERROR"],
@@ -149,6 +145,10 @@ class MagnumScenario(scenario.OpenStackScenario):
         return self.clients("magnum").certificates.create(**csr_req)
 
     def _get_k8s_api_client(self):
+        from kubernetes import client as k8s_config
+        from kubernetes.client import api_client
+        from kubernetes.client.apis import core_v1_api
+
         cluster_uuid = self.context["tenant"]["cluster"]
         cluster = self._get_cluster(cluster_uuid)
         cluster_template = self._get_cluster_template(
@@ -195,6 +195,8 @@ class MagnumScenario(scenario.OpenStackScenario):
 
         :param manifest: manifest use to create the pod
         """
+        from kubernetes.client.rest import ApiException
+
         k8s_api = self._get_k8s_api_client()
         podname = manifest["metadata"]["name"] + "-"
         for i in range(5):
@@ -20,7 +20,9 @@ from rally import exceptions
 from rally.task import atomic
 from rally.task import utils
 
+from rally_openstack.cleanup import journal
 from rally_openstack.contexts.manila import consts
+from rally_openstack import polling
 from rally_openstack import scenario
 
 
@@ -30,6 +32,7 @@ CONF = cfg.CONF
 class ManilaScenario(scenario.OpenStackScenario):
     """Base class for Manila scenarios with basic atomic actions."""
 
+    @journal.journaled("manila.shares")
     @atomic.action_timer("manila.create_share")
     def _create_share(self, share_proto, size=1, **kwargs):
         """Create a share.
@@ -61,7 +64,7 @@ class ManilaScenario(scenario.OpenStackScenario):
             share_proto, size, **kwargs)
 
         self.sleep_between(CONF.openstack.manila_share_create_prepoll_delay)
-        share = utils.wait_for_status(
+        share = polling.wait_for_status(
             share,
             ready_statuses=["available"],
             update_resource=utils.get_from_manager(),
@@ -78,7 +81,7 @@ class ManilaScenario(scenario.OpenStackScenario):
         """
         share.delete()
         error_statuses = ("error_deleting", )
-        utils.wait_for_status(
+        polling.wait_for_status(
             share,
             ready_statuses=["deleted"],
             check_deletion=True,
@@ -131,7 +134,7 @@ class ManilaScenario(scenario.OpenStackScenario):
                                                          access_result["id"])
 
         # We check if the access in that access_list has the active state
-        utils.wait_for_status(
+        polling.wait_for_status(
             access,
             ready_statuses=["active"],
             update_resource=fn,
@@ -168,7 +171,7 @@ class ManilaScenario(scenario.OpenStackScenario):
         fn = self._update_resource_in_deny_access_share(share,
                                                         access_id)
 
-        utils.wait_for_status(
+        polling.wait_for_status(
             access,
             ready_statuses=["deleted"],
             update_resource=fn,
@@ -196,7 +199,7 @@ class ManilaScenario(scenario.OpenStackScenario):
         :param new_size: new size of the share
         """
         share.extend(new_size)
-        utils.wait_for_status(
+        polling.wait_for_status(
             share,
             ready_statuses=["available"],
             update_resource=utils.get_from_manager(),
@@ -211,7 +214,7 @@ class ManilaScenario(scenario.OpenStackScenario):
         :param new_size: new size of the share
         """
         share.shrink(new_size)
-        utils.wait_for_status(
+        polling.wait_for_status(
             share,
             ready_statuses=["available"],
             update_resource=utils.get_from_manager(),
@@ -245,7 +248,7 @@ class ManilaScenario(scenario.OpenStackScenario):
         :param share_network: instance of :class:`ShareNetwork`.
         """
         share_network.delete()
-        utils.wait_for_status(
+        polling.wait_for_status(
             share_network,
             ready_statuses=["deleted"],
             check_deletion=True,
@@ -317,7 +320,7 @@ class ManilaScenario(scenario.OpenStackScenario):
         :param security_service: instance of :class:`SecurityService`.
         """
         security_service.delete()
-        utils.wait_for_status(
+        polling.wait_for_status(
             security_service,
             ready_statuses=["deleted"],
             check_deletion=True,
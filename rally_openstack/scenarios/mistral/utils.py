@@ -19,6 +19,7 @@ from rally.task import atomic
 from rally.task import utils
 import yaml
 
+from rally_openstack import polling
 from rally_openstack import scenario
 
 
@@ -84,7 +85,7 @@ class MistralScenario(scenario.OpenStackScenario):
         execution = self.clients("mistral").executions.create(
             workflow_identifier, workflow_input=wf_input, **params)
 
-        execution = utils.wait_for_status(
+        execution = polling.wait_for_status(
             execution, ready_statuses=["SUCCESS"], failure_statuses=["ERROR"],
             update_resource=utils.get_from_manager(),
             timeout=CONF.openstack.mistral_execution_timeout)
@@ -52,3 +52,35 @@ class MonascaScenario(scenario.OpenStackScenario):
                        "value_meta": {
                            "key": str(uuid.uuid4())[:10]}})
         self.clients("monasca").metrics.create(**kwargs)
+
+    def _make_metrics(self, count, batch_size=None, **kwargs):
+        """Prepare batches of metrics.
+
+        :param count: the number of metrics to prepare
+        :param batch_size: the number of metrics in one batch
+        :param kwargs: attributes of metrics: dimensions, etc
+        :returns: generator that produces lists of metrics
+        """
+        batch_size = batch_size or count
+        timestamp = int(time.time() * 1000)
+        metrics = []
+        for i in range(count):
+            if i and not (i % batch_size):
+                yield metrics
+                metrics = []
+            metric = dict(kwargs)
+            metric.update({"name": self.generate_random_name(),
+                           "timestamp": timestamp,
+                           "value": random.random(),
+                           "value_meta": {"key": str(uuid.uuid4())[:10]}})
+            metrics.append(metric)
+        if metrics:
+            yield metrics
+
+    @atomic.action_timer("monasca.create_metrics_batch")
+    def _create_metrics_batch(self, metrics):
+        """Create several user metrics with a single request.
+
+        :param metrics: a list of metrics to create
+        """
+        self.clients("monasca").metrics.create(jsonbody=metrics)
@@ -26,6 +26,7 @@ from rally.task import atomic
 from rally.task import utils
 import yaml
 
+from rally_openstack import polling
 from rally_openstack import scenario
 
 
@@ -102,7 +103,7 @@ class MuranoScenario(scenario.OpenStackScenario):
                                                session.id)
 
         config = CONF.openstack
-        utils.wait_for_status(
+        polling.wait_for_status(
             environment,
             ready_statuses=["READY"],
             update_resource=utils.get_from_manager(["DEPLOY FAILURE"]),
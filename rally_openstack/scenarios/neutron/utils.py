@@ -20,8 +20,9 @@ from rally.common import cfg
 from rally.common import logging
 from rally import exceptions
 from rally.task import atomic
-from rally.task import utils
 
+from rally_openstack.cleanup import journal
+from rally_openstack import polling
 from rally_openstack import scenario
 from rally_openstack.wrappers import network as network_wrapper
 
@@ -64,10 +65,11 @@ class NeutronScenario(scenario.OpenStackScenario):
 
         Without this extension, we can't pass the enable_snat parameter.
         """
-        return any(
-            e["alias"] == "ext-gw-mode"
-            for e in self.clients("neutron").list_extensions()["extensions"])
+        extensions = network_wrapper.get_extensions(
+            network_wrapper.get_cloud(self.clients), self.clients("neutron"))
+        return "ext-gw-mode" in extensions
 
+    @journal.journaled("neutron.network")
     @atomic.action_timer("neutron.create_network")
     def _create_network(self, network_create_args):
         """Create neutron network.
@@ -76,8 +78,12 @@ class NeutronScenario(scenario.OpenStackScenario):
         :returns: neutron network dict
         """
         network_create_args["name"] = self.generate_random_name()
-        return self.clients("neutron").create_network(
+        network = self.clients("neutron").create_network(
             {"network": network_create_args})
+        if network_create_args.get("router:external"):
+            network_wrapper.invalidate_capabilities(
+                network_wrapper.get_cloud(self.clients))
+        return network
 
     @atomic.action_timer("neutron.list_networks")
     def _list_networks(self, **kwargs):
@@ -108,8 +114,12 @@ class NeutronScenario(scenario.OpenStackScenario):
         """
         network_update_args["name"] = self.generate_random_name()
         body = {"network": network_update_args}
-        return self.clients("neutron").update_network(
+        network = self.clients("neutron").update_network(
             network["network"]["id"], body)
+        if "router:external" in network_update_args:
+            network_wrapper.invalidate_capabilities(
+                network_wrapper.get_cloud(self.clients))
+        return network
 
     @atomic.action_timer("neutron.show_network")
     def _show_network(self, network, **kwargs):
@@ -129,7 +139,13 @@ class NeutronScenario(scenario.OpenStackScenario):
         :param network: Network object
         """
         self.clients("neutron").delete_network(network["id"])
+        # NOTE: the network is considered external if it is unknown, so
+        #   cached external networks are not used after its deletion.
+        if network.get("router:external", True):
+            network_wrapper.invalidate_capabilities(
+                network_wrapper.get_cloud(self.clients))
 
+    @journal.journaled("neutron.subnet")
     @atomic.action_timer("neutron.create_subnet")
     def _create_subnet(self, network, subnet_create_args, start_cidr=None):
         """Create neutron subnet.
@@ -192,6 +208,7 @@ class NeutronScenario(scenario.OpenStackScenario):
         """
         self.clients("neutron").delete_subnet(subnet["subnet"]["id"])
 
+    @journal.journaled("neutron.router")
     @atomic.action_timer("neutron.create_router")
     def _create_router(self, router_create_args, external_gw=False):
         """Create neutron router.
@@ -253,6 +270,7 @@ class NeutronScenario(scenario.OpenStackScenario):
         return self.clients("neutron").update_router(
             router["router"]["id"], body)
 
+    @journal.journaled("neutron.port")
     @atomic.action_timer("neutron.create_port")
     def _create_port(self, network, port_create_args):
         """Create neutron port.
@@ -532,6 +550,7 @@ class NeutronScenario(scenario.OpenStackScenario):
         body = {"vip": vip_update_args}
         return self.clients("neutron").update_vip(vip["vip"]["id"], body)
 
+    @journal.journaled("neutron.floatingip")
     @atomic.action_timer("neutron.create_floating_ip")
     def _create_floatingip(self, floating_network, **floating_ip_args):
         """Create floating IP with floating_network.
@@ -624,6 +643,7 @@ class NeutronScenario(scenario.OpenStackScenario):
         return self.clients("neutron").update_health_monitor(
             healthmonitor["health_monitor"]["id"], body)
 
+    @journal.journaled("neutron.security_group")
     @atomic.action_timer("neutron.create_security_group")
     def _create_security_group(self, **security_group_create_args):
         """Create Neutron security-group.
@@ -699,7 +719,7 @@ class NeutronScenario(scenario.OpenStackScenario):
         neutronclient = self.clients("neutron")
         lb = neutronclient.create_loadbalancer({"loadbalancer": args})
         lb = lb["loadbalancer"]
-        lb = utils.wait_for_status(
+        lb = polling.wait_for_status(
             lb,
             ready_statuses=["ACTIVE"],
             status_attr="provisioning_status",
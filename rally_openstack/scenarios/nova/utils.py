@@ -13,6 +13,7 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import time
 
 from rally.common import cfg
 from rally.common import logging
@@ -20,6 +21,8 @@ from rally import exceptions
 from rally.task import atomic
 from rally.task import utils
 
+from rally_openstack.cleanup import journal
+from rally_openstack import polling
 from rally_openstack import scenario
 from rally_openstack.scenarios.cinder import utils as cinder_utils
 from rally_openstack.services.image import image as image_service
@@ -47,6 +50,7 @@ class NovaScenario(scenario.OpenStackScenario):
             net_idx = self.context["iteration"] % len(nets)
             return [{"net-id": nets[net_idx]}]
 
+    @journal.journaled("nova.servers")
     @atomic.action_timer("nova.boot_server")
     def _boot_server(self, image, flavor,
                      auto_assign_nic=False, **kwargs):
@@ -80,7 +84,7 @@ class NovaScenario(scenario.OpenStackScenario):
             server_name, image, flavor, **kwargs)
 
         self.sleep_between(CONF.openstack.nova_server_boot_prepoll_delay)
-        server = utils.wait_for_status(
+        server = polling.wait_for_status(
             server,
             ready_statuses=["ACTIVE"],
             update_resource=utils.get_from_manager(),
@@ -92,7 +96,7 @@ class NovaScenario(scenario.OpenStackScenario):
     def _do_server_reboot(self, server, reboottype):
         server.reboot(reboot_type=reboottype)
         self.sleep_between(CONF.openstack.nova_server_pause_prepoll_delay)
-        utils.wait_for_status(
+        polling.wait_for_status(
             server,
             ready_statuses=["ACTIVE"],
             update_resource=utils.get_from_manager(),
@@ -169,7 +173,7 @@ class NovaScenario(scenario.OpenStackScenario):
         """
         server.rebuild(image, **kwargs)
         self.sleep_between(CONF.openstack.nova_server_rebuild_prepoll_delay)
-        utils.wait_for_status(
+        polling.wait_for_status(
             server,
             ready_statuses=["ACTIVE"],
             update_resource=utils.get_from_manager(),
@@ -187,7 +191,7 @@ class NovaScenario(scenario.OpenStackScenario):
         :param server: The server to start and wait to become ACTIVE.
         """
         server.start()
-        utils.wait_for_status(
+        polling.wait_for_status(
             server,
             ready_statuses=["ACTIVE"],
             update_resource=utils.get_from_manager(),
@@ -205,7 +209,7 @@ class NovaScenario(scenario.OpenStackScenario):
         :param server: The server to stop.
         """
         server.stop()
-        utils.wait_for_status(
+        polling.wait_for_status(
             server,
             ready_statuses=["SHUTOFF"],
             update_resource=utils.get_from_manager(),
@@ -224,7 +228,7 @@ class NovaScenario(scenario.OpenStackScenario):
         """
         server.rescue()
         self.sleep_between(CONF.openstack.nova_server_rescue_prepoll_delay)
-        utils.wait_for_status(
+        polling.wait_for_status(
             server,
             ready_statuses=["RESCUE"],
             update_resource=utils.get_from_manager(),
@@ -242,7 +246,7 @@ class NovaScenario(scenario.OpenStackScenario):
         """
         server.unrescue()
         self.sleep_between(CONF.openstack.nova_server_unrescue_prepoll_delay)
-        utils.wait_for_status(
+        polling.wait_for_status(
             server,
             ready_statuses=["ACTIVE"],
             update_resource=utils.get_from_manager(),
@@ -261,7 +265,7 @@ class NovaScenario(scenario.OpenStackScenario):
         """
         server.suspend()
         self.sleep_between(CONF.openstack.nova_server_suspend_prepoll_delay)
-        utils.wait_for_status(
+        polling.wait_for_status(
             server,
             ready_statuses=["SUSPENDED"],
             update_resource=utils.get_from_manager(),
@@ -280,7 +284,7 @@ class NovaScenario(scenario.OpenStackScenario):
         """
         server.resume()
         self.sleep_between(CONF.openstack.nova_server_resume_prepoll_delay)
-        utils.wait_for_status(
+        polling.wait_for_status(
             server,
             ready_statuses=["ACTIVE"],
             update_resource=utils.get_from_manager(),
@@ -299,7 +303,7 @@ class NovaScenario(scenario.OpenStackScenario):
         """
         server.pause()
         self.sleep_between(CONF.openstack.nova_server_pause_prepoll_delay)
-        utils.wait_for_status(
+        polling.wait_for_status(
             server,
             ready_statuses=["PAUSED"],
             update_resource=utils.get_from_manager(),
@@ -318,7 +322,7 @@ class NovaScenario(scenario.OpenStackScenario):
         """
         server.unpause()
         self.sleep_between(CONF.openstack.nova_server_pause_prepoll_delay)
-        utils.wait_for_status(
+        polling.wait_for_status(
             server,
             ready_statuses=["ACTIVE"],
             update_resource=utils.get_from_manager(),
@@ -337,7 +341,7 @@ class NovaScenario(scenario.OpenStackScenario):
         """
         server.shelve()
         self.sleep_between(CONF.openstack.nova_server_pause_prepoll_delay)
-        utils.wait_for_status(
+        polling.wait_for_status(
             server,
             ready_statuses=["SHELVED_OFFLOADED"],
             update_resource=utils.get_from_manager(),
@@ -356,7 +360,7 @@ class NovaScenario(scenario.OpenStackScenario):
         server.unshelve()
 
         self.sleep_between(CONF.openstack. nova_server_unshelve_prepoll_delay)
-        utils.wait_for_status(
+        polling.wait_for_status(
             server,
             ready_statuses=["ACTIVE"],
             update_resource=utils.get_from_manager(),
@@ -379,7 +383,7 @@ class NovaScenario(scenario.OpenStackScenario):
             else:
                 server.delete()
 
-            utils.wait_for_status(
+            polling.wait_for_status(
                 server,
                 ready_statuses=["deleted"],
                 check_deletion=True,
@@ -403,7 +407,7 @@ class NovaScenario(scenario.OpenStackScenario):
                     server.delete()
 
             for server in servers:
-                utils.wait_for_status(
+                polling.wait_for_status(
                     server,
                     ready_statuses=["deleted"],
                     check_deletion=True,
@@ -474,7 +478,7 @@ class NovaScenario(scenario.OpenStackScenario):
         glance.delete_image(image.id)
         check_interval = CONF.openstack.nova_server_image_delete_poll_interval
         with atomic.ActionTimer(self, "glance.wait_for_delete"):
-            utils.wait_for_status(
+            polling.wait_for_status(
                 image,
                 ready_statuses=["deleted", "pending_delete"],
                 check_deletion=True,
@@ -501,7 +505,7 @@ class NovaScenario(scenario.OpenStackScenario):
         image = glance.get_image(image_uuid)
         check_interval = CONF.openstack.nova_server_image_create_poll_interval
         with atomic.ActionTimer(self, "glance.wait_for_image"):
-            image = utils.wait_for_status(
+            image = polling.wait_for_status(
                 image,
                 ready_statuses=["ACTIVE"],
                 update_resource=glance.get_image,
@@ -542,6 +546,7 @@ class NovaScenario(scenario.OpenStackScenario):
         """
         self.clients("nova").keypairs.delete(keypair_name)
 
+    @journal.journaled("nova.servers")
     @atomic.action_timer("nova.boot_servers")
     def _boot_servers(self, image_id, flavor_id, requests, instances_amount=1,
                       auto_assign_nic=False, **kwargs):
@@ -577,15 +582,75 @@ class NovaScenario(scenario.OpenStackScenario):
         servers = [s for s in self.clients("nova").servers.list()
                    if s.name.startswith(name_prefix)]
         self.sleep_between(CONF.openstack.nova_server_boot_prepoll_delay)
-        servers = [utils.wait_for_status(
-            server,
-            ready_statuses=["ACTIVE"],
-            update_resource=utils.
-            get_from_manager(),
+        return self._wait_for_servers_status(
+            servers, ready_statuses=["ACTIVE"],
+            search_opts={"name": name_prefix},
             timeout=CONF.openstack.nova_server_boot_timeout,
-            check_interval=CONF.openstack.nova_server_boot_poll_interval
-        ) for server in servers]
-        return servers
+            check_interval=CONF.openstack.nova_server_boot_poll_interval)
+
+    def _wait_for_servers_status(self, servers, ready_statuses,
+                                 search_opts=None, timeout=60,
+                                 check_interval=1):
+        """Wait for all servers to reach one of the ready statuses.
+
+        Instead of polling every server separately, all pending servers are
+        refreshed by a single servers.list call per check interval. If the
+        list call fails, the rest of servers are waited one by one.
+
+        :param servers: list of servers to wait for
+        :param ready_statuses: list of statuses which servers should reach
+        :param search_opts: search options of servers.list call which
+            narrow the list down to the awaited servers
+        :param timeout: timeout in seconds after which a TimeoutException
+            will be raised
+        :param check_interval: interval in seconds between the two
+            consecutive list calls
+        :returns: list of updated servers in the original order
+        """
+        ready_statuses = [status.upper() for status in ready_statuses]
+        pending = dict((server.id, server) for server in servers)
+        ready = {}
+        start = time.time()
+        while pending:
+            try:
+                listed = self.clients("nova").servers.list(
+                    search_opts=search_opts)
+            except Exception as e:
+                LOG.warning("Failed to list servers, falling back to polling "
+                            "of every server: %s" % e)
+                for server_id, server in pending.items():
+                    ready[server_id] = polling.wait_for_status(
+                        server,
+                        ready_statuses=ready_statuses,
+                        update_resource=utils.get_from_manager(),
+                        timeout=max(timeout - (time.time() - start), 0),
+                        check_interval=check_interval)
+                break
+            listed = dict((server.id, server) for server in listed)
+            for server_id, server in list(pending.items()):
+                if server_id not in listed:
+                    raise exceptions.GetResourceNotFound(resource=server)
+                server = pending[server_id] = listed[server_id]
+                status = utils.get_status(server)
+                if status in ready_statuses:
+                    ready[server_id] = pending.pop(server_id)
+                elif status == "ERROR":
+                    raise exceptions.GetResourceErrorStatus(
+                        resource=server, status=status,
+                        fault=getattr(server, "fault", "n/a"))
+            if not pending:
+                break
+            time.sleep(check_interval)
+            if time.time() - start > timeout:
+                server = list(pending.values())[0]
+                raise exceptions.TimeoutException(
+                    desired_status="('%s')" % "', '".join(ready_statuses),
+                    resource_name=getattr(server, "name", repr(server)),
+                    resource_type=server.__class__.__name__,
+                    resource_id=server.id,
+                    resource_status=utils.get_status(server),
+                    timeout=timeout)
+        return [ready[server.id] for server in servers]
 
     @atomic.action_timer("nova.associate_floating_ip")
     def _associate_floating_ip(self, server, address, fixed_address=None):
@@ -685,7 +750,7 @@ class NovaScenario(scenario.OpenStackScenario):
     @atomic.action_timer("nova.resize")
     def _resize(self, server, flavor):
         server.resize(flavor)
-        utils.wait_for_status(
+        polling.wait_for_status(
             server,
             ready_statuses=["VERIFY_RESIZE"],
             update_resource=utils.get_from_manager(),
@@ -696,7 +761,7 @@ class NovaScenario(scenario.OpenStackScenario):
     @atomic.action_timer("nova.resize_confirm")
     def _resize_confirm(self, server, status="ACTIVE"):
         server.confirm_resize()
-        utils.wait_for_status(
+        polling.wait_for_status(
             server,
             ready_statuses=[status],
             update_resource=utils.get_from_manager(),
@@ -708,7 +773,7 @@ class NovaScenario(scenario.OpenStackScenario):
     @atomic.action_timer("nova.resize_revert")
     def _resize_revert(self, server, status="ACTIVE"):
         server.revert_resize()
-        utils.wait_for_status(
+        polling.wait_for_status(
             server,
             ready_statuses=[status],
             update_resource=utils.get_from_manager(),
@@ -727,7 +792,7 @@ class NovaScenario(scenario.OpenStackScenario):
         volume_id = volume.id
         attachment = self.clients("nova").volumes.create_server_volume(
             server_id, volume_id, device)
-        utils.wait_for_status(
+        polling.wait_for_status(
             volume,
             ready_statuses=["in-use"],
             update_resource=self._update_volume_resource,
@@ -763,7 +828,7 @@ class NovaScenario(scenario.OpenStackScenario):
 
         self.clients("nova").volumes.delete_server_volume(server_id,
                                                           volume.id)
-        utils.wait_for_status(
+        polling.wait_for_status(
             volume,
             ready_statuses=["available"],
             update_resource=self._update_volume_resource,
@@ -796,7 +861,7 @@ class NovaScenario(scenario.OpenStackScenario):
         host_pre_migrate = getattr(server_admin, "OS-EXT-SRV-ATTR:host")
         server_admin.live_migrate(block_migration=block_migration,
                                   disk_over_commit=disk_over_commit)
-        utils.wait_for_status(
+        polling.wait_for_status(
             server,
             ready_statuses=["ACTIVE"],
             update_resource=utils.get_from_manager(),
@@ -832,7 +897,7 @@ class NovaScenario(scenario.OpenStackScenario):
         server_admin = self.admin_clients("nova").servers.get(server.id)
         host_pre_migrate = getattr(server_admin, "OS-EXT-SRV-ATTR:host")
         server_admin.migrate()
-        utils.wait_for_status(
+        polling.wait_for_status(
             server,
             ready_statuses=["VERIFY_RESIZE"],
             update_resource=utils.get_from_manager(),
@@ -13,8 +13,8 @@
 from rally.common import cfg
 from rally import exceptions
 from rally.task import atomic
-from rally.task import utils
 
+from rally_openstack import polling
 from rally_openstack import scenario
 
 
@@ -77,7 +77,7 @@ class SenlinScenario(scenario.OpenStackScenario):
         }
 
         cluster = self.admin_clients("senlin").create_cluster(**attrs)
-        cluster = utils.wait_for_status(
+        cluster = polling.wait_for_status(
             cluster,
             ready_statuses=["ACTIVE"],
             failure_statuses=["ERROR"],
@@ -109,7 +109,7 @@ class SenlinScenario(scenario.OpenStackScenario):
         :param cluster: cluster object to delete
         """
         self.admin_clients("senlin").delete_cluster(cluster)
-        utils.wait_for_status(
+        polling.wait_for_status(
             cluster,
             ready_statuses=["DELETED"],
             failure_statuses=["ERROR"],
@@ -22,9 +22,9 @@ from rally.common import cfg
 from rally.common import logging
 from rally.common import sshutils
 from rally.task import atomic
-from rally.task import utils
 import six
 
+from rally_openstack import polling
 from rally_openstack.scenarios.nova import utils as nova_utils
 from rally_openstack.wrappers import network as network_wrapper
 
@@ -197,7 +197,7 @@ class VMScenario(nova_utils.NovaScenario):
     @atomic.action_timer("vm.wait_for_ping")
     def _wait_for_ping(self, server_ip):
         server = Host(server_ip)
-        utils.wait_for_status(
+        polling.wait_for_status(
             server,
             ready_statuses=[Host.ICMP_UP_STATUS],
             update_resource=Host.update_status,
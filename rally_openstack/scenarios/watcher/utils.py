@@ -14,6 +14,7 @@ from rally.common import cfg
 from rally.task import atomic
 from rally.task import utils
 
+from rally_openstack import polling
 from rally_openstack import scenario
 
 
@@ -57,7 +58,7 @@ class WatcherScenario(scenario.OpenStackScenario):
         audit = self.admin_clients("watcher").audit.create(
             audit_template_uuid=audit_template_uuid,
             audit_type="ONESHOT")
-        utils.wait_for_status(
+        polling.wait_for_status(
             audit,
             ready_statuses=["SUCCEEDED"],
             failure_statuses=["FAILED"],
@@ -16,6 +16,8 @@ from rally.common import utils as common_utils
 from rally.task import atomic
 from rally.task import utils
 
+from rally_openstack import polling
+
 CONF = cfg.CONF
 
 
@@ -48,7 +50,7 @@ class Stack(common_utils.RandomNameGeneratorMixin):
             self.files[name] = open(path).read()
 
     def _wait(self, ready_statuses, failure_statuses):
-        self.stack = utils.wait_for_status(
+        self.stack = polling.wait_for_status(
             self.stack,
             check_interval=CONF.openstack.heat_stack_create_poll_interval,
             timeout=CONF.openstack.heat_stack_create_timeout,
@@ -14,6 +14,8 @@
 
 from rally.task import service
 
+from rally_openstack.cleanup import journal
+
 
 Project = service.make_resource_cls("Project", ["id", "name", "domain_id"])
 User = service.make_resource_cls(
@@ -28,6 +30,7 @@ class Identity(service.UnifiedService):
         cloud_version = clients.keystone().version.split(".")[0][1:]
         return cloud_version == cls._meta_get("impl")._meta_get("version")
 
+    @journal.journaled("keystone.project")
     @service.should_be_overridden
     def create_project(self, project_name=None, domain_name="Default"):
         """Creates new project/tenant and return project object.
@@ -68,6 +71,7 @@ class Identity(service.UnifiedService):
         """Get project."""
         return self._impl.get_project(project_id)
 
+    @journal.journaled("keystone.user")
     @service.should_be_overridden
     def create_user(self, username=None, password=None, project_id=None,
                     domain_name="Default", enabled=True,
@@ -17,8 +17,8 @@ import os
 from rally.common import cfg
 from rally.common import utils as rutils
 from rally.task import atomic
-from rally.task import utils
 
+from rally_openstack import polling
 from rally_openstack import service
 from rally_openstack.services.image import glance_common
 from rally_openstack.services.image import image
@@ -52,7 +52,7 @@ class GlanceV1Service(service.Service, glance_common.GlanceMixin):
 
         try:
             if os.path.isfile(image_location):
-                kwargs["data"] = open(image_location)
+                kwargs["data"] = open(image_location, "rb")
             else:
                 kwargs["copy_from"] = image_location
 
@@ -69,7 +69,7 @@ class GlanceV1Service(service.Service, glance_common.GlanceMixin):
             rutils.interruptable_sleep(CONF.openstack.
                                        glance_image_create_prepoll_delay)
 
-            image_obj = utils.wait_for_status(
+            image_obj = polling.wait_for_status(
                 image_obj, ["active"],
                 update_resource=self.get_image,
                 timeout=CONF.openstack.glance_image_create_timeout,
@@ -122,6 +122,15 @@ class GlanceV1Service(service.Service, glance_common.GlanceMixin):
         """
         self._clients.glance("1").images.update(image_id, is_public=is_public)
 
+    @atomic.action_timer("glance_v1.add_member")
+    def add_member(self, image_id, member_id):
+        """Share the image with the project.
+
+        :param image_id: ID of image to share
+        :param member_id: ID of project to share the image with
+        """
+        self._clients.glance("1").image_members.create(image_id, member_id)
+
 
 @service.compat_layer(GlanceV1Service)
 class UnifiedGlanceV1Service(glance_common.UnifiedGlanceMixin, image.Image):
@@ -209,3 +218,20 @@ class UnifiedGlanceV1Service(glance_common.UnifiedGlanceMixin, image.Image):
 
         is_public = visibility != "private"
         self._impl.set_visibility(image_id=image_id, is_public=is_public)
+
+    def add_member(self, image_id, member_id):
+        """Share the image with the project.
+
+        :param image_id: ID of image to share
+        :param member_id: ID of project to share the image with
+        """
+        self._impl.add_member(image_id=image_id, member_id=member_id)
+
+    def accept_member(self, image_id, member_id):
+        """Accept the image shared with the project.
+
+        :param image_id: ID of shared image
+        :param member_id: ID of project the image is shared with
+        """
+        # NOTE: Glance V1 does not require members to accept images
+        pass
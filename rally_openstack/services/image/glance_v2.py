@@ -18,9 +18,9 @@ import time
 from rally.common import cfg
 from rally.common import utils as rutils
 from rally.task import atomic
-from rally.task import utils
 import requests
 
+from rally_openstack import polling
 from rally_openstack import service
 from rally_openstack.services.image import glance_common
 from rally_openstack.services.image import image
@@ -44,7 +44,7 @@ class GlanceV2Service(service.Service, glance_common.GlanceMixin):
         response = None
         try:
             if os.path.isfile(image_location):
-                image_data = open(image_location)
+                image_data = open(image_location, "rb")
             else:
                 response = requests.get(image_location, stream=True)
                 image_data = response.raw
@@ -87,7 +87,7 @@ class GlanceV2Service(service.Service, glance_common.GlanceMixin):
                                    glance_image_create_prepoll_delay)
 
         start = time.time()
-        image_obj = utils.wait_for_status(
+        image_obj = polling.wait_for_status(
             image_obj.id, ["queued"],
             update_resource=self.get_image,
             timeout=CONF.openstack.glance_image_create_timeout,
@@ -96,7 +96,7 @@ class GlanceV2Service(service.Service, glance_common.GlanceMixin):
 
         self.upload_data(image_obj.id, image_location=image_location)
 
-        image_obj = utils.wait_for_status(
+        image_obj = polling.wait_for_status(
             image_obj, ["active"],
             update_resource=self.get_image,
             timeout=timeout,
@@ -151,6 +151,28 @@ class GlanceV2Service(service.Service, glance_common.GlanceMixin):
         self._clients.glance("2").images.update(image_id,
                                                 visibility=visibility)
 
+    @atomic.action_timer("glance_v2.add_member")
+    def add_member(self, image_id, member_id):
+        """Share the image with the project.
+
+        :param image_id: ID of image to share
+        :param member_id: ID of project to share the image with
+        """
+        return self._clients.glance("2").image_members.create(image_id,
+                                                              member_id)
+
+    @atomic.action_timer("glance_v2.update_member")
+    def update_member(self, image_id, member_id, member_status):
+        """Update status of the image member.
+
+        :param image_id: ID of shared image
+        :param member_id: ID of project the image is shared with
+        :param member_status: The new status ("accepted", "rejected" or
+            "pending")
+        """
+        return self._clients.glance("2").image_members.update(
+            image_id, member_id, member_status)
+
     @atomic.action_timer("glance_v2.deactivate_image")
     def deactivate_image(self, image_id):
         """deactivate image."""
@@ -240,3 +262,20 @@ class UnifiedGlanceV2Service(glance_common.UnifiedGlanceMixin, image.Image):
         self._check_v2_visibility(visibility)
 
         self._impl.set_visibility(image_id=image_id, visibility=visibility)
+
+    def add_member(self, image_id, member_id):
+        """Share the image with the project.
+
+        :param image_id: ID of image to share
+        :param member_id: ID of project to share the image with
+        """
+        self._impl.add_member(image_id=image_id, member_id=member_id)
+
+    def accept_member(self, image_id, member_id):
+        """Accept the image shared with the project.
+
+        :param image_id: ID of shared image
+        :param member_id: ID of project the image is shared with
+        """
+        self._impl.update_member(image_id=image_id, member_id=member_id,
+                                 member_status="accepted")
@@ -15,6 +15,8 @@ from rally.common import cfg
 from rally import exceptions
 from rally.task import service
 
+from rally_openstack.cleanup import journal
+
 
 CONF = cfg.CONF
 
@@ -42,6 +44,7 @@ class Image(service.UnifiedService):
         cloud_version = str(clients.glance().version).split(".")[0]
         return cloud_version == cls._meta_get("impl")._meta_get("version")
 
+    @journal.journaled("glance.images")
     @service.should_be_overridden
     def create_image(self, image_name=None, container_format=None,
                      image_location=None, disk_format=None,
@@ -109,6 +112,24 @@ class Image(service.UnifiedService):
         """
         self._impl.set_visibility(image_id, visibility=visibility)
 
+    @service.should_be_overridden
+    def add_member(self, image_id, member_id):
+        """Share the image with the project.
+
+        :param image_id: ID of image to share
+        :param member_id: ID of project to share the image with
+        """
+        self._impl.add_member(image_id, member_id=member_id)
+
+    @service.should_be_overridden
+    def accept_member(self, image_id, member_id):
+        """Accept the image shared with the project.
+
+        :param image_id: ID of shared image
+        :param member_id: ID of project the image is shared with
+        """
+        self._impl.accept_member(image_id, member_id=member_id)
+
     @service.should_be_overridden
     def get_image(self, image):
         """Get specified image.
@@ -17,7 +17,8 @@ from rally.common import logging
 from rally import exceptions
 from rally.task import atomic
 from rally.task import service
-from rally.task import utils
+
+from rally_openstack import polling
 
 CONF = cfg.CONF
 
@@ -233,7 +234,7 @@ class Octavia(service.Service):
         pool = self._clients.octavia().pool_create(
             json={"pool": args})
         pool = pool["pool"]
-        pool = utils.wait_for_status(
+        pool = polling.wait_for_status(
             pool,
             ready_statuses=["ACTIVE"],
             status_attr="provisioning_status",
@@ -619,7 +620,7 @@ class Octavia(service.Service):
 
     @atomic.action_timer("octavia.wait_for_loadbalancers")
     def wait_for_loadbalancer_prov_status(self, lb, prov_status="ACTIVE"):
-        return utils.wait_for_status(
+        return polling.wait_for_status(
             lb["loadbalancer"],
             ready_statuses=[prov_status],
             status_attr="provisioning_status",
@@ -16,6 +16,8 @@ from rally.common import cfg
 from rally.common import logging
 from rally.task import service
 
+from rally_openstack.cleanup import journal
+
 
 CONF = cfg.CONF
 LOG = logging.getLogger(__name__)
@@ -37,6 +39,7 @@ QoSSpecs = service.make_resource_cls(
 
 class BlockStorage(service.UnifiedService):
 
+    @journal.journaled("cinder.volumes")
     @service.should_be_overridden
     def create_volume(self, size, consistencygroup_id=None,
                       group_id=None, snapshot_id=None, source_volid=None,
@@ -261,6 +264,7 @@ class BlockStorage(service.UnifiedService):
         """
         return self._impl.qos_disassociate_type(qos_specs, volume_type)
 
+    @journal.journaled("cinder.volume_snapshots")
     @service.should_be_overridden
     def create_snapshot(self, volume_id, force=False,
                         name=None, description=None, metadata=None):
@@ -291,6 +295,7 @@ class BlockStorage(service.UnifiedService):
         """
         self._impl.delete_snapshot(snapshot)
 
+    @journal.journaled("cinder.backups")
     @service.should_be_overridden
     def create_backup(self, volume_id, container=None,
                       name=None, description=None,
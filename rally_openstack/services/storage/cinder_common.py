@@ -16,8 +16,8 @@ import random
 
 from rally import exceptions
 from rally.task import atomic
-from rally.task import utils as bench_utils
 
+from rally_openstack import polling
 from rally_openstack.services.image import image
 from rally_openstack.services.storage import block
 
@@ -50,7 +50,7 @@ class CinderMixin(object):
         return res
 
     def _wait_available_volume(self, volume):
-        return bench_utils.wait_for_status(
+        return polling.wait_for_status(
             volume,
             ready_statuses=["available"],
             update_resource=self._update_resource,
@@ -69,7 +69,7 @@ class CinderMixin(object):
         aname = "cinder_v%s.delete_volume" % self.version
         with atomic.ActionTimer(self, aname):
             self._get_client().volumes.delete(volume)
-            bench_utils.wait_for_status(
+            polling.wait_for_status(
                 volume,
                 ready_statuses=["deleted"],
                 check_deletion=True,
@@ -188,7 +188,7 @@ class CinderMixin(object):
             glance = image.Image(self._clients)
 
             image_inst = glance.get_image(image_id)
-            image_inst = bench_utils.wait_for_status(
+            image_inst = polling.wait_for_status(
                 image_inst,
                 ready_statuses=["active"],
                 update_resource=glance.get_image,
@@ -282,7 +282,7 @@ class CinderMixin(object):
         aname = "cinder_v%s.delete_snapshot" % self.version
         with atomic.ActionTimer(self, aname):
             self._get_client().volume_snapshots.delete(snapshot)
-            bench_utils.wait_for_status(
+            polling.wait_for_status(
                 snapshot,
                 ready_statuses=["deleted"],
                 check_deletion=True,
@@ -302,7 +302,7 @@ class CinderMixin(object):
         aname = "cinder_v%s.delete_backup" % self.version
         with atomic.ActionTimer(self, aname):
             self._get_client().backups.delete(backup)
-            bench_utils.wait_for_status(
+            polling.wait_for_status(
                 backup,
                 ready_statuses=["deleted"],
                 check_deletion=True,
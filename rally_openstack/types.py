@@ -15,6 +15,8 @@
 import copy
 import operator
 import re
+import threading
+import time
 import traceback
 
 from rally.common import logging
@@ -33,6 +35,87 @@ LOG = logging.getLogger(__name__)
 
 configure = plugin.configure
 
+# NOTE: resources are resolved many times during one task (validators,
+#   contexts, arguments of workloads), so listed resources are shared by all
+#   resource types for a short time.
+RESOLUTION_CACHE_TTL = 60
+
+_resolution_cache = {}
+_resolution_cache_lock = threading.Lock()
+
+
+def invalidate_resolution_cache():
+    """Drop all cached resources."""
+    with _resolution_cache_lock:
+        _resolution_cache.clear()
+
+
+class ResourceIndex(object):
+    """Listed resources indexed by their names and ids.
+
+    Results of regexp lookups are memorized as well, so every pattern is
+    compiled and matched against all the resources only once.
+    """
+
+    def __init__(self, resources, id_attr="id"):
+        self.resources = list(resources)
+        self._by_name = {}
+        self._by_id = {}
+        self._searches = {}
+        for resource in self.resources:
+            self._by_name.setdefault(self.get_name(resource), []).append(
+                resource)
+            self._by_id.setdefault(self._get_attr(resource, id_attr),
+                                   []).append(resource)
+
+    def __iter__(self):
+        return iter(self.resources)
+
+    def __len__(self):
+        return len(self.resources)
+
+    @staticmethod
+    def _get_attr(resource, attr):
+        if isinstance(resource, dict):
+            return resource.get(attr)
+        return getattr(resource, attr, None)
+
+    @classmethod
+    def get_name(cls, resource):
+        return cls._get_attr(resource, "name")
+
+    def get_by_name(self, name):
+        """Returns resources with exactly the same name."""
+        return self._by_name.get(name, [])
+
+    def get_by_id(self, resource_id):
+        """Returns resources with the id."""
+        return self._by_id.get(resource_id, [])
+
+    def search(self, pattern):
+        """Returns resources which names match the regexp."""
+        if pattern not in self._searches:
+            regexp = re.compile(pattern)
+            self._searches[pattern] = [
+                r for r in self.resources
+                if regexp.search(self.get_name(r) or "")]
+        return self._searches[pattern]
+
+    def get_candidates(self, resource_spec):
+        """Returns the only resources which can match the specification.
+
+        Lookups of `rally.task.types` give the same result for the candidates
+        as for all the resources, but do not need to scan all of them.
+        """
+        if "name" in resource_spec:
+            return (self.get_by_name(resource_spec["name"])
+                    or self.search(resource_spec["name"]))
+        elif "regex" in resource_spec:
+            return self.search(resource_spec["regex"])
+        elif "id" in resource_spec:
+            return self.get_by_id(resource_spec["id"])
+        return []
+
 
 class OpenStackResourceType(types.ResourceType):
     """A base class for OpenStack ResourceTypes plugins with help-methods"""
@@ -48,12 +131,88 @@ class OpenStackResourceType(types.ResourceType):
             self._cache = self._global_cache[self.get_name()]
 
         self._clients = None
+        self._credential = None
         if self._context.get("admin"):
-            self._clients = osclients.Clients(
-                self._context["admin"]["credential"])
+            self._credential = self._context["admin"]["credential"]
         elif self._context.get("users"):
-            self._clients = osclients.Clients(
-                self._context["users"][0]["credential"])
+            self._credential = self._context["users"][0]["credential"]
+        if self._credential is not None:
+            self._clients = osclients.Clients(self._credential)
+
+    def _get_cache_key(self, resource, list_kwargs=None):
+        if self._credential is None:
+            return None
+        task_uuid = (self._context.get("task") or {}).get("uuid")
+        project = (getattr(self._credential, "auth_url", None),
+                   getattr(self._credential, "region_name", None),
+                   getattr(self._credential, "project_domain_name", None),
+                   getattr(self._credential, "tenant_name", None))
+        return (task_uuid, project, resource,
+                frozenset((list_kwargs or {}).items()))
+
+    def _list_resources(self, resource, loader, list_kwargs=None,
+                        id_attr="id", refresh=False):
+        """Returns resources listed once per task and project.
+
+        :param resource: name of resources in format <service>.<resource>
+        :param loader: a function which lists the resources
+        :param list_kwargs: filters used by the loader
+        :param id_attr: name of attribute with id of the resources
+        :param refresh: list the resources even if they are cached
+        :returns: a tuple with ResourceIndex instance and a flag whether it
+            was taken from the cache
+        """
+        key = self._get_cache_key(resource, list_kwargs)
+        if key is None:
+            return ResourceIndex(loader(), id_attr=id_attr), False
+        now = time.time()
+        with _resolution_cache_lock:
+            cached = _resolution_cache.get(key)
+        if cached and not refresh and now - cached[0] < RESOLUTION_CACHE_TTL:
+            return cached[1], True
+        index = ResourceIndex(loader(), id_attr=id_attr)
+        with _resolution_cache_lock:
+            for k in [k for k, v in _resolution_cache.items()
+                      if now - v[0] >= RESOLUTION_CACHE_TTL]:
+                _resolution_cache.pop(k)
+            _resolution_cache[key] = (now, index)
+        return index, False
+
+    def _resolve(self, resource, loader, finder, list_kwargs=None,
+                 id_attr="id", checker=None):
+        """Find a resource in the cached list of resources.
+
+        The resource can be created after the list was cached (i.e. by
+        a context), so the cached list is refreshed once if nothing is found.
+        The resource can be deleted and created again with the same name as
+        well (i.e. by contexts of the next workload), so the cached list is
+        refreshed once if the checker rejects the resource found in it.
+
+        :param finder: a function which takes ResourceIndex and returns the
+            found resource or raises InvalidScenarioArgument
+        :param checker: a function which takes the found resource and
+            returns False or raises an exception if it does not exist anymore
+        """
+        index, cached = self._list_resources(
+            resource, loader, list_kwargs=list_kwargs, id_attr=id_attr)
+        try:
+            found = finder(index)
+        except exceptions.InvalidScenarioArgument:
+            if not cached:
+                raise
+        else:
+            if not cached or checker is None:
+                return found
+            try:
+                if checker(found):
+                    return found
+            except Exception as e:
+                LOG.debug("Cached %s resource %s is not available: %s"
+                          % (resource, found, e))
+        index, cached = self._list_resources(
+            resource, loader, list_kwargs=list_kwargs, id_attr=id_attr,
+            refresh=True)
+        return finder(index)
 
     def _find_resource(self, resource_spec, resources):
         """Return the resource whose name matches the pattern.
@@ -72,16 +231,18 @@ class OpenStackResourceType(types.ResourceType):
             * regexp - a regexp of resource name to match. If several resources
               match and value of *accurate* key is False (default behaviour),
               the latest resource will be returned.
-        :param resources: iterable containing all resources
+        :param resources: ResourceIndex instance or iterable containing all
+            resources
         :raises InvalidScenarioArgument: if the pattern does
             not match anything.
 
         :returns: resource object mapped to `name` or `regex`
         """
+        if not isinstance(resources, ResourceIndex):
+            resources = ResourceIndex(resources)
         if "name" in resource_spec:
             # In a case of pattern string exactly matches resource name
-            matching_exact = [resource for resource in resources
-                              if resource.name == resource_spec["name"]]
+            matching_exact = resources.get_by_name(resource_spec["name"])
             if len(matching_exact) == 1:
                 return matching_exact[0]
             elif len(matching_exact) > 1:
@@ -109,14 +270,12 @@ class OpenStackResourceType(types.ResourceType):
                     "typename": self.get_name().title(),
                     "resource_spec": resource_spec})
 
-        pattern = re.compile(patternstr)
-        matching = [resource for resource in resources
-                    if re.search(pattern, resource.name or "")]
+        matching = resources.search(patternstr)
         if not matching:
             raise exceptions.InvalidScenarioArgument(
                 "%(typename)s with pattern '%(pattern)s' not found" % {
                     "typename": self.get_name().title(),
-                    "pattern": pattern.pattern})
+                    "pattern": patternstr})
         elif len(matching) > 1:
             if not resource_spec.get("accurate", False):
                 return sorted(matching, key=lambda o: o.name or "")[-1]
@@ -125,7 +284,7 @@ class OpenStackResourceType(types.ResourceType):
                 "%(typename)s with name '%(pattern)s' is ambiguous, possible "
                 "matches by id: %(ids)s" % {
                     "typename": self.get_name().title(),
-                    "pattern": pattern.pattern,
+                    "pattern": patternstr,
                     "ids": ", ".join(map(operator.attrgetter("id"),
                                          matching))})
         return matching[0]
@@ -164,10 +323,13 @@ class Flavor(DeprecatedBehaviourMixin, OpenStackResourceType):
         resource_id = resource_spec.get("id")
         if not resource_id:
             novaclient = self._clients.nova()
-            resource_id = types._id_from_name(
-                resource_config=resource_spec,
-                resources=novaclient.flavors.list(),
-                typename="flavor")
+            resource_id = self._resolve(
+                "nova.flavors", novaclient.flavors.list,
+                lambda flavors: types._id_from_name(
+                    resource_config=resource_spec,
+                    resources=flavors.get_candidates(resource_spec),
+                    typename="flavor"),
+                checker=novaclient.flavors.get)
         return resource_id
 
 
@@ -180,10 +342,12 @@ class EC2Flavor(DeprecatedBehaviourMixin, OpenStackResourceType):
         if not resource_name:
             # NOTE(wtakase): gets resource name from OpenStack id
             novaclient = self._clients.nova()
-            resource_name = types._name_from_id(
-                resource_config=resource_spec,
-                resources=novaclient.flavors.list(),
-                typename="flavor")
+            resource_name = self._resolve(
+                "nova.flavors", novaclient.flavors.list,
+                lambda flavors: types._name_from_id(
+                    resource_config=resource_spec,
+                    resources=flavors.get_candidates(resource_spec),
+                    typename="flavor"))
         return resource_name
 
 
@@ -196,12 +360,14 @@ class GlanceImage(DeprecatedBehaviourMixin, OpenStackResourceType):
         list_kwargs = resource_spec.get("list_kwargs", {})
 
         if not resource_id:
-            cache_id = hash(frozenset(list_kwargs.items()))
-            if cache_id not in self._cache:
-                glance = image.Image(self._clients)
-                self._cache[cache_id] = glance.list_images(**list_kwargs)
-            images = self._cache[cache_id]
-            resource = self._find_resource(resource_spec, images)
+            glance = image.Image(self._clients)
+            resource = self._resolve(
+                "glance.images",
+                lambda: glance.list_images(**list_kwargs),
+                lambda images: self._find_resource(resource_spec, images),
+                list_kwargs=list_kwargs,
+                checker=lambda img: (
+                    glance.get_image(img).status != "deleted"))
             return resource.id
         return resource_id
 
@@ -229,18 +395,24 @@ class EC2Image(DeprecatedBehaviourMixin, OpenStackResourceType):
         if "name" not in resource_spec and "regex" not in resource_spec:
             # NOTE(wtakase): gets resource name from OpenStack id
             glanceclient = self._clients.glance()
-            resource_name = types._name_from_id(
-                resource_config=resource_spec,
-                resources=list(glanceclient.images.list()),
-                typename="image")
+            resource_name = self._resolve(
+                "glance.images_v1",
+                lambda: list(glanceclient.images.list()),
+                lambda images: types._name_from_id(
+                    resource_config=resource_spec,
+                    resources=images.get_candidates(resource_spec),
+                    typename="image"))
             resource_spec["name"] = resource_name
 
         # NOTE(wtakase): gets EC2 resource id from name or regex
         ec2client = self._clients.ec2()
-        resource_ec2_id = types._id_from_name(
-            resource_config=resource_spec,
-            resources=list(ec2client.get_all_images()),
-            typename="ec2_image")
+        resource_ec2_id = self._resolve(
+            "ec2.images",
+            lambda: list(ec2client.get_all_images()),
+            lambda images: types._id_from_name(
+                resource_config=resource_spec,
+                resources=images.get_candidates(resource_spec),
+                typename="ec2_image"))
         return resource_ec2_id
 
 
@@ -252,10 +424,13 @@ class VolumeType(DeprecatedBehaviourMixin, OpenStackResourceType):
         resource_id = resource_spec.get("id")
         if not resource_id:
             cinder = block.BlockStorage(self._clients)
-            resource_id = types._id_from_name(
-                resource_config=resource_spec,
-                resources=cinder.list_types(),
-                typename="volume_type")
+            resource_id = self._resolve(
+                "cinder.volume_types", cinder.list_types,
+                lambda volume_types: types._id_from_name(
+                    resource_config=resource_spec,
+                    resources=volume_types.get_candidates(resource_spec),
+                    typename="volume_type"),
+                checker=cinder.get_volume_type)
         return resource_id
 
 
@@ -266,15 +441,20 @@ class NeutronNetwork(DeprecatedBehaviourMixin, OpenStackResourceType):
         resource_id = resource_spec.get("id")
         if resource_id:
             return resource_id
-        else:
-            neutronclient = self._clients.neutron()
-            for net in neutronclient.list_networks()["networks"]:
-                if net["name"] == resource_spec.get("name"):
-                    return net["id"]
-
-        raise exceptions.InvalidScenarioArgument(
-            "Neutron network with name '{name}' not found".format(
-                name=resource_spec.get("name")))
+
+        def find(networks):
+            matching = networks.get_by_name(resource_spec.get("name"))
+            if not matching:
+                raise exceptions.InvalidScenarioArgument(
+                    "Neutron network with name '{name}' not found".format(
+                        name=resource_spec.get("name")))
+            return matching[0]["id"]
+
+        neutronclient = self._clients.neutron()
+        return self._resolve(
+            "neutron.networks",
+            lambda: neutronclient.list_networks()["networks"], find,
+            checker=neutronclient.show_network)
 
 
 @plugin.configure(name="watcher_strategy")
@@ -16,10 +16,14 @@
 import inspect
 import os
 import re
-import six
+import sys
 
+import six
 
+from rally.common import broker
+from rally.common import cfg
 from rally.common import logging
+from rally.common import utils as rutils
 from rally.common import validation
 from rally.common import yamlutils as yaml
 from rally import exceptions
@@ -31,10 +35,49 @@ from rally_openstack import consts
 from rally_openstack.contexts.keystone import roles
 from rally_openstack.contexts.nova import flavors as flavors_ctx
 from rally_openstack import types as openstack_types
+from rally_openstack.wrappers import network as network_wrapper
 
 
 LOG = logging.getLogger(__name__)
 
+CONF = cfg.CONF
+
+
+def _check_per_tenant(users, check, skip_first=False):
+    """Run the check for one user of every tenant concurrently.
+
+    Users of one tenant see the same resources, so it is enough to check
+    only one of them. The first exception raised by the checks (in order of
+    tenants) is re-raised.
+
+    :param users: list of users from the context
+    :param check: a function which takes a user and returns a result
+    :param skip_first: do not check the first tenant (it is already checked)
+    :returns: list of tuples with the checked user and the result of check
+    """
+    users = [user for user, tenant_id in rutils.iterate_per_tenants(users)]
+    if skip_first:
+        users = users[1:]
+    results = [None] * len(users)
+
+    def publish(queue):
+        for i in range(len(users)):
+            queue.append(i)
+
+    def consume(cache, i):
+        try:
+            results[i] = (True, check(users[i]))
+        except Exception:
+            results[i] = (False, sys.exc_info())
+
+    broker.run(publish, consume,
+               CONF.openstack.users_context_resource_management_workers)
+
+    for succeeded, result in results:
+        if not succeeded:
+            six.reraise(*result)
+    return [(user, result) for user, (_, result) in zip(users, results)]
+
 
 class RequiredOpenStackValidator(validation.RequiredPlatformValidator):
     def __init__(self, admin=False, users=False):
@@ -137,15 +180,32 @@ class ImageExistsValidator(validation.Validator):
             if image_ctx_name == image_args.get("name") or (
                     "regex" in image_args and match):
                 return
+
+        def check(user):
+            image_processor = openstack_types.GlanceImage(
+                context={"admin": {"credential": user["credential"]}})
+            image_id = image_processor.pre_process(image_args, config={})
+            return user["credential"].clients().glance().images.get(image_id)
+
+        if not context["users"]:
+            return
         try:
-            for user in context["users"]:
-                image_processor = openstack_types.GlanceImage(
-                    context={"admin": {"credential": user["credential"]}})
-                image_id = image_processor.pre_process(image_args, config={})
-                user["credential"].clients().glance().images.get(image_id)
+            # NOTE: a public image is visible to everyone, so other tenants
+            #   are checked only if the image of the first one is not public
+            image = check(context["users"][0])
+            if not self._is_public(image):
+                _check_per_tenant(context["users"], check, skip_first=True)
         except (glance_exc.HTTPNotFound, exceptions.InvalidScenarioArgument):
             self.fail("Image '%s' not found" % image_args)
 
+    @staticmethod
+    def _is_public(image):
+        if hasattr(image, "to_dict"):
+            # Glance v1 image
+            image = image.to_dict()
+        return (image.get("visibility") == "public"
+                or image.get("is_public") is True)
+
 
 @validation.add("required_platform", platform="openstack", users=True)
 @validation.configure(name="external_network_exists", platform="openstack")
@@ -166,11 +226,14 @@ class ExternalNetworkExistsValidator(validation.Validator):
         if not ext_network:
             return
 
+        def list_networks(user):
+            clients = user["credential"].clients()
+            return clients.neutron().list_networks()["networks"]
+
         result = []
-        for user in context["users"]:
+        for user, networks in _check_per_tenant(context["users"],
+                                                list_networks):
             creds = user["credential"]
-
-            networks = creds.clients().neutron().list_networks()["networks"]
             external_networks = [net["name"] for net in networks if
                                  net.get("router:external", False)]
             if ext_network not in external_networks:
@@ -210,8 +273,10 @@ class RequiredNeutronExtensionsValidator(validation.Validator):
     @with_roles_ctx()
     def validate(self, context, config, plugin_cls, plugin_cfg):
         clients = context["users"][0]["credential"].clients()
-        extensions = clients.neutron().list_extensions()["extensions"]
-        aliases = [x["alias"] for x in extensions]
+        # NOTE: extensions are the same for all users of the cloud, so they
+        #   are shared with network wrappers via the capabilities cache
+        aliases = network_wrapper.get_extensions(
+            network_wrapper.get_cloud(clients), clients.neutron())
         for extension in self.req_ext:
             if extension not in aliases:
                 self.fail("Neutron extension %s is not configured" % extension)
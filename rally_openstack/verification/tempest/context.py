@@ -18,12 +18,12 @@ import re
 
 from rally.common import logging
 from rally import exceptions
-from rally.task import utils as task_utils
 from rally.verification import context
 from rally.verification import utils
 import requests
 from six.moves import configparser
 
+from rally_openstack import polling
 from rally_openstack.services.image import image
 from rally_openstack.verification.tempest import config as conf
 from rally_openstack.wrappers import network
@@ -295,7 +295,7 @@ class TempestContext(context.VerifierContext):
         for image_obj in self._created_images:
             LOG.debug("Deleting image '%s'." % image_obj.name)
             self.clients.glance().images.delete(image_obj.id)
-            task_utils.wait_for_status(
+            polling.wait_for_status(
                 image_obj, ["deleted", "pending_delete"],
                 check_deletion=True,
                 update_resource=image_service.get_image,
@@ -17,8 +17,10 @@ import abc
 import itertools
 import netaddr
 import six
+import sys
+import threading
+import time
 
-from neutronclient.common import exceptions as neutron_exceptions
 from rally.common import cfg
 from rally.common import logging
 from rally.common import utils
@@ -34,6 +36,10 @@ CONF = cfg.CONF
 cidr_incr = utils.RAMInt()
 ipv6_cidr_incr = utils.RAMInt()
 
+# (cloud, capability, project) -> (timestamp, value)
+_capabilities = {}
+_capabilities_lock = threading.Lock()
+
 
 def generate_cidr(start_cidr="10.2.0.0/24"):
     """Generate next CIDR for network or subnet, without IP overlapping.
@@ -53,6 +59,83 @@ def generate_cidr(start_cidr="10.2.0.0/24"):
     return cidr
 
 
+def _get_credential(clients):
+    credential = getattr(clients, "credential", None)
+    if credential is None:
+        # NOTE: scenarios pass their bound `clients` method instead of
+        #   osclients.Clients instance
+        owner = getattr(clients, "__self__", None)
+        owner_clients = (getattr(owner, "_clients", None)
+                         or getattr(owner, "_admin_clients", None))
+        credential = getattr(owner_clients, "credential", None)
+    return credential
+
+
+def get_cloud(clients):
+    """Returns a key which identifies the cloud of clients or None."""
+    credential = _get_credential(clients)
+    if credential is None:
+        return None
+    return credential.auth_url, credential.region_name
+
+
+def get_project(clients):
+    """Returns a key which identifies the project of clients or None."""
+    credential = _get_credential(clients)
+    if credential is None:
+        return None
+    return credential.project_domain_name, credential.tenant_name
+
+
+def get_capability(cloud, name, loader, project=None):
+    """Returns cached capability of the cloud, loading it if needed.
+
+    :param cloud: key of the cloud returned by `get_cloud`. Nothing is
+        cached if it is None.
+    :param name: name of the capability
+    :param loader: a function which loads the capability from the cloud
+    :param project: key of the project returned by `get_project` for
+        capabilities which depend on the project, e.g. visible networks
+    """
+    ttl = CONF.openstack.neutron_capabilities_cache_ttl
+    if cloud is None or ttl <= 0:
+        return loader()
+    key = (cloud, name, project)
+    with _capabilities_lock:
+        cached = _capabilities.get(key)
+    if cached and time.time() - cached[0] < ttl:
+        return cached[1]
+    value = loader()
+    with _capabilities_lock:
+        _capabilities[key] = (time.time(), value)
+    return value
+
+
+def get_extensions(cloud, client):
+    """Returns aliases of enabled neutron extensions of the cloud.
+
+    :param cloud: key of the cloud returned by `get_cloud`
+    :param client: neutron client
+    """
+    return get_capability(
+        cloud, "extensions",
+        lambda: frozenset(e.get("alias") for e in
+                          client.list_extensions().get("extensions", [])))
+
+
+def invalidate_capabilities(cloud=None):
+    """Drop cached capabilities of the cloud (or of all clouds).
+
+    Capabilities of all projects of the cloud are dropped as well.
+    """
+    with _capabilities_lock:
+        if cloud is None:
+            _capabilities.clear()
+        else:
+            for key in [k for k in _capabilities if k[0] == cloud]:
+                _capabilities.pop(key)
+
+
 class NetworkWrapperException(exceptions.RallyException):
     error_code = 532
     msg_fmt = "%(message)s"
@@ -88,6 +171,8 @@ class NetworkWrapper(object):
             self.client = getattr(clients, self.SERVICE_IMPL)()
         else:
             self.client = clients(self.SERVICE_IMPL)
+        self.cloud = get_cloud(clients)
+        self.project = get_project(clients)
         self.config = config or {}
         self.owner = owner
         self.start_cidr = self.config.get("start_cidr", self.START_CIDR)
@@ -128,8 +213,18 @@ class NeutronWrapper(NetworkWrapper):
 
     @property
     def external_networks(self):
-        return self.client.list_networks(**{
-            "router:external": True})["networks"]
+        # NOTE: visibility of networks depends on the project
+        networks = get_capability(
+            self.cloud, "external_networks",
+            lambda: self.client.list_networks(**{
+                "router:external": True})["networks"],
+            project=self.project)
+        return list(networks)
+
+    @property
+    def extensions(self):
+        """Aliases of enabled neutron extensions."""
+        return get_extensions(self.cloud, self.client)
 
     @property
     def ext_gw_mode_enabled(self):
@@ -137,10 +232,11 @@ class NeutronWrapper(NetworkWrapper):
 
         Without this extension, we can't pass the enable_snat parameter.
         """
-        return any(e["alias"] == "ext-gw-mode"
-                   for e in self.client.list_extensions()["extensions"])
+        return "ext-gw-mode" in self.extensions
 
     def get_network(self, net_id=None, name=None):
+        from neutronclient.common import exceptions as neutron_exceptions
+
         net = None
         try:
             if net_id:
@@ -169,9 +265,12 @@ class NeutronWrapper(NetworkWrapper):
         kwargs["name"] = self.owner.generate_random_name()
 
         if external and "external_gateway_info" not in kwargs:
-            for net in self.external_networks:
+            external_networks = self.external_networks
+            ext_gw_mode_enabled = (external_networks
+                                   and self.ext_gw_mode_enabled)
+            for net in external_networks:
                 kwargs["external_gateway_info"] = {"network_id": net["id"]}
-                if self.ext_gw_mode_enabled:
+                if ext_gw_mode_enabled:
                     kwargs["external_gateway_info"]["enable_snat"] = True
         return self.client.create_router({"router": kwargs})["router"]
 
@@ -225,47 +324,119 @@ class NeutronWrapper(NetworkWrapper):
             "tenant_id": tenant_id,
             "name": self.owner.generate_random_name()})
         network = self.client.create_network(network_args)["network"]
+        if network.get("router:external"):
+            invalidate_capabilities(self.cloud)
+
+        router = self._create_network_router(tenant_id, kwargs)
+
+        subnets = []
+        ip_versions = self._get_subnet_ip_versions(kwargs)
+        for i in range(kwargs.get("subnets_num", 0)):
+            subnet_args = {"subnet": self._get_subnet_args(
+                tenant_id, network["id"], next(ip_versions), kwargs)}
+            subnet = self.client.create_subnet(subnet_args)["subnet"]
+            subnets.append(subnet["id"])
+
+            if router:
+                self.client.add_interface_router(router["id"],
+                                                 {"subnet_id": subnet["id"]})
+
+        return self._get_network_info(tenant_id, network, router, subnets)
 
-        router = None
+    def create_networks(self, tenant_id, networks_num, **kwargs):
+        """Create several networks with their subnets at once.
+
+        Networks and subnets of all networks are created by a single bulk
+        request each. Routers do not support bulk creation, so they are
+        created one by one. Networks are removed if creation of their
+        subnets or routers fails.
+
+        :param tenant_id: str, tenant ID
+        :param networks_num: int, number of networks to create
+        :param kwargs: the same options as `create_network` accepts
+        :returns: list of dicts with network data
+        """
+        networks_args = []
+        for i in range(networks_num):
+            network_args = dict(kwargs.get("network_create_args", {}))
+            network_args.update({
+                "tenant_id": tenant_id,
+                "name": self.owner.generate_random_name()})
+            networks_args.append(network_args)
+        networks = self.client.create_network(
+            {"networks": networks_args})["networks"]
+        if any(net.get("router:external") for net in networks):
+            invalidate_capabilities(self.cloud)
+
+        result = [self._get_network_info(tenant_id, net, None, [])
+                  for net in networks]
+        try:
+            routers = []
+            for network in result:
+                router = self._create_network_router(tenant_id, kwargs)
+                network["router_id"] = router and router["id"] or None
+                routers.append(router)
+
+            subnets_args = []
+            ip_versions = self._get_subnet_ip_versions(kwargs)
+            for network in networks:
+                for i in range(kwargs.get("subnets_num", 0)):
+                    subnets_args.append(self._get_subnet_args(
+                        tenant_id, network["id"], next(ip_versions), kwargs))
+            if subnets_args:
+                subnets = self.client.create_subnet(
+                    {"subnets": subnets_args})["subnets"]
+            else:
+                subnets = []
+
+            for network, router in zip(result, routers):
+                for subnet in subnets:
+                    if subnet["network_id"] != network["id"]:
+                        continue
+                    network["subnets"].append(subnet["id"])
+                    if router:
+                        self.client.add_interface_router(
+                            router["id"], {"subnet_id": subnet["id"]})
+        except Exception:
+            exc_info = sys.exc_info()
+            for network in result:
+                with logging.ExceptionLogger(
+                        LOG, "Failed to delete network %s" % network["id"]):
+                    self.delete_network(network)
+            six.reraise(*exc_info)
+        return result
+
+    def _create_network_router(self, tenant_id, kwargs):
         router_args = dict(kwargs.get("router_create_args", {}))
         add_router = kwargs.get("add_router", False)
         if router_args or add_router:
             router_args["external"] = (
                 router_args.get("external", False) or add_router)
             router_args["tenant_id"] = tenant_id
-            router = self.create_router(**router_args)
-
-        dualstack = kwargs.get("dualstack", False)
+            return self.create_router(**router_args)
+        return None
 
-        subnets = []
-        subnets_num = kwargs.get("subnets_num", 0)
-        ip_versions = itertools.cycle(
+    def _get_subnet_ip_versions(self, kwargs):
+        return itertools.cycle(
             [self.SUBNET_IP_VERSION, self.SUBNET_IPV6_VERSION]
-            if dualstack else [self.SUBNET_IP_VERSION])
-        for i in range(subnets_num):
-            ip_version = next(ip_versions)
-            subnet_args = {
-                "subnet": {
-                    "tenant_id": tenant_id,
-                    "network_id": network["id"],
-                    "name": self.owner.generate_random_name(),
-                    "ip_version": ip_version,
-                    "cidr": self._generate_cidr(ip_version),
-                    "enable_dhcp": True,
-                    "dns_nameservers": (
-                        kwargs.get("dns_nameservers", ["8.8.8.8", "8.8.4.4"])
-                        if ip_version == 4
-                        else kwargs.get("dns_nameservers",
-                                        ["dead:beaf::1", "dead:beaf::2"]))
-                }
-            }
-            subnet = self.client.create_subnet(subnet_args)["subnet"]
-            subnets.append(subnet["id"])
+            if kwargs.get("dualstack", False) else [self.SUBNET_IP_VERSION])
 
-            if router:
-                self.client.add_interface_router(router["id"],
-                                                 {"subnet_id": subnet["id"]})
+    def _get_subnet_args(self, tenant_id, network_id, ip_version, kwargs):
+        return {
+            "tenant_id": tenant_id,
+            "network_id": network_id,
+            "name": self.owner.generate_random_name(),
+            "ip_version": ip_version,
+            "cidr": self._generate_cidr(ip_version),
+            "enable_dhcp": True,
+            "dns_nameservers": (
+                kwargs.get("dns_nameservers", ["8.8.8.8", "8.8.4.4"])
+                if ip_version == 4
+                else kwargs.get("dns_nameservers",
+                                ["dead:beaf::1", "dead:beaf::2"]))
+        }
 
+    def _get_network_info(self, tenant_id, network, router, subnets):
         return {"id": network["id"],
                 "name": network["name"],
                 "status": network["status"],
@@ -282,6 +453,8 @@ class NeutronWrapper(NetworkWrapper):
         self.client.delete_pool(pool_id)
 
     def delete_network(self, network):
+        from neutronclient.common import exceptions as neutron_exceptions
+
         if self.supports_extension("dhcp_agent_scheduler")[0]:
             net_dhcps = self.client.list_dhcp_agent_hosting_networks(
                 network["id"])["agents"]
@@ -321,6 +494,8 @@ class NeutronWrapper(NetworkWrapper):
             self._delete_subnet(subnet["id"])
 
         responce = self.client.delete_network(network["id"])
+        if network.get("external"):
+            invalidate_capabilities(self.cloud)
 
         if network["router_id"]:
             self.client.delete_router(network["router_id"])
@@ -401,8 +576,7 @@ class NeutronWrapper(NetworkWrapper):
         :returns: result tuple
         :rtype: (bool, string)
         """
-        extensions = self.client.list_extensions().get("extensions", [])
-        if any(ext.get("alias") == extension for ext in extensions):
+        if extension in self.extensions:
             return True, ""
 
         return False, "Neutron driver does not support %s" % extension
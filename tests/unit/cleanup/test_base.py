@@ -15,6 +15,7 @@
 
 import mock
 
+from rally.common import cfg
 from rally_openstack.cleanup import base
 from tests.unit import test
 
@@ -32,6 +33,8 @@ class ResourceDecoratorTestCase(test.TestCase):
 
         self.assertEqual("service", Fake._service)
         self.assertEqual("res", Fake._resource)
+        self.assertFalse(Fake._bulk_deletion_check)
+        self.assertEqual((), Fake._depends_on)
 
 
 class ResourceManagerTestCase(test.TestCase):
@@ -120,3 +123,78 @@ class ResourceManagerTestCase(test.TestCase):
         base.ResourceManager().list()
         mock_resource_manager__manager.assert_has_calls(
             [mock.call(), mock.call().list()])
+
+    @mock.patch("%s.ResourceManager.list" % BASE)
+    def test_list_ids(self, mock_resource_manager_list):
+        mock_resource_manager_list.return_value = [
+            mock.Mock(id="1", status="ACTIVE"),
+            mock.Mock(id="2", status="DELETED"),
+            mock.Mock(id="3", status="DELETE_COMPLETE"),
+            mock.Mock(id="4", status="ERROR")]
+
+        manager = base.ResourceManager(tenant_uuid="t")
+        self.assertEqual({"1", "4"}, manager.list_ids())
+        mock_resource_manager_list.assert_called_once_with()
+
+    def test__paginate(self):
+        cfg.CONF.set_override("cleanup_list_page_size", 2, "openstack")
+        self.addCleanup(cfg.CONF.clear_override, "cleanup_list_page_size",
+                        "openstack")
+        pages = [[mock.Mock(id="1"), mock.Mock(id="2")],
+                 [mock.Mock(id="3"), mock.Mock(id="4")],
+                 []]
+        list_method = mock.Mock(side_effect=pages)
+
+        manager = base.ResourceManager()
+        self.assertEqual(["1", "2", "3", "4"],
+                         [r.id for r in manager._paginate(
+                             list_method, search_opts={"name": "foo"})])
+        self.assertEqual(
+            [mock.call(search_opts={"name": "foo"}, limit=2, marker=None),
+             mock.call(search_opts={"name": "foo"}, limit=2, marker="2"),
+             mock.call(search_opts={"name": "foo"}, limit=2, marker="4")],
+            list_method.call_args_list)
+
+    def test__paginate_pages_are_capped_by_service(self):
+        cfg.CONF.set_override("cleanup_list_page_size", 1000, "openstack")
+        self.addCleanup(cfg.CONF.clear_override, "cleanup_list_page_size",
+                        "openstack")
+        pages = [[mock.Mock(id="1"), mock.Mock(id="2")],
+                 [mock.Mock(id="3")],
+                 []]
+        list_method = mock.Mock(side_effect=pages)
+
+        manager = base.ResourceManager()
+        self.assertEqual(["1", "2", "3"],
+                         [r.id for r in manager._paginate(list_method)])
+        self.assertEqual(
+            [mock.call(search_opts=None, limit=1000, marker=None),
+             mock.call(search_opts=None, limit=1000, marker="2"),
+             mock.call(search_opts=None, limit=1000, marker="3")],
+            list_method.call_args_list)
+
+    def test__paginate_marker_is_ignored(self):
+        list_method = mock.Mock(return_value=[mock.Mock(id="1")])
+
+        manager = base.ResourceManager()
+        self.assertEqual(["1", "1"],
+                         [r.id for r in manager._paginate(list_method)])
+        self.assertEqual(2, list_method.call_count)
+
+    def test__paginate_filter_is_not_supported(self):
+        list_method = mock.Mock(side_effect=[Exception("Bad Request"),
+                                             [mock.Mock(id="1")], []])
+
+        manager = base.ResourceManager()
+        self.assertEqual(["1"], [r.id for r in manager._paginate(
+            list_method, search_opts={"name~": "foo"})])
+        list_method.assert_called_with(search_opts=None, limit=mock.ANY,
+                                       marker="1")
+
+    def test__paginate_fails(self):
+        list_method = mock.Mock(side_effect=ValueError("Oops"))
+
+        manager = base.ResourceManager()
+        self.assertRaises(ValueError, list, manager._paginate(list_method))
+        list_method.assert_called_once_with(search_opts=None,
+                                            limit=mock.ANY, marker=None)
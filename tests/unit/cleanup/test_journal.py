@@ -0,0 +1,108 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import os
+
+import fixtures
+import mock
+
+from rally.common import cfg
+from rally_openstack.cleanup import journal
+from tests.unit import test
+
+
+class JournalTestCase(test.TestCase):
+
+    def setUp(self):
+        super(JournalTestCase, self).setUp()
+        journal_dir = self.useFixture(fixtures.TempDir()).path
+        cfg.CONF.set_override("cleanup_journal_dir", journal_dir, "openstack")
+        self.addCleanup(cfg.CONF.clear_override, "cleanup_journal_dir",
+                        "openstack")
+        self.scenario = mock.Mock(spec=["context"], context={
+            "task": {"uuid": "task_uuid"}, "tenant": {"id": "tenant_id"}})
+
+    def test_record_and_read(self):
+        journal.record(self.scenario, "nova.servers", mock.Mock(id="id1"))
+        journal.record(self.scenario, "neutron.network",
+                       {"network": {"id": "id2"}})
+        journal.record(self.scenario, "neutron.port", {"id": "id3"})
+
+        self.assertEqual(
+            [{"resource": "nova.servers", "id": "id1",
+              "tenant_id": "tenant_id"},
+             {"resource": "neutron.network", "id": "id2",
+              "tenant_id": "tenant_id"},
+             {"resource": "neutron.port", "id": "id3",
+              "tenant_id": "tenant_id"}],
+            journal.read("task_uuid"))
+        self.assertEqual([], journal.read("another_task"))
+
+        journal.remove("task_uuid")
+        self.assertEqual([], journal.read("task_uuid"))
+
+    def test_forget(self):
+        # nothing to forget without the journal
+        journal.forget("task_uuid", "keystone.project", ["id1"])
+        self.assertFalse(os.path.exists(journal._get_path("task_uuid")))
+
+        journal.record(self.scenario, "keystone.project", mock.Mock(id="id1"))
+        journal.record(self.scenario, "keystone.project", mock.Mock(id="id2"))
+        journal.record(self.scenario, "keystone.user", mock.Mock(id="id1"))
+
+        journal.forget("task_uuid", "keystone.project", ["id1"])
+
+        self.assertEqual(
+            [("keystone.project", "id2"), ("keystone.user", "id1")],
+            [(r["resource"], r["id"]) for r in journal.read("task_uuid")])
+
+    def test_record_by_service(self):
+        service = mock.Mock(spec=["_name_generator"])
+        service._name_generator = mock.Mock(__self__=self.scenario)
+
+        journal.record(service, "cinder.volumes", mock.Mock(id="id1"))
+
+        self.assertEqual(["id1"],
+                         [r["id"] for r in journal.read("task_uuid")])
+
+    def test_record_without_task(self):
+        journal.record(mock.Mock(spec=[]), "nova.servers", mock.Mock(id="1"))
+
+    def test_read_broken_record(self):
+        journal.record(self.scenario, "nova.servers", mock.Mock(id="id1"))
+        with open(journal._get_path("task_uuid"), "a") as f:
+            f.write("{\"resource\": \"nova.ser")
+
+        self.assertEqual(["id1"],
+                         [r["id"] for r in journal.read("task_uuid")])
+
+    def test_journaled(self):
+        class Scenario(object):
+            context = self.scenario.context
+
+            @journal.journaled("nova.servers")
+            def _boot_servers(self):
+                return [mock.Mock(id="id1"), mock.Mock(id="id2")]
+
+        servers = Scenario()._boot_servers()
+        self.assertEqual(2, len(servers))
+        # the journal is disabled by default
+        self.assertEqual([], journal.read("task_uuid"))
+
+        cfg.CONF.set_override("cleanup_journal", True, "openstack")
+        self.addCleanup(cfg.CONF.clear_override, "cleanup_journal",
+                        "openstack")
+        Scenario()._boot_servers()
+        self.assertEqual(["id1", "id2"],
+                         [r["id"] for r in journal.read("task_uuid")])
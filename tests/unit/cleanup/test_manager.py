@@ -13,9 +13,12 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import time
+
 import mock
 
 from rally.common import utils
+from rally import exceptions
 from rally_openstack.cleanup import base
 from rally_openstack.cleanup import manager
 from tests.unit import test
@@ -95,6 +98,118 @@ class SeekAndDestroyTestCase(test.TestCase):
         self.assertEqual(1, mock_log.warning.call_count)
         self.assertEqual(4, mock_log.exception.call_count)
 
+    @mock.patch("%s.time.time" % BASE, return_value=100)
+    @mock.patch("%s.LOG" % BASE)
+    def test__delete_single_resource_bulk_deletion_check(self, mock_log,
+                                                         mock_time):
+        manager_cls = mock.MagicMock(_bulk_deletion_check=True)
+        mock_resource = mock.MagicMock(_max_attempts=3, _timeout=10,
+                                       _interval=0.01, tenant_uuid="t1")
+        mock_resource.id.return_value = "r1"
+
+        destroyer = manager.SeekAndDestroy(manager_cls, None, None)
+        destroyer._delete_single_resource(mock_resource)
+
+        mock_resource.delete.assert_called_once_with()
+        self.assertFalse(mock_resource.is_deleted.called)
+        self.assertEqual({"t1": {"r1": (mock_resource, 110)}},
+                         destroyer._pending)
+        self.assertFalse(mock_log.warning.called)
+
+    def _pending_resource(self, res_id, list_ids_side_effect=None):
+        mock_resource = mock.MagicMock()
+        mock_resource.id.return_value = res_id
+        mock_resource.list_ids.side_effect = list_ids_side_effect
+        return mock_resource
+
+    @mock.patch("%s.rutils.interruptable_sleep" % BASE)
+    @mock.patch("%s.LOG" % BASE)
+    def test__wait_for_bulk_deletion(self, mock_log,
+                                     mock_interruptable_sleep):
+        manager_cls = mock.MagicMock(_timeout=10, _interval=1)
+        destroyer = manager.SeekAndDestroy(manager_cls, None, None)
+
+        r1 = self._pending_resource("r1", [{"r1", "r2", "foo"}, {"foo"}])
+        r2 = self._pending_resource("r2")
+        r3 = self._pending_resource("r3", [{"foo"}])
+        deadline = time.time() + 10
+        destroyer._pending = {"t1": {"r1": (r1, deadline),
+                                     "r2": (r2, deadline)},
+                              "t2": {"r3": (r3, deadline)}}
+
+        destroyer._wait_for_bulk_deletion()
+
+        self.assertEqual(2, r1.list_ids.call_count)
+        self.assertFalse(r2.list_ids.called)
+        r3.list_ids.assert_called_once_with()
+        mock_interruptable_sleep.assert_called_once_with(1)
+        self.assertEqual({}, destroyer._pending)
+        self.assertFalse(mock_log.warning.called)
+
+    @mock.patch("%s.rutils.interruptable_sleep" % BASE)
+    @mock.patch("%s.LOG" % BASE)
+    def test__wait_for_bulk_deletion_list_fails(self, mock_log,
+                                                mock_interruptable_sleep):
+        manager_cls = mock.MagicMock(_timeout=10, _interval=1)
+        destroyer = manager.SeekAndDestroy(manager_cls, None, None)
+
+        r1 = self._pending_resource("r1", Exception)
+        r1.is_deleted.return_value = True
+        destroyer._pending = {"t1": {"r1": (r1, time.time() + 10)}}
+
+        destroyer._wait_for_bulk_deletion()
+
+        r1.is_deleted.assert_called_once_with()
+        self.assertFalse(mock_interruptable_sleep.called)
+        self.assertEqual(1, mock_log.exception.call_count)
+        self.assertFalse(mock_log.warning.called)
+
+    @mock.patch("%s.rutils.interruptable_sleep" % BASE)
+    @mock.patch("%s.LOG" % BASE)
+    def test__wait_for_bulk_deletion_is_deleted_fails(
+            self, mock_log, mock_interruptable_sleep):
+        manager_cls = mock.MagicMock(_timeout=10, _interval=1)
+        destroyer = manager.SeekAndDestroy(manager_cls, None, None)
+
+        r1 = self._pending_resource("r1", Exception)
+        r1.is_deleted.side_effect = [Exception("Unauthorized"), True]
+        r2 = self._pending_resource("r2")
+        r2.is_deleted.return_value = True
+        deadline = time.time() + 10
+        destroyer._pending = {"t1": {"r1": (r1, deadline),
+                                     "r2": (r2, deadline)}}
+
+        destroyer._wait_for_bulk_deletion()
+
+        # r1 is pending until its check succeeds, r2 is not affected
+        self.assertEqual(2, r1.is_deleted.call_count)
+        r2.is_deleted.assert_called_once_with()
+        mock_interruptable_sleep.assert_called_once_with(1)
+        self.assertEqual(3, mock_log.exception.call_count)
+        self.assertFalse(mock_log.warning.called)
+        self.assertEqual({}, destroyer._pending)
+
+    @mock.patch("%s.rutils.interruptable_sleep" % BASE)
+    @mock.patch("%s.LOG" % BASE)
+    def test__wait_for_bulk_deletion_timeout(self, mock_log,
+                                             mock_interruptable_sleep):
+        manager_cls = mock.MagicMock(_timeout=10, _interval=1)
+        destroyer = manager.SeekAndDestroy(manager_cls, None, None)
+
+        r1 = self._pending_resource("r1", [{"r1", "r2"}])
+        r2 = self._pending_resource("r2", [set()])
+        # deletion of r2 was requested later, so it has more time
+        destroyer._pending = {"t1": {"r1": (r1, time.time()),
+                                     "r2": (r2, time.time() + 10)}}
+
+        destroyer._wait_for_bulk_deletion()
+
+        r2.list_ids.assert_called_once_with()
+        mock_interruptable_sleep.assert_called_once_with(1)
+        self.assertEqual(1, mock_log.warning.call_count)
+        self.assertIn("r1", mock_log.warning.call_args[0][0])
+        self.assertEqual({}, destroyer._pending)
+
     def _manager(self, list_side_effect, **kw):
         mock_mgr = mock.MagicMock()
         mock_mgr().list.side_effect = list_side_effect
@@ -116,7 +231,8 @@ class SeekAndDestroyTestCase(test.TestCase):
         publish(queue)
         mock__get_cached_client.assert_called_once_with(admin)
         mock_mgr.assert_called_once_with(
-            admin=mock__get_cached_client.return_value)
+            admin=mock__get_cached_client.return_value,
+            name_prefix="rally_")
         self.assertEqual(queue, [(admin, None, x) for x in range(1, 4)])
 
     @mock.patch("%s.SeekAndDestroy._get_cached_client" % BASE)
@@ -131,7 +247,8 @@ class SeekAndDestroyTestCase(test.TestCase):
         publish(queue)
         mock__get_cached_client.assert_called_once_with(admin)
         mock_mgr.assert_called_once_with(
-            admin=mock__get_cached_client.return_value)
+            admin=mock__get_cached_client.return_value,
+            name_prefix="rally_")
         self.assertEqual(queue, [(admin, None, x) for x in range(1, 4)])
 
     @mock.patch("%s.SeekAndDestroy._get_cached_client" % BASE)
@@ -151,12 +268,12 @@ class SeekAndDestroyTestCase(test.TestCase):
         mock_client = mock__get_cached_client.return_value
         mock_mgr.assert_has_calls([
             mock.call(admin=mock_client, user=mock_client,
-                      tenant_uuid=users[0]["tenant_id"]),
+                      tenant_uuid=users[0]["tenant_id"], name_prefix="rally_"),
             mock.call().list(),
             mock.call().list(),
             mock.call().list(),
             mock.call(admin=mock_client, user=mock_client,
-                      tenant_uuid=users[1]["tenant_id"]),
+                      tenant_uuid=users[1]["tenant_id"], name_prefix="rally_"),
             mock.call().list(),
             mock.call().list()
         ])
@@ -191,11 +308,11 @@ class SeekAndDestroyTestCase(test.TestCase):
         mock_client = mock__get_cached_client.return_value
         mock_mgr.assert_has_calls([
             mock.call(admin=mock_client, user=mock_client,
-                      tenant_uuid=users[0]["tenant_id"]),
+                      tenant_uuid=users[0]["tenant_id"], name_prefix="rally_"),
             mock.call().list(),
             mock.call().list(),
             mock.call(admin=mock_client, user=mock_client,
-                      tenant_uuid=users[2]["tenant_id"]),
+                      tenant_uuid=users[2]["tenant_id"], name_prefix="rally_"),
             mock.call().list(),
             mock.call().list(),
             mock.call().list()
@@ -216,7 +333,9 @@ class SeekAndDestroyTestCase(test.TestCase):
                        mock__get_cached_client,
                        mock_name_matches_object):
         mock_mgr = mock.MagicMock(__name__="Test")
-        resource_classes = [mock.Mock()]
+        resource_classes = [mock.Mock(**{
+            "_get_resource_name_format.return_value": "s_XXX_XXX",
+            "_generate_task_id_part.return_value": "tas"})]
         task_id = "task_id"
         mock_name_matches_object.return_value = True
 
@@ -234,7 +353,8 @@ class SeekAndDestroyTestCase(test.TestCase):
             resource="res",
             admin=mock__get_cached_client.return_value,
             user=mock__get_cached_client.return_value,
-            tenant_uuid=user1["tenant_id"])
+            tenant_uuid=user1["tenant_id"],
+            name_prefix="s_tas_")
         mock__get_cached_client.assert_has_calls([
             mock.call(admin),
             mock.call(user1)
@@ -252,7 +372,8 @@ class SeekAndDestroyTestCase(test.TestCase):
             resource="res2",
             admin=mock__get_cached_client.return_value,
             user=mock__get_cached_client.return_value,
-            tenant_uuid=None)
+            tenant_uuid=None,
+            name_prefix="s_tas_")
 
         mock__get_cached_client.assert_has_calls([
             mock.call(admin),
@@ -295,6 +416,20 @@ class SeekAndDestroyTestCase(test.TestCase):
                                                 cleaner._consumer,
                                                 consumers_count=5)
 
+    @mock.patch("%s.broker.run" % BASE)
+    def test_exterminate_with_pending_resources(self, mock_broker_run):
+        manager_cls = mock.MagicMock(_threads=5)
+        cleaner = manager.SeekAndDestroy(manager_cls, None, None)
+        cleaner._wait_for_bulk_deletion = mock.Mock()
+
+        def consume(*args, **kwargs):
+            cleaner._pending["t1"] = {"r1": mock.Mock()}
+
+        mock_broker_run.side_effect = consume
+        cleaner.exterminate()
+
+        cleaner._wait_for_bulk_deletion.assert_called_once_with()
+
 
 class ResourceManagerTestCase(test.TestCase):
 
@@ -310,6 +445,23 @@ class ResourceManagerTestCase(test.TestCase):
         mock_iter.assert_called_once_with(base.ResourceManager)
         mock_iter.reset_mock()
 
+    def test_get_name_prefix(self):
+        class Scenario(utils.RandomNameGeneratorMixin):
+            RESOURCE_NAME_FORMAT = "s_rally_XXXXXXXX_XXXXXXXX"
+
+        class Context(utils.RandomNameGeneratorMixin):
+            RESOURCE_NAME_FORMAT = "c_rally_XXXXXXXX_XXXXXXXX"
+
+        task_id = "e5b9fd3e-70d2-4e7f-b4d4-d2b7bcb3bbd3"
+        self.assertEqual("s_rally_",
+                         manager.get_name_prefix([Scenario]))
+        self.assertEqual("s_rally_e5b9fd3e_",
+                         manager.get_name_prefix([Scenario], task_id))
+        self.assertIsNone(manager.get_name_prefix([Scenario, Context]))
+        self.assertIsNone(manager.get_name_prefix([]))
+        self.assertIsNone(manager.get_name_prefix(
+            [utils.make_name_matcher("foo")]))
+
     @mock.patch("%s.discover.itersubclasses" % BASE)
     def test_list_resource_names(self, mock_itersubclasses):
         mock_itersubclasses.return_value = [
@@ -428,3 +580,164 @@ class ResourceManagerTestCase(test.TestCase):
                       resource_classes=[A], task_id="task_id"),
             mock.call().exterminate()
         ])
+
+    def _get_mgr(self, service, resource, depends_on=()):
+        return mock.MagicMock(_service=service, _resource=resource,
+                              _depends_on=depends_on,
+                              __repr__=lambda s: "%s.%s" % (service,
+                                                            resource))
+
+    def test_get_dependencies(self):
+        heat = self._get_mgr("heat", "stacks")
+        servers = self._get_mgr("nova", "servers", ["heat"])
+        keypairs = self._get_mgr("nova", "keypairs")
+        port = self._get_mgr("neutron", "port", ["nova.servers"])
+        swift = self._get_mgr("swift", "object")
+        user = self._get_mgr("keystone", "user", ["*"])
+        role = self._get_mgr("keystone", "role", ["*"])
+
+        mgrs = [heat, servers, keypairs, port, swift, user, role]
+        self.assertEqual(
+            {heat: set(),
+             servers: {heat},
+             keypairs: {servers},
+             port: {servers},
+             swift: set(),
+             user: {heat, servers, keypairs, port, swift},
+             role: {heat, servers, keypairs, port, swift, user}},
+            manager.get_dependencies(mgrs))
+
+    def test_run_with_dependencies(self):
+        heat = self._get_mgr("heat", "stacks")
+        servers = self._get_mgr("nova", "servers", ["heat"])
+        swift = self._get_mgr("swift", "object")
+        glance = self._get_mgr("glance", "images")
+        user = self._get_mgr("keystone", "user", ["*"])
+
+        started = []
+        finished = []
+
+        def func(mgr):
+            started.append(mgr)
+            if mgr is user:
+                self.assertEqual(4, len(finished))
+            if mgr is servers:
+                self.assertIn(heat, finished)
+            finished.append(mgr)
+
+        manager.run_with_dependencies([heat, servers, swift, glance, user],
+                                      func, concurrency=3)
+
+        self.assertEqual({heat, servers, swift, glance, user}, set(started))
+        self.assertEqual(user, finished[-1])
+
+    def test_run_with_dependencies_one_by_one(self):
+        mgrs = [self._get_mgr("s%s" % i, "r") for i in range(5)]
+        processed = []
+
+        manager.run_with_dependencies(mgrs, processed.append)
+
+        self.assertEqual(mgrs, processed)
+
+    def test_run_with_dependencies_without_concurrency(self):
+        mgrs = [self._get_mgr("s%s" % i, "r") for i in range(3)]
+        processed = []
+
+        manager.run_with_dependencies(mgrs, processed.append, concurrency=0)
+
+        self.assertEqual(mgrs, processed)
+
+    @mock.patch("%s.LOG" % BASE)
+    def test_run_with_dependencies_circular(self, mock_log):
+        a = self._get_mgr("a", "r", ["b"])
+        b = self._get_mgr("b", "r", ["a"])
+        processed = []
+
+        manager.run_with_dependencies([a, b], processed.append,
+                                      concurrency=2)
+
+        self.assertEqual([a, b], processed)
+        self.assertTrue(mock_log.warning.called)
+
+    def test_run_with_dependencies_fails(self):
+        a = self._get_mgr("a", "r")
+        b = self._get_mgr("b", "r", ["a"])
+        processed = []
+
+        def func(mgr):
+            processed.append(mgr)
+            raise KeyError(mgr)
+
+        self.assertRaises(KeyError, manager.run_with_dependencies,
+                          [a, b], func, concurrency=2)
+        self.assertEqual([a], processed)
+
+    @mock.patch("%s.journal" % BASE)
+    @mock.patch("%s.find_resource_managers" % BASE)
+    def test_cleanup_by_journal(self, mock_find_resource_managers,
+                                mock_journal):
+        mock_journal.read.return_value = [
+            {"resource": "nova.servers", "id": "s1", "tenant_id": "t1"},
+            {"resource": "nova.servers", "id": "s1", "tenant_id": "t1"},
+            {"resource": "nova.servers", "id": "s2", "tenant_id": "t1"},
+            {"resource": "nova.servers", "id": "s3", "tenant_id": "t2"},
+            {"resource": "nova.servers", "id": "s4", "tenant_id": "t2"},
+            {"resource": "cinder.volumes", "id": "v1", "tenant_id": "t1"}]
+
+        not_found = Exception("Not Found")
+        not_found.code = 404
+
+        def get_resource(resource_id):
+            if resource_id == "s2":
+                raise not_found
+            if resource_id == "s4":
+                # rally services raise their own exceptions
+                raise exceptions.GetResourceNotFound(resource=resource_id)
+            return mock.Mock(id=resource_id)
+
+        def create_manager(admin, user, tenant_uuid):
+            mgr = mock.Mock(_max_attempts=1)
+            mgr.get_resource.side_effect = get_resource
+
+            def delete():
+                if mgr.raw_resource.id == "s3":
+                    raise Exception("Oops")
+
+            mgr.delete.side_effect = delete
+            mgr.is_deleted.return_value = True
+            return mgr
+
+        mock_mgr = mock.Mock(_service="nova", _resource="servers",
+                             _threads=1, side_effect=create_manager)
+
+        mock_find_resource_managers.return_value = [mock_mgr]
+        admin = {"credential": mock.MagicMock()}
+
+        result = manager.cleanup_by_journal("task_uuid", admin)
+
+        mock_journal.read.assert_called_once_with("task_uuid")
+        mock_find_resource_managers.assert_called_once_with(
+            {"nova.servers": mock.ANY, "cinder.volumes": mock.ANY})
+        self.assertEqual(
+            {"discovered": 2, "deleted": 1, "failed": 1,
+             "resources": {"nova.servers": {"discovered": 2, "deleted": 1,
+                                            "failed": 1}},
+             "errors": [{"resource_id": "s3",
+                         "resource_type": "nova.servers",
+                         "message": "Oops"}]},
+            result)
+        # the journal is kept since not all resources are deleted
+        self.assertFalse(mock_journal.remove.called)
+
+    @mock.patch("%s.journal" % BASE)
+    @mock.patch("%s.find_resource_managers" % BASE)
+    def test_cleanup_by_journal_empty(self, mock_find_resource_managers,
+                                      mock_journal):
+        mock_journal.read.return_value = []
+
+        result = manager.cleanup_by_journal("task_uuid", None)
+
+        self.assertEqual({"discovered": 0, "deleted": 0, "failed": 0,
+                          "resources": {}, "errors": []}, result)
+        self.assertFalse(mock_find_resource_managers.called)
+        mock_journal.remove.assert_called_once_with("task_uuid")
@@ -16,18 +16,37 @@
 import copy
 
 from boto import exception as boto_exception
+from cinderclient import api_versions
 import ddt
 import mock
 from neutronclient.common import exceptions as neutron_exceptions
 from novaclient import exceptions as nova_exc
 from watcherclient.common.apiclient import exceptions as watcher_exceptions
 
+from rally.common import cfg
+from rally_openstack.cleanup import manager
 from rally_openstack.cleanup import resources
 from tests.unit import test
 
 BASE = "rally_openstack.cleanup.resources"
 GLANCE_V2_PATH = ("rally_openstack.services.image.glance_v2."
                   "GlanceV2Service")
+CONF = cfg.CONF
+
+
+class DependenciesTestCase(test.TestCase):
+
+    def test_dependencies_follow_order(self):
+        # cleanup with default concurrency should process resource managers
+        # in the same order as before dependencies were introduced
+        mgrs = [mgr for mgr in manager.find_resource_managers(
+                manager.list_resource_names())
+                if mgr._service and mgr.__module__ == resources.__name__]
+        for mgr, required in manager.get_dependencies(mgrs).items():
+            for dep in required:
+                self.assertLessEqual(dep._order, mgr._order,
+                                     "%s depends on %s" % (mgr, dep))
+        self.assertIn(resources.NovaServer, mgrs)
 
 
 class SynchronizedDeletionTestCase(test.TestCase):
@@ -80,10 +99,30 @@ class NovaServerTestCase(test.TestCase):
     def test_list(self):
         server = resources.NovaServer()
         server._manager = mock.MagicMock()
+        servers = [mock.Mock(id="a"), mock.Mock(id="b")]
+        server._manager.return_value.list.side_effect = [servers, []]
 
-        server.list()
+        self.assertEqual(servers, list(server.list()))
 
-        server._manager.return_value.list.assert_called_once_with(limit=-1)
+        server._manager.return_value.list.assert_has_calls([
+            mock.call(search_opts={},
+                      limit=CONF.openstack.cleanup_list_page_size,
+                      marker=None),
+            mock.call(search_opts={},
+                      limit=CONF.openstack.cleanup_list_page_size,
+                      marker="b")])
+
+    def test_list_with_name_prefix(self):
+        server = resources.NovaServer(name_prefix="s_rally_")
+        server._manager = mock.MagicMock()
+        servers = [mock.Mock(id="a")]
+        server._manager.return_value.list.side_effect = [servers, []]
+
+        self.assertEqual(servers, list(server.list()))
+
+        server._manager.return_value.list.assert_any_call(
+            search_opts={"name": "^s_rally_"},
+            limit=CONF.openstack.cleanup_list_page_size, marker=None)
 
     def test_delete(self):
         server = resources.NovaServer()
@@ -546,8 +585,8 @@ class NeutronPortTestCase(test.TestCase):
         user = mock.Mock(neutron=neutron)
         self.assertEqual(expected_ports, resources.NeutronPort(
             user=user, tenant_uuid=tenant_uuid).list())
-        neutron.list_ports.assert_called_once_with()
-        neutron.list_routers.assert_called_once_with()
+        neutron.list_ports.assert_called_once_with(tenant_id=tenant_uuid)
+        neutron.list_routers.assert_called_once_with(tenant_id=tenant_uuid)
 
 
 @ddt.ddt
@@ -757,6 +796,21 @@ class KeystoneMixinTestCase(test.TestCase):
         identity.return_value.list_some_resource2s.assert_called_once_with()
 
 
+class KeystonePooledMixinTestCase(test.TestCase):
+
+    @mock.patch("%s.users_pool.get_pooled_ids" % BASE,
+                return_value={"t1", "u1"})
+    @mock.patch("%s.identity" % BASE)
+    def test_list(self, mock_identity, mock_get_pooled_ids):
+        manager = resources.KeystoneProject(admin=mock.MagicMock())
+        projects = [mock.Mock(id="t1"), mock.Mock(id="t2")]
+        mock_identity.Identity.return_value.list_projects.return_value = (
+            projects)
+
+        self.assertEqual(projects[1:], manager.list())
+        mock_get_pooled_ids.assert_called_once_with()
+
+
 class KeystoneEc2TestCase(test.TestCase):
     def test_user_id_property(self):
         user_client = mock.Mock()
@@ -1076,6 +1130,53 @@ class WatcherActionPlanTestCase(test.TestCase):
         watcher._manager().list.assert_called_once_with(limit=0)
 
 
+@ddt.ddt
+class CinderNameFilterMixinTestCase(test.TestCase):
+
+    @ddt.data(
+        {"resource_cls": resources.CinderVolume, "api_version": "3.34",
+         "filtered": True},
+        {"resource_cls": resources.CinderVolumeSnapshot,
+         "api_version": "3.34", "filtered": True},
+        {"resource_cls": resources.CinderVolumeBackup, "api_version": "3.34",
+         "filtered": True},
+        {"resource_cls": resources.CinderVolume, "api_version": "3.50",
+         "filtered": True},
+        {"resource_cls": resources.CinderVolume, "api_version": "3.33",
+         "filtered": False},
+        {"resource_cls": resources.CinderVolume, "api_version": "2.0",
+         "filtered": False},
+        {"resource_cls": resources.CinderVolume, "api_version": None,
+         "filtered": False})
+    @ddt.unpack
+    def test_list(self, resource_cls, api_version, filtered):
+        manager = resource_cls(name_prefix="s_rally_")
+        manager._manager = mock.MagicMock()
+        manager._manager.return_value.api.api_version = (
+            api_versions.APIVersion(api_version))
+        listed = [mock.Mock(id="a")]
+        manager._manager.return_value.list.side_effect = [listed, []]
+
+        self.assertEqual(listed, list(manager.list()))
+
+        search_opts = {"name~": "s_rally_"} if filtered else {}
+        manager._manager.return_value.list.assert_any_call(
+            search_opts=search_opts,
+            limit=CONF.openstack.cleanup_list_page_size, marker=None)
+
+    def test_list_without_name_prefix(self):
+        manager = resources.CinderVolume()
+        manager._manager = mock.MagicMock()
+        manager._manager.return_value.list.side_effect = [
+            [mock.Mock(id="a")], []]
+
+        self.assertEqual(1, len(list(manager.list())))
+
+        manager._manager.return_value.list.assert_any_call(
+            search_opts={}, limit=CONF.openstack.cleanup_list_page_size,
+            marker=None)
+
+
 class CinderImageVolumeCacheTestCase(test.TestCase):
 
     class Resource(object):
@@ -155,6 +155,7 @@ class CeilometerSampleGeneratorTestCase(test.TestCase):
                                    **kwargs)
         )[0]
         new_context = copy.deepcopy(real_context)
+        new_context["config"]["ceilometer"]["resource_management_workers"] = 1
         for id_ in tenants.keys():
             new_context["tenants"][id_].setdefault("samples", [])
             new_context["tenants"][id_].setdefault("resources", [])
@@ -173,6 +174,72 @@ class CeilometerSampleGeneratorTestCase(test.TestCase):
         ceilometer_ctx.setup()
         self.assertEqual(new_context, ceilometer_ctx.context)
 
+    @mock.patch("%s.samples.ceilo_utils.CeilometerScenario._get_resource"
+                % CTX)
+    @mock.patch("%s.samples.ceilo_utils.CeilometerScenario._create_samples"
+                % CTX)
+    def test_setup_with_workers(self, mock_create_samples,
+                                mock_get_resource):
+        tenants, real_context = self._gen_context(3, 1, 4, 2)
+        real_context["config"]["ceilometer"][
+            "resource_management_workers"] = 4
+        mock_create_samples.side_effect = lambda batch: [
+            mock.Mock(resource_id=s["resource_id"]) for s in batch]
+
+        ceilometer_ctx = samples.CeilometerSampleGenerator(real_context)
+        ceilometer_ctx.setup()
+
+        resources = []
+        for tenant in ceilometer_ctx.context["tenants"].values():
+            self.assertEqual(4, len(tenant["resources"]))
+            self.assertEqual(8, len(tenant["samples"]))
+            resources.extend(tenant["resources"])
+        self.assertEqual(12, len(set(resources)))
+        self.assertEqual(12, mock_get_resource.call_count)
+
+    @mock.patch("%s.samples.time" % CTX)
+    @mock.patch("%s.samples.ceilo_utils.CeilometerScenario._get_resource"
+                % CTX)
+    def test__wait_for_resources(self, mock_get_resource, mock_time):
+        from ceilometerclient import exc
+
+        mock_time.time.side_effect = [0, 1, 2]
+        not_ready = {"r2": 1}
+
+        def get_resource(resource_id):
+            if not_ready.get(resource_id):
+                not_ready[resource_id] -= 1
+                raise exc.HTTPNotFound()
+
+        mock_get_resource.side_effect = get_resource
+        tenants, context = self._gen_context(1, 1, 1, 1)
+        ceilometer_ctx = samples.CeilometerSampleGenerator(context)
+
+        user = context["users"][0]
+        ceilometer_ctx._wait_for_resources([(user, "r1"), (user, "r2")], 2)
+
+        self.assertEqual(3, mock_get_resource.call_count)
+        mock_time.sleep.assert_called_once_with(
+            ceilometer_ctx.RESOURCES_READY_CHECK_INTERVAL)
+
+    @mock.patch("%s.samples.time" % CTX)
+    @mock.patch("%s.samples.ceilo_utils.CeilometerScenario._get_resource"
+                % CTX)
+    def test__wait_for_resources_timeout(self, mock_get_resource,
+                                         mock_time):
+        from ceilometerclient import exc
+
+        mock_time.time.side_effect = [0, 1, 1000]
+        mock_get_resource.side_effect = exc.HTTPNotFound()
+        tenants, context = self._gen_context(1, 1, 1, 1)
+        ceilometer_ctx = samples.CeilometerSampleGenerator(context)
+
+        user = context["users"][0]
+        self.assertRaises(exceptions.ContextSetupFailure,
+                          ceilometer_ctx._wait_for_resources,
+                          [(user, "r1"), (user, "r2")], 2)
+        self.assertEqual(4, mock_get_resource.call_count)
+
     def test_cleanup(self):
         tenants, context = self._gen_context(2, 5, 3, 3)
         ceilometer_ctx = samples.CeilometerSampleGenerator(context)
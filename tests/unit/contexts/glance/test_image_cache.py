@@ -0,0 +1,166 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import hashlib
+import os
+
+import fixtures
+import mock
+from rally.common import cfg
+from rally import exceptions
+
+from rally_openstack.contexts.glance import image_cache
+from tests.unit import test
+
+
+CTX = "rally_openstack.contexts.glance.image_cache"
+
+
+class ImageCacheTestCase(test.TestCase):
+
+    def setUp(self):
+        super(ImageCacheTestCase, self).setUp()
+        self.cache_dir = os.path.join(
+            self.useFixture(fixtures.TempDir()).path, "cache")
+        self.cache = image_cache.ImageCache(cache_dir=self.cache_dir)
+
+    def _get(self, url, checksum=None):
+        with self.cache.use(url, checksum=checksum) as path:
+            return path
+
+    @mock.patch("%s.requests.get" % CTX)
+    def test_get(self, mock_requests_get):
+        mock_requests_get.return_value.iter_content.return_value = [
+            b"foo", b"bar"]
+
+        path = self._get("http://example.com/image")
+
+        with open(path, "rb") as f:
+            self.assertEqual(b"foobar", f.read())
+        mock_requests_get.assert_called_once_with(
+            "http://example.com/image", stream=True, timeout=(10.0, 60.0))
+        mock_requests_get.return_value.close.assert_called_once_with()
+
+        # the image is downloaded only once
+        self.assertEqual(path, self._get("http://example.com/image"))
+        self.assertEqual(1, mock_requests_get.call_count)
+
+    @mock.patch("%s.requests.get" % CTX)
+    def test_get_with_checksum(self, mock_requests_get):
+        mock_requests_get.return_value.iter_content.return_value = [b"foo"]
+        checksum = hashlib.md5(b"foo").hexdigest()
+
+        path = self._get("http://example.com/image", checksum=checksum)
+
+        self.assertTrue(os.path.exists(path))
+        self.assertNotEqual(path, self.cache._get_path(
+            "http://example.com/image"))
+
+    @mock.patch("%s.requests.get" % CTX)
+    def test_get_with_wrong_checksum(self, mock_requests_get):
+        mock_requests_get.return_value.iter_content.return_value = [b"foo"]
+
+        self.assertRaises(exceptions.RallyException, self._get,
+                          "http://example.com/image", checksum="bar")
+        self.assertFalse(os.path.exists(
+            self.cache._get_path("http://example.com/image", "bar")))
+        self.assertEqual([], [name for name in os.listdir(self.cache_dir)
+                              if name.endswith(".tmp")])
+
+    @mock.patch("%s.requests.get" % CTX)
+    def test_get_download_fails(self, mock_requests_get):
+        def iter_content(chunk_size):
+            yield b"foo"
+            raise IOError("Read timed out.")
+
+        mock_requests_get.return_value.iter_content.side_effect = iter_content
+
+        self.assertRaises(IOError, self._get, "http://example.com/image")
+        self.assertEqual([], [name for name in os.listdir(self.cache_dir)
+                              if not name.endswith(".lock")])
+        mock_requests_get.return_value.close.assert_called_once_with()
+
+    @mock.patch("%s.requests.get" % CTX)
+    def test_get_outdated(self, mock_requests_get):
+        mock_requests_get.return_value.iter_content.side_effect = [
+            [b"foo"], [b"bar"]]
+        path = self._get("http://example.com/image")
+        # downloaded before the ttl
+        os.utime(path, (0, 0))
+
+        self.assertEqual(path, self._get("http://example.com/image"))
+
+        with open(path, "rb") as f:
+            self.assertEqual(b"bar", f.read())
+        self.assertEqual(2, mock_requests_get.call_count)
+
+    @mock.patch("%s.requests.get" % CTX)
+    def test_get_outdated_with_checksum(self, mock_requests_get):
+        mock_requests_get.return_value.iter_content.return_value = [b"foo"]
+        checksum = hashlib.md5(b"foo").hexdigest()
+        path = self._get("http://example.com/image", checksum=checksum)
+        os.utime(path, (0, 0))
+
+        # verified data is never outdated
+        self.assertEqual(path, self._get("http://example.com/image",
+                                         checksum=checksum))
+        self.assertEqual(1, mock_requests_get.call_count)
+
+    @mock.patch("%s.requests.get" % CTX)
+    def test_get_evicts_least_recently_used(self, mock_requests_get):
+        cfg.CONF.set_override("glance_image_cache_size", 2, "openstack")
+        self.addCleanup(cfg.CONF.clear_override, "glance_image_cache_size",
+                        "openstack")
+        mock_requests_get.return_value.iter_content.side_effect = (
+            lambda chunk_size: [b"x" * 1024 * 1024])
+        paths = [self._get("http://example.com/image%s" % i)
+                 for i in range(2)]
+        for i, path in enumerate(paths):
+            os.utime(path, (i + 1, os.path.getmtime(path)))
+        # the least recently used image is the second one
+        self._get("http://example.com/image0")
+
+        path = self._get("http://example.com/image2")
+
+        self.assertEqual([True, False, True],
+                         [os.path.exists(p) for p in paths + [path]])
+
+    @mock.patch("%s.requests.get" % CTX)
+    def test_use_keeps_images_in_use(self, mock_requests_get):
+        cfg.CONF.set_override("glance_image_cache_size", 1, "openstack")
+        self.addCleanup(cfg.CONF.clear_override, "glance_image_cache_size",
+                        "openstack")
+        mock_requests_get.return_value.iter_content.side_effect = (
+            lambda chunk_size: [b"x" * 1024 * 1024])
+
+        with self.cache.use("http://example.com/image0") as path:
+            # e.g. another process uploads the first image at the moment
+            other = self._get("http://example.com/image1")
+            self.assertTrue(os.path.exists(path))
+
+        self._get("http://example.com/image2")
+        self.assertEqual([False, False],
+                         [os.path.exists(p) for p in (path, other)])
+
+    @mock.patch("%s.requests.get" % CTX)
+    def test__evict_removed_meanwhile(self, mock_requests_get):
+        mock_requests_get.return_value.iter_content.return_value = [b"foo"]
+        path = self._get("http://example.com/image")
+
+        # an entry is removed by another process after listing
+        with mock.patch("%s.os.listdir" % CTX,
+                        return_value=["missing", os.path.basename(path)]):
+            self.cache._evict(keep=path)
+
+        self.assertTrue(os.path.exists(path))
@@ -17,6 +17,7 @@ import copy
 
 import ddt
 import mock
+from rally import exceptions
 
 from rally_openstack.contexts.glance import images
 from tests.unit import test
@@ -51,6 +52,9 @@ class ImageGeneratorTestCase(test.ScenarioTestCase):
             "rally_openstack.services.image.image.Image")
         self.addCleanup(patch.stop)
         self.mock_image = patch.start()
+        patch = mock.patch("%s.image_cache.ImageCache" % CTX)
+        self.addCleanup(patch.stop)
+        self.mock_image_cache = patch.start()
 
     def _gen_tenants(self, count):
         tenants = {}
@@ -93,6 +97,7 @@ class ImageGeneratorTestCase(test.ScenarioTestCase):
                     "container_format": container_format,
                     "images_per_tenant": images_per_tenant,
                     "visibility": visibility,
+                    "use_image_cache": True,
                 }
             },
             "admin": {
@@ -113,6 +118,8 @@ class ImageGeneratorTestCase(test.ScenarioTestCase):
             expected_image_args["min_disk"] = min_disk
 
         new_context = copy.deepcopy(self.context)
+        new_context["config"]["images"].update(
+            {"share_images": False, "resource_management_workers": 1})
         for tenant_id in new_context["tenants"].keys():
             new_context["tenants"][tenant_id]["images"] = [
                 image_service.create_image.return_value.id
@@ -132,6 +139,133 @@ class ImageGeneratorTestCase(test.ScenarioTestCase):
             tenants * images_per_tenant)
 
         mock_clients.assert_has_calls([mock.call(mock.ANY)] * tenants)
+        use_cache = self.mock_image_cache.return_value.use
+        use_cache.assert_called_once_with(image_url, checksum=None)
+        image_service.create_image.assert_called_with(
+            image_name=mock.ANY, container_format=container_format,
+            image_location=use_cache.return_value.__enter__.return_value,
+            disk_format=disk_format, visibility=visibility,
+            min_disk=min_disk or 0, min_ram=min_ram or 0)
+
+    @mock.patch("rally_openstack.osclients.Clients")
+    def test_setup_without_cache(self, mock_clients):
+        self.context.update({
+            "config": {
+                "images": {"image_url": "http://example.com/image",
+                           "disk_format": "qcow2",
+                           "container_format": "bare"}
+            },
+            "users": [{"tenant_id": "foo-tenant",
+                       "credential": mock.MagicMock()}],
+            "tenants": {"foo-tenant": {}}
+        })
+        images_ctx = images.ImageGenerator(self.context)
+        images_ctx.setup()
+
+        self.assertFalse(self.mock_image_cache.called)
+        self.assertEqual(
+            "http://example.com/image",
+            self.mock_image.return_value.create_image.call_args[1][
+                "image_location"])
+
+    @mock.patch("rally_openstack.osclients.Clients")
+    def test_setup_fails(self, mock_clients):
+        self.context.update({
+            "config": {
+                "images": {"image_url": "http://example.com/image",
+                           "disk_format": "qcow2",
+                           "container_format": "bare",
+                           "images_per_tenant": 2}
+            },
+            "users": [{"tenant_id": "foo-tenant",
+                       "credential": mock.MagicMock()}],
+            "tenants": {"foo-tenant": {}}
+        })
+        self.mock_image.return_value.create_image.side_effect = [
+            mock.Mock(id="image-1"), Exception("Oops")]
+        images_ctx = images.ImageGenerator(self.context)
+
+        self.assertRaises(exceptions.ContextSetupFailure, images_ctx.setup)
+        # created images are stored for cleanup
+        self.assertEqual(["image-1"],
+                         self.context["tenants"]["foo-tenant"]["images"])
+
+    @mock.patch("rally_openstack.osclients.Clients")
+    def test_setup_shared_images(self, mock_clients):
+        self.context.update({
+            "config": {
+                "images": {"image_url": "/tmp/image.img",
+                           "disk_format": "qcow2",
+                           "container_format": "bare",
+                           "images_per_tenant": 2,
+                           "share_images": True}
+            },
+            "users": [{"tenant_id": "t1", "credential": "user1"},
+                      {"tenant_id": "t2", "credential": "user2"}],
+            "tenants": {"t1": {}, "t2": {}}
+        })
+        image_service = self.mock_image.return_value
+        image_service.create_image.side_effect = [mock.Mock(id="image-1"),
+                                                  mock.Mock(id="image-2")]
+
+        images_ctx = images.ImageGenerator(self.context)
+        images_ctx.setup()
+
+        self.assertEqual(2, image_service.create_image.call_count)
+        self.assertEqual(
+            "shared",
+            image_service.create_image.call_args[1]["visibility"])
+        self.assertEqual(["image-1", "image-2"],
+                         self.context["shared_images"])
+        for tenant_id in ("t1", "t2"):
+            self.assertEqual(["image-1", "image-2"],
+                             self.context["tenants"][tenant_id]["images"])
+        image_service.add_member.assert_has_calls(
+            [mock.call(image_id=image_id, member_id=tenant_id)
+             for tenant_id in ("t1", "t2")
+             for image_id in ("image-1", "image-2")])
+        image_service.accept_member.assert_has_calls(
+            [mock.call(image_id=image_id, member_id=tenant_id)
+             for tenant_id in ("t1", "t2")
+             for image_id in ("image-1", "image-2")])
+
+    @mock.patch("rally_openstack.osclients.Clients")
+    def test_setup_public_shared_images(self, mock_clients):
+        self.context.update({
+            "config": {
+                "images": {"image_url": "/tmp/image.img",
+                           "disk_format": "qcow2",
+                           "container_format": "bare",
+                           "visibility": "public",
+                           "share_images": True}
+            },
+            "users": [{"tenant_id": "t1", "credential": "user1"}],
+            "tenants": {"t1": {}}
+        })
+        image_service = self.mock_image.return_value
+
+        images_ctx = images.ImageGenerator(self.context)
+        images_ctx.setup()
+
+        self.assertEqual(
+            [image_service.create_image.return_value.id],
+            self.context["tenants"]["t1"]["images"])
+        self.assertFalse(image_service.add_member.called)
+
+    def test_setup_shared_images_without_admin(self):
+        self.context.pop("admin")
+        self.context.update({
+            "config": {
+                "images": {"image_url": "/tmp/image.img",
+                           "disk_format": "qcow2",
+                           "container_format": "bare",
+                           "share_images": True}
+            }
+        })
+
+        images_ctx = images.ImageGenerator(self.context)
+        self.assertRaises(exceptions.ContextSetupFailure, images_ctx.setup)
+        self.assertFalse(self.mock_image.return_value.create_image.called)
 
     @mock.patch("%s.image.Image" % CTX)
     @mock.patch("%s.LOG" % CTX)
@@ -257,6 +391,25 @@ class ImageGeneratorTestCase(test.ScenarioTestCase):
             superclass=images_ctx.__class__,
             task_id=self.context["owner_id"])
 
+    @mock.patch("rally_openstack.osclients.Clients")
+    @mock.patch("%s.resource_manager.cleanup" % CTX)
+    def test_cleanup_shared_images(self, mock_cleanup, mock_clients):
+        self.context.update({
+            "config": {"images": {"share_images": True}},
+            "users": mock.Mock(),
+            "shared_images": ["image-1", "image-2"]
+        })
+        image_service = self.mock_image.return_value
+        image_service.delete_image.side_effect = [Exception("Oops"), None]
+
+        images_ctx = images.ImageGenerator(self.context)
+        images_ctx.cleanup()
+
+        self.assertEqual([mock.call(image_id="image-1"),
+                          mock.call(image_id="image-2")],
+                         image_service.delete_image.call_args_list)
+        self.assertTrue(mock_cleanup.called)
+
     @mock.patch("%s.rutils.make_name_matcher" % CTX)
     @mock.patch("%s.resource_manager.cleanup" % CTX)
     def test_cleanup_for_predefined_name(self, mock_cleanup,
@@ -13,7 +13,10 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import json
+
 import mock
+from rally import exceptions
 
 from rally_openstack.contexts.heat import stacks
 from rally_openstack.scenarios.heat import utils as heat_utils
@@ -45,12 +48,13 @@ class TestStackGenerator(test.ScenarioTestCase):
         inst = stacks.StackGenerator(self.context)
         self.assertEqual(inst.config, self.context["config"]["stacks"])
 
-    @mock.patch("%s.heat.utils.HeatScenario._create_stack" % SCN,
-                return_value=fakes.FakeStack(id="uuid"))
-    def test_setup(self, mock_heat_scenario__create_stack):
+    @mock.patch("%s.heat.utils.HeatScenario._create_stacks" % SCN)
+    def test_setup(self, mock_heat_scenario__create_stacks):
         tenants_count = 2
         users_per_tenant = 5
-        stacks_per_tenant = 1
+        stacks_per_tenant = 2
+        mock_heat_scenario__create_stacks.return_value = [
+            fakes.FakeStack(id="uuid-1"), fakes.FakeStack(id="uuid-2")]
 
         tenants = self._gen_tenants(tenants_count)
         users = []
@@ -68,7 +72,8 @@ class TestStackGenerator(test.ScenarioTestCase):
                 },
                 "stacks": {
                     "stacks_per_tenant": stacks_per_tenant,
-                    "resources_per_stack": 1
+                    "resources_per_stack": 1,
+                    "resource_management_workers": 2
                 }
             },
             "users": users,
@@ -77,12 +82,30 @@ class TestStackGenerator(test.ScenarioTestCase):
 
         stack_ctx = stacks.StackGenerator(self.context)
         stack_ctx.setup()
-        self.assertEqual(tenants_count * stacks_per_tenant,
-                         mock_heat_scenario__create_stack.call_count)
+        self.assertEqual(tenants_count,
+                         mock_heat_scenario__create_stacks.call_count)
+        template = json.dumps(stack_ctx._prepare_stack_template(1))
+        mock_heat_scenario__create_stacks.assert_called_with(
+            template, stacks_per_tenant)
         # check that stack ids have been saved in context
         for ten_id in self.context["tenants"].keys():
-            self.assertEqual(stacks_per_tenant,
-                             len(self.context["tenants"][ten_id]["stacks"]))
+            self.assertEqual(["uuid-1", "uuid-2"],
+                             self.context["tenants"][ten_id]["stacks"])
+
+    @mock.patch("%s.heat.utils.HeatScenario._create_stacks" % SCN)
+    def test_setup_fails(self, mock_heat_scenario__create_stacks):
+        mock_heat_scenario__create_stacks.side_effect = Exception("Oops")
+        self.context.update({
+            "config": {"stacks": {"stacks_per_tenant": 1,
+                                  "resources_per_stack": 1}},
+            "users": [{"id": "u1", "tenant_id": "t1",
+                       "credential": mock.MagicMock()}],
+            "tenants": {"t1": {}}
+        })
+
+        stack_ctx = stacks.StackGenerator(self.context)
+        self.assertRaises(exceptions.ContextSetupFailure, stack_ctx.setup)
+        self.assertEqual([], self.context["tenants"]["t1"]["stacks"])
 
     @mock.patch("%s.heat.stacks.resource_manager.cleanup" % CTX)
     def test_cleanup(self, mock_cleanup):
@@ -13,11 +13,14 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import fixtures
 import mock
 
+from rally.common import cfg
 from rally import exceptions
 from rally_openstack.contexts.keystone import users
 from rally_openstack import credential as oscredential
+from rally_openstack import osclients
 from tests.unit import test
 
 from rally_openstack import consts
@@ -122,7 +125,11 @@ class UserGeneratorBaseTestCase(test.ScenarioTestCase):
         user_generator.use_existing_users.assert_called_once_with()
         self.assertFalse(user_generator.create_users.called)
 
-    def test_cleanup(self):
+    @mock.patch("%s.resource_manager.cleanup_by_journal" % CTX,
+                return_value={"failed": 0})
+    @mock.patch("%s.scenario.forget_user_choices" % CTX)
+    def test_cleanup(self, mock_forget_user_choices,
+                     mock_cleanup_by_journal):
         user_generator = users.UserGenerator(self.context)
         user_generator._remove_default_security_group = mock.Mock()
         user_generator._delete_users = mock.Mock()
@@ -136,6 +143,8 @@ class UserGeneratorBaseTestCase(test.ScenarioTestCase):
         self.assertFalse(user_generator._remove_default_security_group.called)
         self.assertFalse(user_generator._delete_users.called)
         self.assertFalse(user_generator._delete_tenants.called)
+        mock_forget_user_choices.assert_called_once_with(
+            self.context["task"]["uuid"])
 
         # In case when new users were created, the proper cleanup should be
         #   performed
@@ -146,6 +155,42 @@ class UserGeneratorBaseTestCase(test.ScenarioTestCase):
         user_generator._remove_default_security_group.assert_called_once_with()
         user_generator._delete_users.assert_called_once_with()
         user_generator._delete_tenants.assert_called_once_with()
+        # leftovers of other contexts are deleted by the journal
+        self.assertEqual(
+            [mock.call(self.context["task"]["uuid"],
+                       user_generator.context["admin"])] * 2,
+            mock_cleanup_by_journal.call_args_list)
+
+    @mock.patch("%s.LOG.warning" % CTX)
+    @mock.patch("%s.resource_manager.cleanup_by_journal" % CTX,
+                return_value={"failed": 2})
+    def test_cleanup_journal_leftovers_fail(self, mock_cleanup_by_journal,
+                                            mock_log_warning):
+        user_generator = users.UserGenerator(self.context)
+        user_generator._remove_default_security_group = mock.Mock()
+        user_generator._delete_users = mock.Mock()
+        user_generator._delete_tenants = mock.Mock()
+
+        user_generator.cleanup()
+
+        mock_cleanup_by_journal.assert_called_once_with(
+            self.context["task"]["uuid"], user_generator.context["admin"])
+        self.assertEqual(1, mock_log_warning.call_count)
+
+    @mock.patch("%s.resource_manager.cleanup_by_journal" % CTX)
+    @mock.patch("%s.identity" % CTX)
+    def test_cleanup_fails(self, mock_identity, mock_cleanup_by_journal):
+        identity_service = mock_identity.Identity.return_value
+        identity_service.delete_project.side_effect = Exception("Oops")
+        user_generator = users.UserGenerator(self.context)
+        user_generator.context["tenants"] = {"t1": {"id": "t1", "name": "t1"}}
+        user_generator._remove_default_security_group = mock.Mock()
+
+        user_generator.cleanup()
+
+        identity_service.delete_project.assert_called_once_with("t1")
+        # the journal is kept to delete leftovers later
+        self.assertFalse(mock_cleanup_by_journal.called)
 
 
 class UserGeneratorForExistingUsersTestCase(test.ScenarioTestCase):
@@ -224,6 +269,7 @@ class UserGeneratorForExistingUsersTestCase(test.ScenarioTestCase):
         self.assertEqual({"p0": {"id": "p0", "name": creds.tenant_name},
                           "p1": {"id": "p1", "name": creds.tenant_name}},
                          self.context["tenants"])
+        self.assertEqual(["p0", "p1"], self.context["tenant_ids"])
 
 
 class UserGeneratorForNewUsersTestCase(test.ScenarioTestCase):
@@ -342,25 +388,49 @@ class UserGeneratorForNewUsersTestCase(test.ScenarioTestCase):
             admin_neutron.delete_security_group.call_args_list)
 
     @mock.patch("%s.identity" % CTX)
-    def test__create_tenants(self, mock_identity):
-        self.context["config"]["users"]["tenants"] = 1
-        user_generator = users.UserGenerator(self.context)
-        tenants = user_generator._create_tenants()
-        self.assertEqual(1, len(tenants))
-        id, tenant = tenants.popitem()
-        self.assertIn("name", tenant)
-
-    @mock.patch("%s.identity" % CTX)
-    def test__create_users(self, mock_identity):
+    def test__create_tenants_and_users(self, mock_identity):
+        self.context["config"]["users"]["tenants"] = 2
         self.context["config"]["users"]["users_per_tenant"] = 2
+        identity_service = mock_identity.Identity.return_value
+        identity_service.create_project.side_effect = [
+            mock.Mock(id="t1"), mock.Mock(id="t2")]
         user_generator = users.UserGenerator(self.context)
-        user_generator.context["tenants"] = {"t1": {"id": "t1", "name": "t1"},
-                                             "t2": {"id": "t2", "name": "t2"}}
-        users_ = user_generator._create_users()
+
+        tenants, users_ = user_generator._create_tenants_and_users()
+
+        self.assertEqual({"t1", "t2"}, set(tenants))
+        for tenant in tenants.values():
+            self.assertIn("name", tenant)
         self.assertEqual(4, len(users_))
         for user in users_:
             self.assertIn("id", user)
             self.assertIn("credential", user)
+        self.assertEqual(2, identity_service.create_project.call_count)
+        self.assertEqual(4, identity_service.create_user.call_count)
+        self.assertEqual(
+            ["users.create_tenants", "users.create_users"],
+            [a["name"] for a in user_generator.atomic_actions()])
+
+    @mock.patch("%s.LOG.warning" % CTX)
+    @mock.patch("%s.identity" % CTX)
+    def test__create_tenants_and_users_tenant_fails(self, mock_identity,
+                                                    mock_log_warning):
+        self.context["config"]["users"]["tenants"] = 2
+        self.context["config"]["users"]["users_per_tenant"] = 3
+        identity_service = mock_identity.Identity.return_value
+        identity_service.create_project.side_effect = [
+            Exception("Oops"), mock.Mock(id="t2")]
+        user_generator = users.UserGenerator(self.context)
+
+        tenants, users_ = user_generator._create_tenants_and_users()
+
+        self.assertEqual(["t2"], list(tenants))
+        self.assertEqual(3, len(users_))
+        self.assertEqual(["t2"] * 3, [u["tenant_id"] for u in users_])
+        self.assertEqual(2, identity_service.create_project.call_count)
+        # users of the failed tenant are not even tried
+        mock_log_warning.assert_called_once_with(
+            "Failed to create tenant: Oops")
 
     @mock.patch("%s.identity" % CTX)
     def test__delete_tenants(self, mock_identity):
@@ -370,6 +440,17 @@ class UserGeneratorForNewUsersTestCase(test.ScenarioTestCase):
         user_generator._delete_tenants()
         self.assertEqual(0, len(user_generator.context["tenants"]))
 
+    @mock.patch("%s.identity" % CTX)
+    def test__delete_tenants_by_ids(self, mock_identity):
+        identity_service = mock_identity.Identity.return_value
+        user_generator = users.UserGenerator(self.context)
+        user_generator.context["tenants"] = {"t1": {"id": "t1", "name": "t1"}}
+
+        user_generator._delete_tenants(["t2"])
+
+        identity_service.delete_project.assert_called_once_with("t2")
+        self.assertEqual(["t1"], list(user_generator.context["tenants"]))
+
     @mock.patch("%s.identity" % CTX)
     def test__delete_tenants_failure(self, mock_identity):
         identity_service = mock_identity.Identity.return_value
@@ -417,7 +498,115 @@ class UserGeneratorForNewUsersTestCase(test.ScenarioTestCase):
         self.assertEqual(0, len(ctx.context["users"]))
         self.assertEqual(0, len(ctx.context["tenants"]))
 
-    @mock.patch("rally.common.broker.LOG.warning")
+    @mock.patch("%s.journal.forget" % CTX)
+    @mock.patch("%s.identity" % CTX)
+    def test_setup_and_cleanup_pooled(self, mock_identity, mock_forget):
+        pool_dir = self.useFixture(fixtures.TempDir()).path
+        self.context["config"]["users"]["pooled"] = True
+        self.context["config"]["users"]["users_per_tenant"] = 2
+        self.context["owner_id"] = "task_id"
+        identity_service = mock_identity.Identity.return_value
+        project = mock.Mock(id="t1")
+        project.name = "tenant-1"
+        identity_service.create_project.return_value = project
+        created_users = [mock.Mock(id="u%d" % i) for i in range(2)]
+        for i, user in enumerate(created_users):
+            user.name = "user-%d" % i
+        identity_service.create_user.side_effect = created_users
+
+        cfg.CONF.set_override("users_pool_dir", pool_dir, "openstack")
+        self.addCleanup(cfg.CONF.clear_override, "users_pool_dir",
+                        "openstack")
+
+        with users.UserGenerator(self.context) as ctx:
+            ctx.setup()
+            self.assertEqual(["t1"], list(ctx.context["tenants"]))
+            self.assertEqual(2, len(ctx.context["users"]))
+        # pooled tenants and users are not deleted by journal
+        mock_forget.assert_has_calls(
+            [mock.call(self.context["task"]["uuid"], "keystone.project",
+                       ["t1"]),
+             mock.call(self.context["task"]["uuid"], "keystone.user",
+                       ["u0", "u1"])])
+        # tenants and users are released instead of deletion
+        self.assertFalse(identity_service.delete_project.called)
+        self.assertFalse(identity_service.delete_user.called)
+        self.assertEqual([], ctx.context["users"])
+
+        # the next task takes the same users from the pool
+        self.context["owner_id"] = "task_id_2"
+        with users.UserGenerator(self.context) as ctx:
+            ctx.setup()
+            self.assertEqual(["t1"], list(ctx.context["tenants"]))
+            self.assertEqual(
+                {"user-0", "user-1"},
+                set(u["credential"].username
+                    for u in ctx.context["tenants"]["t1"]["users"]))
+
+        identity_service.create_project.assert_called_once_with(
+            domain_name="default")
+        self.assertEqual(2, identity_service.create_user.call_count)
+
+    @mock.patch("%s.identity" % CTX)
+    @mock.patch("%s.broker.LOG.warning" % CTX)
+    def test__check_pooled_users(self, mock_log_warning, mock_identity):
+        self.context["config"]["users"]["pooled"] = True
+        user_generator = users.UserGenerator(self.context)
+        user_generator._users_pool = mock.Mock()
+        user_generator._delete_users = mock.Mock()
+        user_generator._delete_tenants = mock.Mock()
+        tenants = [{"id": tenant_id, "name": tenant_id,
+                    "users": [{"id": "%s-u%d" % (tenant_id, i),
+                               "name": "%s-u%d" % (tenant_id, i)}
+                              for i in range(2)]}
+                   for tenant_id in ("t1", "t2", "t3", "t4")]
+        errors = {"t2-u1": mock.Mock(http_status=401),
+                  "t3-u0": mock.Mock(http_status=None)}
+        identity_service = mock_identity.Identity.return_value
+
+        class NotFound(Exception):
+            http_status = 404
+
+        def update_user(user_id, password):
+            if user_id == "t4-u0":
+                raise NotFound()
+        identity_service.update_user.side_effect = update_user
+
+        def get_clients(credential):
+            clients = mock.Mock()
+            error = errors.get(credential.username)
+            if error:
+                type(clients.keystone).auth_ref = mock.PropertyMock(
+                    side_effect=osclients.AuthenticationFailed(
+                        error=error, url="url", username="user",
+                        project="project"))
+            return clients
+
+        self.osclients.AuthenticationFailed = osclients.AuthenticationFailed
+        self.osclients.Clients.side_effect = get_clients
+
+        users_ = user_generator._check_pooled_users(tenants)
+
+        self.assertEqual(["t1"], list(users_))
+        self.assertEqual({"t1-u0", "t1-u1"},
+                         set(u["id"] for u in users_["t1"]))
+        # passwords are reset on every lease
+        self.assertEqual(8, identity_service.update_user.call_count)
+        passwords = set(u["credential"].password for u in users_["t1"])
+        self.assertEqual(2, len(passwords))
+        self.assertEqual(3, mock_log_warning.call_count)
+        # the user is missing or its role is removed
+        user_generator._users_pool.remove.assert_called_once_with(
+            {"t2", "t4"})
+        self.assertEqual({"t2-u0", "t2-u1", "t4-u0", "t4-u1"},
+                         set(user_generator._delete_users.call_args[0][0]))
+        self.assertEqual({"t2", "t4"},
+                         set(user_generator._delete_tenants.call_args[0][0]))
+        # keystone is not reachable, the tenant can be used later
+        user_generator._users_pool.release.assert_called_once_with(
+            user_generator.get_owner_id(), tenant_ids={"t3"})
+
+    @mock.patch("%s.LOG.warning" % CTX)
     @mock.patch("%s.identity" % CTX)
     def test_setup_and_cleanup_with_error_during_create_user(
             self, mock_identity, mock_log_warning):
@@ -426,7 +615,7 @@ class UserGeneratorForNewUsersTestCase(test.ScenarioTestCase):
         with users.UserGenerator(self.context) as ctx:
                 self.assertRaises(exceptions.ContextSetupFailure, ctx.setup)
                 mock_log_warning.assert_called_with(
-                    "Failed to consume a task from the queue: ")
+                    "Failed to create user: ")
 
         # Ensure that tenants get deleted anyway
         self.assertEqual(0, len(ctx.context["tenants"]))
@@ -503,8 +692,9 @@ class UserGeneratorForNewUsersTestCase(test.ScenarioTestCase):
         }
 
         user_generator = users.UserGenerator(config)
-        users_ = user_generator._create_users()
+        tenants, users_ = user_generator._create_tenants_and_users()
 
+        self.assertEqual(2, len(users_))
         for user in users_:
             self.assertEqual("internal", user["credential"].endpoint_type)
 
@@ -526,7 +716,9 @@ class UserGeneratorForNewUsersTestCase(test.ScenarioTestCase):
         }
 
         user_generator = users.UserGenerator(config)
-        users_ = user_generator._create_users()
+        tenants, users_ = user_generator._create_tenants_and_users()
 
+        self.assertEqual(2, len(users_))
         for user in users_:
-            self.assertEqual("public", user["credential"].endpoint_type)
+            # endpoint type is not set, so the public one is used by clients
+            self.assertIsNone(user["credential"].endpoint_type)
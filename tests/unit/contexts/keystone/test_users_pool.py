@@ -0,0 +1,115 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import os
+import stat
+
+import fixtures
+import mock
+
+from rally_openstack.contexts.keystone import users_pool
+from tests.unit import test
+
+
+CTX = "rally_openstack.contexts.keystone.users_pool"
+
+
+class UsersPoolTestCase(test.TestCase):
+
+    def setUp(self):
+        super(UsersPoolTestCase, self).setUp()
+        self.pool_dir = self.useFixture(fixtures.TempDir()).path
+        self.credential = {"auth_url": "http://example.com",
+                           "username": "admin",
+                           "region_name": None}
+        self.pool = users_pool.UsersPool(self.credential, "default",
+                                         "default", pool_dir=self.pool_dir)
+
+    def _tenant(self, tenant_id, users_num=1):
+        return {"id": tenant_id, "name": "name-%s" % tenant_id,
+                "users": [{"id": "%s-u%d" % (tenant_id, i),
+                           "name": "user"}
+                          for i in range(users_num)]}
+
+    def test___init__(self):
+        pool = users_pool.UsersPool(self.credential, "default", "default",
+                                    pool_dir=self.pool_dir)
+        self.assertEqual(self.pool.path, pool.path)
+        other = users_pool.UsersPool(self.credential, "foo", "default",
+                                     pool_dir=self.pool_dir)
+        self.assertNotEqual(self.pool.path, other.path)
+
+    def test_lease_empty(self):
+        self.assertEqual([], self.pool.lease("task", 2, 1))
+
+    def test_add_lease_and_release(self):
+        self.pool.add("task_1", [self._tenant("t1"), self._tenant("t2", 2)])
+        self.assertEqual(0o600, stat.S_IMODE(os.stat(self.pool.path).st_mode))
+
+        # all tenants are leased by the first task
+        self.assertEqual([], self.pool.lease("task_2", 2, 1))
+
+        self.pool.release("task_1")
+        leased = self.pool.lease("task_2", 2, 2)
+        self.assertEqual(["t2"], [t["id"] for t in leased])
+        self.assertEqual("task_2", leased[0]["leased_by"])
+
+        leased = self.pool.lease("task_3", 2, 1)
+        self.assertEqual(["t1"], [t["id"] for t in leased])
+
+    def test_remove(self):
+        self.pool.add("task_1", [self._tenant("t1"), self._tenant("t2")])
+
+        self.pool.remove(["t1"])
+
+        self.assertEqual(["t2"],
+                         [t["id"] for t in self.pool._load()["tenants"]])
+
+    def test_release_some(self):
+        self.pool.add("task_1", [self._tenant("t1"), self._tenant("t2")])
+
+        self.pool.release("task_1", tenant_ids=["t2"])
+
+        leased = self.pool.lease("task_2", 2, 1)
+        self.assertEqual(["t2"], [t["id"] for t in leased])
+
+    @mock.patch("%s.time.time" % CTX)
+    def test_lease_expired(self, mock_time):
+        mock_time.return_value = 0
+        self.pool.add("task_1", [self._tenant("t1")])
+
+        self.assertEqual([], self.pool.lease("task_2", 1, 1))
+
+        mock_time.return_value = (
+            users_pool.CONF.openstack.users_pool_lease_timeout + 1)
+        leased = self.pool.lease("task_2", 1, 1)
+        self.assertEqual(["t1"], [t["id"] for t in leased])
+
+    @mock.patch("%s.LOG.warning" % CTX)
+    def test_get_pooled_ids(self, mock_log_warning):
+        self.pool.add("task_1", [self._tenant("t1", 2)])
+        other = users_pool.UsersPool(self.credential, "foo", "default",
+                                     pool_dir=self.pool_dir)
+        other.add("task_2", [self._tenant("t2")])
+        with open(os.path.join(self.pool_dir, "broken.json"), "w") as f:
+            f.write("{")
+
+        self.assertEqual({"t1", "t1-u0", "t1-u1", "t2", "t2-u0"},
+                         users_pool.get_pooled_ids(self.pool_dir))
+        self.assertEqual(1, mock_log_warning.call_count)
+
+    def test_get_pooled_ids_no_pools(self):
+        self.assertEqual(
+            set(), users_pool.get_pooled_ids(
+                os.path.join(self.pool_dir, "missing")))
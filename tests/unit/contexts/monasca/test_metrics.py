@@ -98,3 +98,31 @@ class MonascaMetricGeneratorTestCase(test.TestCase):
                          mock_interruptable_sleep.call_args_list,
                          "Method interruptable_sleep should be called "
                          "tenant counts times metrics plus one")
+
+    @mock.patch("%s.metrics.time" % CTX)
+    @mock.patch("%s.metrics.rutils.interruptable_sleep" % CTX)
+    @mock.patch("%s.metrics.monasca_utils.MonascaScenario" % CTX)
+    def test_setup_bulk(self, mock_monasca_scenario,
+                        mock_interruptable_sleep, mock_time):
+        mock_time.time.side_effect = [10, 12]
+        tenants, real_context = self._gen_context(2, 2, 5)
+        real_context["config"]["monasca_metrics"].update(
+            {"batch_size": 2, "resource_management_workers": 2})
+        scenario = mock_monasca_scenario.return_value
+        scenario._make_metrics.return_value = [["m1", "m2"], ["m3"]]
+
+        monasca_ctx = metrics.MonascaMetricGenerator(real_context)
+        monasca_ctx.setup()
+
+        self.assertEqual(2, mock_monasca_scenario.call_count)
+        scenario._make_metrics.assert_called_with(
+            5, batch_size=2,
+            dimensions=real_context["config"]["monasca_metrics"][
+                "dimensions"])
+        self.assertEqual(4, scenario._create_metrics_batch.call_count)
+        self.assertFalse(scenario._create_metrics.called)
+        self.assertEqual({"metrics": 6, "duration": 2, "throughput": 3},
+                         monasca_ctx.context["monasca_metrics"])
+        mock_interruptable_sleep.assert_called_once_with(
+            monasca_utils.CONF.openstack.monasca_metric_create_prepoll_delay,
+            atomic_delay=1)
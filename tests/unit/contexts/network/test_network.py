@@ -16,6 +16,7 @@
 import ddt
 import mock
 import netaddr
+from rally import exceptions
 
 from rally_openstack.contexts.network import networks as network_context
 from tests.unit import test
@@ -71,13 +72,15 @@ class NetworkTestCase(test.TestCase):
         mock_utils.iterate_per_tenants.return_value = [
             ("foo_user", "foo_tenant"),
             ("bar_user", "bar_tenant")]
-        mock_create = mock.Mock(side_effect=lambda t, **kw: t + "-net")
+        mock_create = mock.Mock(
+            side_effect=lambda t, num, **kw: [t + "-net"] * num)
         mock_utils.generate_random_name = mock.Mock()
-        mock_wrap.return_value = mock.Mock(create_network=mock_create)
+        mock_wrap.return_value = mock.Mock(create_networks=mock_create)
         nets_per_tenant = 2
         net_context = network_context.Network(
             self.get_context(networks_per_tenant=nets_per_tenant,
                              network_create_args={"fakearg": "fake"},
+                             resource_management_workers=2,
                              **dns_kwargs))
 
         net_context.setup()
@@ -86,12 +89,12 @@ class NetworkTestCase(test.TestCase):
             dns_kwargs["dns_nameservers"] = tuple(
                 dns_kwargs["dns_nameservers"])
         create_calls = [
-            mock.call(tenant, dualstack=False,
+            mock.call(tenant, nets_per_tenant, dualstack=False,
                       subnets_num=1, network_create_args={"fakearg": "fake"},
                       router_create_args={"external": True},
                       **dns_kwargs)
             for user, tenant in mock_utils.iterate_per_tenants.return_value]
-        mock_create.assert_has_calls(create_calls)
+        mock_create.assert_has_calls(create_calls, any_order=True)
 
         mock_utils.iterate_per_tenants.assert_called_once_with(
             net_context.context["users"])
@@ -103,6 +106,27 @@ class NetworkTestCase(test.TestCase):
         self.assertSequenceEqual(sorted(expected_networks),
                                  sorted(actual_networks))
 
+    @mock.patch(NET + "wrap")
+    @mock.patch("rally_openstack.contexts.network.networks.utils")
+    @mock.patch("rally_openstack.osclients.Clients")
+    def test_setup_fails(self, mock_clients, mock_utils, mock_wrap):
+        mock_utils.iterate_per_tenants.return_value = [
+            ("foo_user", "foo_tenant"),
+            ("bar_user", "bar_tenant")]
+        mock_wrap.return_value.create_networks.side_effect = [
+            [{"id": "foo_net"}], Exception("Oops")]
+        net_context = network_context.Network(self.get_context())
+        for tenant_ctx in net_context.context["tenants"].values():
+            tenant_ctx.pop("networks")
+
+        self.assertRaises(exceptions.ContextSetupFailure,
+                          net_context.setup)
+
+        networks = [t.get("networks")
+                    for t in net_context.context["tenants"].values()]
+        self.assertIn([{"id": "foo_net"}], networks)
+        self.assertIn(None, networks)
+
     @mock.patch("rally_openstack.osclients.Clients")
     @mock.patch(NET + "wrap")
     def test_cleanup(self, mock_wrap, mock_clients):
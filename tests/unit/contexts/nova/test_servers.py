@@ -15,8 +15,9 @@
 
 import copy
 
+import jsonschema
 import mock
-
+from rally import exceptions
 from rally_openstack.contexts.nova import servers
 from rally_openstack.scenarios.nova import utils as nova_utils
 from tests.unit import fakes
@@ -35,6 +36,16 @@ class ServerGeneratorTestCase(test.ScenarioTestCase):
             tenants[str(id_)] = {"name": str(id_)}
         return tenants
 
+    def test_validate_boot_requests_per_second(self):
+        config = {"image": {"name": "cirros"}, "flavor": {"name": "m1.tiny"},
+                  "boot_requests_per_second": 0.5}
+        jsonschema.validate(config, servers.ServerGenerator.CONFIG_SCHEMA)
+
+        # zero rate would mean no boot requests at all
+        config["boot_requests_per_second"] = 0
+        self.assertRaises(jsonschema.ValidationError, jsonschema.validate,
+                          config, servers.ServerGenerator.CONFIG_SCHEMA)
+
     def test_init(self):
         tenants_count = 2
         servers_per_tenant = 5
@@ -47,7 +58,8 @@ class ServerGeneratorTestCase(test.ScenarioTestCase):
             "tenants": self._gen_tenants(tenants_count)})
 
         inst = servers.ServerGenerator(self.context)
-        self.assertEqual({"auto_assign_nic": False, "servers_per_tenant": 5},
+        self.assertEqual({"auto_assign_nic": False, "servers_per_tenant": 5,
+                          "resource_management_workers": 1},
                          inst.config)
 
     @mock.patch("%s.nova.utils.NovaScenario._boot_servers" % SCN,
@@ -90,7 +102,8 @@ class ServerGeneratorTestCase(test.ScenarioTestCase):
                     "flavor": {
                         "name": "m1.tiny",
                     },
-                    "nics": ["foo", "bar"]
+                    "nics": ["foo", "bar"],
+                    "resource_management_workers": 2
                 },
             },
             "admin": {
@@ -122,6 +135,58 @@ class ServerGeneratorTestCase(test.ScenarioTestCase):
                       for i in range(called_times)]
         mock_nova_scenario__boot_servers.assert_has_calls(mock_calls)
 
+    def _get_context(self, tenants_count, **config):
+        tenants = self._gen_tenants(tenants_count)
+        users = [{"id": id_, "tenant_id": id_,
+                  "credential": mock.MagicMock()} for id_ in tenants]
+        config.update({"image": {"name": "cirros"},
+                       "flavor": {"name": "m1.tiny"}})
+        self.context.update({
+            "config": {"servers": config},
+            "users": users,
+            "tenants": tenants
+        })
+        return self.context
+
+    @mock.patch("%s.nova.utils.NovaScenario._boot_servers" % SCN)
+    @mock.patch("%s.GlanceImage" % TYP)
+    @mock.patch("%s.Flavor" % TYP)
+    def test_setup_with_failed_tenant(self, mock_flavor, mock_glance_image,
+                                      mock_nova_scenario__boot_servers):
+        context = self._get_context(3, resource_management_workers=3)
+        mock_nova_scenario__boot_servers.side_effect = [
+            [fakes.FakeServer(id="uuid")], Exception("Oops"),
+            [fakes.FakeServer(id="uuid")]]
+
+        servers_ctx = servers.ServerGenerator(context)
+        self.assertRaises(exceptions.ContextSetupFailure, servers_ctx.setup)
+
+        self.assertEqual(3, mock_nova_scenario__boot_servers.call_count)
+        # servers of succeeded tenants are recorded anyway
+        self.assertEqual(
+            [["uuid"]] * 2,
+            [t["servers"] for t in context["tenants"].values()
+             if "servers" in t])
+
+    @mock.patch("%s.servers.time" % CTX)
+    @mock.patch("%s.nova.utils.NovaScenario._boot_servers" % SCN,
+                return_value=[fakes.FakeServer(id="uuid")])
+    @mock.patch("%s.GlanceImage" % TYP)
+    @mock.patch("%s.Flavor" % TYP)
+    def test_setup_with_rate_limit(self, mock_flavor, mock_glance_image,
+                                   mock_nova_scenario__boot_servers,
+                                   mock_time):
+        mock_time.time.return_value = 100
+        context = self._get_context(3, servers_per_tenant=2,
+                                    boot_requests_per_second=4)
+
+        servers.ServerGenerator(context).setup()
+
+        self.assertEqual(3, mock_nova_scenario__boot_servers.call_count)
+        # every tenant makes 2 requests, i.e. tenants are started every 0.5s
+        self.assertEqual([mock.call(0.5), mock.call(1.0)],
+                         mock_time.sleep.call_args_list)
+
     @mock.patch("%s.servers.resource_manager.cleanup" % CTX)
     def test_cleanup(self, mock_cleanup):
 
@@ -64,6 +64,12 @@ class SwiftObjectGeneratorTestCase(test.TestCase):
                 self.assertEqual(objects_per_container,
                                  len(container["objects"]))
 
+        stats = context["swift_objects"]
+        self.assertEqual(28, stats["objects"])
+        self.assertEqual(28 * 1024, stats["bytes"])
+        self.assertIn("duration", stats)
+        self.assertIn("throughput", stats)
+
     @mock.patch("rally_openstack.osclients.Clients")
     @mock.patch("rally_openstack.contexts.swift.utils."
                 "swift_utils.SwiftScenario")
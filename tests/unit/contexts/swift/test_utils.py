@@ -19,6 +19,29 @@ from rally_openstack.contexts.swift import utils
 from tests.unit import test
 
 
+class ObjectPayloadTestCase(test.TestCase):
+
+    def test_reader(self):
+        with utils.ObjectPayload(10) as payload:
+            self.assertEqual(10, payload.size)
+            reader = payload.reader()
+            another_reader = payload.reader()
+
+            self.assertEqual(b"\0" * 4, reader.read(4))
+            self.assertEqual(4, reader.tell())
+            self.assertEqual(b"\0" * 6, reader.read())
+            self.assertEqual(b"", reader.read(4))
+
+            # every reader has its own position
+            self.assertEqual(0, another_reader.tell())
+            self.assertEqual(b"\0" * 10, another_reader.read(20))
+
+            reader.seek(8)
+            self.assertEqual(b"\0" * 2, reader.read())
+            self.assertEqual(9, reader.seek(-1, 2))
+            self.assertEqual(10, reader.seek(5, 1))
+
+
 class SwiftObjectMixinTestCase(test.TestCase):
 
     @mock.patch("rally_openstack.osclients.Clients")
@@ -105,6 +128,11 @@ class SwiftObjectMixinTestCase(test.TestCase):
                 self.assertEqual(objects_per_container,
                                  len(container["objects"]))
 
+        swift = mock_clients.return_value.swift.return_value
+        for call in swift.put_object.call_args_list:
+            self.assertIsInstance(call[0][2], utils.PayloadReader)
+            self.assertEqual({"content_length": 1024}, call[1])
+
     @mock.patch("rally_openstack.osclients.Clients")
     def test__delete_containers(self, mock_clients):
         context = test.get_test_context()
@@ -24,6 +24,9 @@ from rally_openstack.platforms import existing
 from tests.unit import test
 
 
+PATH = "rally_openstack.platforms.existing"
+
+
 class PlatformBaseTestCase(test.TestCase):
 
     def _check_schema(self, schema, obj):
@@ -273,6 +276,25 @@ class ExistingPlatformTestCase(PlatformBaseTestCase):
         )
         self._check_cleanup_schema(result1)
 
+    @mock.patch("%s.resource_manager.cleanup_by_journal" % PATH)
+    @mock.patch("%s.credential.OpenStackCredential" % PATH)
+    def test_cleanup_by_journal(self, mock_open_stack_credential,
+                                mock_cleanup_by_journal):
+        pdata = {"admin": {"username": "admin"},
+                 "api_info": {"fakeclient": {}}}
+
+        result = existing.OpenStack({}, platform_data=pdata).cleanup(
+            task_uuid="task_uuid")
+
+        self.assertEqual(mock_cleanup_by_journal.return_value, result)
+        mock_open_stack_credential.assert_called_once_with(
+            username="admin", api_info={"fakeclient": {}})
+        mock_cleanup_by_journal.assert_called_once_with(
+            "task_uuid",
+            {"credential": mock_open_stack_credential.return_value})
+        # platform data should not be modified
+        self.assertEqual({"username": "admin"}, pdata["admin"])
+
     @mock.patch("rally_openstack.osclients.Clients")
     def test_check_health(self, mock_clients):
         pdata = {
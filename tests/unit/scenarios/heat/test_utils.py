@@ -71,6 +71,70 @@ class HeatScenarioTestCase(test.ScenarioTestCase):
         self._test_atomic_action_timer(self.scenario.atomic_actions(),
                                        "heat.create_stack")
 
+    def test_create_stacks(self):
+        self.clients("heat").stacks.create.side_effect = [
+            {"stack": {"id": "id-1"}}, {"stack": {"id": "id-2"}}]
+        self.scenario._wait_for_stacks_status = mock.Mock()
+
+        stacks = self.scenario._create_stacks(self.default_template, 2)
+
+        self.assertEqual(self.scenario._wait_for_stacks_status.return_value,
+                         stacks)
+        self.assertEqual(2, self.clients("heat").stacks.create.call_count)
+        args, kwargs = self.clients("heat").stacks.create.call_args
+        self.assertEqual(self.default_template, kwargs["template"])
+        self.scenario._wait_for_stacks_status.assert_called_once_with(
+            ["id-1", "id-2"],
+            ready_statuses=["CREATE_COMPLETE"],
+            failure_statuses=["CREATE_FAILED", "ERROR"],
+            check_interval=CONF.openstack.heat_stack_create_poll_interval,
+            timeout=CONF.openstack.heat_stack_create_timeout)
+        self._test_atomic_action_timer(self.scenario.atomic_actions(),
+                                       "heat.create_stacks")
+
+    def test__wait_for_stacks_status(self):
+        progress = mock.Mock(id="id-1", stack_status="CREATE_IN_PROGRESS")
+        stack_1 = mock.Mock(id="id-1", stack_status="CREATE_COMPLETE")
+        stack_2 = mock.Mock(id="id-2", stack_status="CREATE_COMPLETE")
+        self.clients("heat").stacks.list.side_effect = [
+            [progress, stack_2], [stack_1, stack_2]]
+
+        stacks = self.scenario._wait_for_stacks_status(
+            ["id-1", "id-2"], ready_statuses=["CREATE_COMPLETE"],
+            failure_statuses=["CREATE_FAILED"])
+
+        self.assertEqual([stack_1, stack_2], stacks)
+        self.assertEqual(2, self.clients("heat").stacks.list.call_count)
+
+    def test__wait_for_stacks_status_failed(self):
+        self.clients("heat").stacks.list.return_value = [
+            mock.Mock(id="id-1", stack_status="CREATE_FAILED")]
+
+        self.assertRaises(exceptions.GetResourceErrorStatus,
+                          self.scenario._wait_for_stacks_status,
+                          ["id-1"], ready_statuses=["CREATE_COMPLETE"],
+                          failure_statuses=["CREATE_FAILED"])
+
+    def test__wait_for_stacks_status_not_found(self):
+        self.clients("heat").stacks.list.return_value = []
+
+        self.assertRaises(exceptions.GetResourceNotFound,
+                          self.scenario._wait_for_stacks_status,
+                          ["id-1"], ready_statuses=["CREATE_COMPLETE"],
+                          failure_statuses=["CREATE_FAILED"])
+
+    @mock.patch("%s.time" % HEAT_UTILS)
+    def test__wait_for_stacks_status_timeout(self, mock_time):
+        mock_time.time.side_effect = [0, 1, 100]
+        self.clients("heat").stacks.list.return_value = [
+            mock.Mock(id="id-1", stack_status="CREATE_IN_PROGRESS")]
+
+        self.assertRaises(exceptions.TimeoutException,
+                          self.scenario._wait_for_stacks_status,
+                          ["id-1"], ready_statuses=["CREATE_COMPLETE"],
+                          failure_statuses=["CREATE_FAILED"], timeout=10)
+        self.assertEqual(2, self.clients("heat").stacks.list.call_count)
+
     def test_update_stack(self):
         self.clients("heat").stacks.update.return_value = None
         scenario = utils.HeatScenario(self.context)
@@ -49,3 +49,20 @@ class MonascaScenarioTestCase(test.ScenarioTestCase):
         self.name = name
         self.scenario._create_metrics(name=self.name, kwargs=self.kwargs)
         self.assertEqual(1, self.clients("monasca").metrics.create.call_count)
+
+    def test_make_metrics(self):
+        batches = list(self.scenario._make_metrics(5, batch_size=2,
+                                                   **self.kwargs))
+
+        self.assertEqual([2, 2, 1], [len(b) for b in batches])
+        for metric in sum(batches, []):
+            self.assertEqual(self.kwargs["dimensions"], metric["dimensions"])
+            self.assertIn("name", metric)
+            self.assertIn("timestamp", metric)
+
+    def test_create_metrics_batch(self):
+        self.scenario._create_metrics_batch(["metric1", "metric2"])
+        self.clients("monasca").metrics.create.assert_called_once_with(
+            jsonbody=["metric1", "metric2"])
+        self._test_atomic_action_timer(self.scenario.atomic_actions(),
+                                       "monasca.create_metrics_batch")
@@ -75,6 +75,14 @@ class NeutronScenarioTestCase(test.ScenarioTestCase):
         self._test_atomic_action_timer(self.scenario.atomic_actions(),
                                        "neutron.create_network")
 
+    @mock.patch("%s.network_wrapper.invalidate_capabilities" % NEUTRON_UTILS)
+    def test_create_external_network(self, mock_invalidate_capabilities):
+        self.scenario._create_network({"router:external": True})
+
+        mock_invalidate_capabilities.assert_called_once_with(
+            (self.scenario.clients.credential.auth_url,
+             self.scenario.clients.credential.region_name))
+
     def test_list_networks(self):
         networks_list = []
         networks_dict = {"networks": networks_list}
@@ -143,6 +151,16 @@ class NeutronScenarioTestCase(test.ScenarioTestCase):
         self._test_atomic_action_timer(self.scenario.atomic_actions(),
                                        "neutron.update_network")
 
+    @mock.patch("%s.network_wrapper.invalidate_capabilities" % NEUTRON_UTILS)
+    def test_update_network_external(self, mock_invalidate_capabilities):
+        network = {"network": {"name": "network-name", "id": "network-id"}}
+
+        self.scenario._update_network(network, {"router:external": False})
+
+        mock_invalidate_capabilities.assert_called_once_with(
+            (self.scenario.clients.credential.auth_url,
+             self.scenario.clients.credential.region_name))
+
     def test_delete_network(self):
         network_create_args = {}
         network = self.scenario._create_network(network_create_args)
@@ -150,6 +168,20 @@ class NeutronScenarioTestCase(test.ScenarioTestCase):
         self._test_atomic_action_timer(self.scenario.atomic_actions(),
                                        "neutron.delete_network")
 
+    @ddt.data({"network": {"id": "id", "router:external": True},
+               "invalidated": True},
+              {"network": {"id": "id"}, "invalidated": True},
+              {"network": {"id": "id", "router:external": False},
+               "invalidated": False})
+    @ddt.unpack
+    @mock.patch("%s.network_wrapper.invalidate_capabilities" % NEUTRON_UTILS)
+    def test_delete_network_invalidates_capabilities(
+            self, mock_invalidate_capabilities, network, invalidated):
+        self.scenario._delete_network(network)
+
+        self.clients("neutron").delete_network.assert_called_once_with("id")
+        self.assertEqual(invalidated, mock_invalidate_capabilities.called)
+
     @mock.patch("%s.network_wrapper" % NEUTRON_UTILS)
     def test_create_subnet(self, mock_network_wrapper):
         network_id = "fake-id"
@@ -437,16 +437,19 @@ class NovaScenarioTestCase(test.ScenarioTestCase):
     def test__boot_servers(self, image_id="image", flavor_id="flavor",
                            requests=1, instances_amount=1,
                            auto_assign_nic=False, **kwargs):
-        servers = [mock.Mock() for i in range(instances_amount)]
+        servers = [mock.Mock(status="ACTIVE")
+                   for i in range(instances_amount)]
         self.clients("nova").servers.list.return_value = servers
         scenario = utils.NovaScenario(context=self.context)
         scenario.generate_random_name = mock.Mock()
         scenario._pick_random_nic = mock.Mock()
 
-        scenario._boot_servers(image_id, flavor_id, requests,
-                               instances_amount=instances_amount,
-                               auto_assign_nic=auto_assign_nic,
-                               **kwargs)
+        result = scenario._boot_servers(image_id, flavor_id, requests,
+                                        instances_amount=instances_amount,
+                                        auto_assign_nic=auto_assign_nic,
+                                        **kwargs)
+
+        self.assertEqual(servers, result)
 
         expected_kwargs = dict(kwargs)
         if auto_assign_nic and "nics" not in kwargs:
@@ -461,21 +464,87 @@ class NovaScenarioTestCase(test.ScenarioTestCase):
             for i in range(requests)]
         self.clients("nova").servers.create.assert_has_calls(create_calls)
 
-        wait_for_status_calls = [
-            mock.call(
-                servers[i],
-                ready_statuses=["ACTIVE"],
-                update_resource=self.mock_get_from_manager.mock.return_value,
-                check_interval=CONF.openstack.nova_server_boot_poll_interval,
-                timeout=CONF.openstack.nova_server_boot_timeout)
-            for i in range(instances_amount)]
-        self.mock_wait_for_status.mock.assert_has_calls(wait_for_status_calls)
-
-        self.mock_get_from_manager.mock.assert_has_calls(
-            [mock.call() for i in range(instances_amount)])
+        # all servers are checked by a single list call
+        self.clients("nova").servers.list.assert_called_with(
+            search_opts={"name": scenario.generate_random_name.return_value})
+        self.assertEqual(2, self.clients("nova").servers.list.call_count)
+        self.assertFalse(self.mock_wait_for_status.mock.called)
         self._test_atomic_action_timer(scenario.atomic_actions(),
                                        "nova.boot_servers")
 
+    @mock.patch("%s.time" % NOVA_UTILS)
+    def test__wait_for_servers_status(self, mock_time):
+        mock_time.time.return_value = 0
+        servers = [mock.Mock(id="s1", status="BUILD"),
+                   mock.Mock(id="s2", status="BUILD")]
+        self.clients("nova").servers.list.side_effect = [
+            [mock.Mock(id="s1", status="ACTIVE"),
+             mock.Mock(id="s2", status="BUILD")],
+            [mock.Mock(id="s2", status="ACTIVE"),
+             mock.Mock(id="s1", status="ACTIVE")]]
+        scenario = utils.NovaScenario(context=self.context)
+
+        result = scenario._wait_for_servers_status(
+            servers, ready_statuses=["active"], search_opts={"name": "foo"},
+            check_interval=3)
+
+        self.assertEqual(["s1", "s2"], [s.id for s in result])
+        self.assertEqual(["ACTIVE"] * 2, [s.status for s in result])
+        self.clients("nova").servers.list.assert_has_calls(
+            [mock.call(search_opts={"name": "foo"})] * 2)
+        mock_time.sleep.assert_called_once_with(3)
+
+    def test__wait_for_servers_status_error(self):
+        servers = [mock.Mock(id="s1", status="BUILD")]
+        self.clients("nova").servers.list.return_value = [
+            mock.Mock(id="s1", status="ERROR")]
+        scenario = utils.NovaScenario(context=self.context)
+
+        self.assertRaises(rally_exceptions.GetResourceErrorStatus,
+                          scenario._wait_for_servers_status, servers,
+                          ready_statuses=["ACTIVE"])
+
+    def test__wait_for_servers_status_not_found(self):
+        servers = [mock.Mock(id="s1", status="BUILD")]
+        self.clients("nova").servers.list.return_value = []
+        scenario = utils.NovaScenario(context=self.context)
+
+        self.assertRaises(rally_exceptions.GetResourceNotFound,
+                          scenario._wait_for_servers_status, servers,
+                          ready_statuses=["ACTIVE"])
+
+    @mock.patch("%s.time" % NOVA_UTILS)
+    def test__wait_for_servers_status_timeout(self, mock_time):
+        mock_time.time.side_effect = [0, 5, 11]
+        servers = [mock.Mock(id="s1", status="BUILD")]
+        self.clients("nova").servers.list.return_value = servers
+        scenario = utils.NovaScenario(context=self.context)
+
+        self.assertRaises(rally_exceptions.TimeoutException,
+                          scenario._wait_for_servers_status, servers,
+                          ready_statuses=["ACTIVE"], timeout=10)
+        self.assertEqual(2, self.clients("nova").servers.list.call_count)
+
+    @mock.patch("%s.time" % NOVA_UTILS)
+    def test__wait_for_servers_status_fallback(self, mock_time):
+        mock_time.time.return_value = 0
+        servers = [mock.Mock(id="s1"), mock.Mock(id="s2")]
+        self.clients("nova").servers.list.side_effect = Exception("Oops")
+        scenario = utils.NovaScenario(context=self.context)
+
+        result = scenario._wait_for_servers_status(
+            servers, ready_statuses=["ACTIVE"], timeout=10,
+            check_interval=3)
+
+        self.assertEqual([self.mock_wait_for_status.mock.return_value] * 2,
+                         result)
+        self.mock_wait_for_status.mock.assert_has_calls([
+            mock.call(
+                server, ready_statuses=["ACTIVE"],
+                update_resource=self.mock_get_from_manager.mock.return_value,
+                timeout=10, check_interval=3)
+            for server in servers], any_order=True)
+
     def test__show_server(self):
         nova_scenario = utils.NovaScenario(context=self.context)
         nova_scenario._show_server(self.server)
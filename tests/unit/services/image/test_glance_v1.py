@@ -70,7 +70,7 @@ class GlanceV1ServiceTestCase(test.TestCase):
 
         if location.startswith("/"):
             call_args["data"] = mock_open.return_value
-            mock_open.assert_called_once_with(location)
+            mock_open.assert_called_once_with(location, "rb")
             mock_open.return_value.close.assert_called_once_with()
         else:
             call_args["copy_from"] = location
@@ -115,6 +115,11 @@ class GlanceV1ServiceTestCase(test.TestCase):
         self.gc.images.update.assert_called_once_with(
             image_id, is_public=is_public)
 
+    def test_add_member(self):
+        self.service.add_member(image_id="image_id", member_id="project_id")
+        self.gc.image_members.create.assert_called_once_with("image_id",
+                                                             "project_id")
+
 
 @ddt.ddt
 class UnifiedGlanceV1ServiceTestCase(test.TestCase):
@@ -199,3 +204,14 @@ class UnifiedGlanceV1ServiceTestCase(test.TestCase):
                           self.service.set_visibility,
                           image_id=image_id,
                           visibility=visibility)
+
+    def test_add_member(self):
+        self.service.add_member(image_id="image_id", member_id="project_id")
+        self.service._impl.add_member.assert_called_once_with(
+            image_id="image_id", member_id="project_id")
+
+    def test_accept_member(self):
+        self.assertIsNone(self.service.accept_member(image_id="image_id",
+                                                     member_id="project_id"))
+        # Glance V1 does not require members to accept images
+        self.assertEqual([], self.service._impl.method_calls)
@@ -51,7 +51,7 @@ class GlanceV2ServiceTestCase(test.TestCase):
         self.service.upload_data(image_id, image_location=location)
 
         if location.startswith("/"):
-            mock_open.assert_called_once_with(location)
+            mock_open.assert_called_once_with(location, "rb")
             mock_open.return_value.close.assert_called_once_with()
             self.gc.images.upload.assert_called_once_with(
                 image_id, mock_open.return_value)
@@ -143,6 +143,18 @@ class GlanceV2ServiceTestCase(test.TestCase):
             image_id,
             visibility=visibility)
 
+    def test_add_member(self):
+        self.service.add_member(image_id="image_id", member_id="project_id")
+        self.gc.image_members.create.assert_called_once_with("image_id",
+                                                             "project_id")
+
+    def test_update_member(self):
+        self.service.update_member(image_id="image_id",
+                                   member_id="project_id",
+                                   member_status="accepted")
+        self.gc.image_members.update.assert_called_once_with(
+            "image_id", "project_id", "accepted")
+
     def test_deactivate_image(self):
         image_id = "image_id"
         self.service.deactivate_image(image_id)
@@ -227,3 +239,15 @@ class UnifiedGlanceV2ServiceTestCase(test.TestCase):
         self.service.set_visibility(image_id=image_id, visibility=visibility)
         self.service._impl.set_visibility.assert_called_once_with(
             image_id=image_id, visibility=visibility)
+
+    def test_add_member(self):
+        self.service.add_member(image_id="image_id", member_id="project_id")
+        self.service._impl.add_member.assert_called_once_with(
+            image_id="image_id", member_id="project_id")
+
+    def test_accept_member(self):
+        self.service.accept_member(image_id="image_id",
+                                   member_id="project_id")
+        self.service._impl.update_member.assert_called_once_with(
+            image_id="image_id", member_id="project_id",
+            member_status="accepted")
@@ -101,6 +101,18 @@ class ImageTestCase(test.TestCase):
         service.delete_image(image_id=image_id)
         service._impl.delete_image.assert_called_once_with(image_id)
 
+    def test_add_member(self):
+        service = self.get_service_with_fake_impl()
+        service.add_member(image_id="image_id", member_id="project_id")
+        service._impl.add_member.assert_called_once_with(
+            "image_id", member_id="project_id")
+
+    def test_accept_member(self):
+        service = self.get_service_with_fake_impl()
+        service.accept_member(image_id="image_id", member_id="project_id")
+        service._impl.accept_member.assert_called_once_with(
+            "image_id", member_id="project_id")
+
     def test_download_image(self):
         image_id = "image_id"
         service = self.get_service_with_fake_impl()
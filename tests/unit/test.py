@@ -23,6 +23,7 @@ from oslotest import base
 from rally.common import cfg
 from rally.common import db
 from rally import plugins
+from rally_openstack import osclients
 from tests.unit import fakes
 
 
@@ -46,6 +47,9 @@ class TestCase(base.BaseTestCase):
     def setUp(self):
         super(TestCase, self).setUp()
         self.addCleanup(mock.patch.stopall)
+        # keystone tokens are cached process-wide
+        osclients._auth_cache.clear()
+        self.addCleanup(osclients._auth_cache.clear)
 
     def _test_atomic_action_timer(self, atomic_actions, name, count=1,
                                   parent=[]):
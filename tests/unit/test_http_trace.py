@@ -0,0 +1,139 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import ddt
+import mock
+from rally.task.processing import charts
+
+from rally_openstack import http_trace
+from tests.unit import test
+
+
+@ddt.ddt
+class HttpTraceTestCase(test.TestCase):
+
+    def setUp(self):
+        super(HttpTraceTestCase, self).setUp()
+        self.addCleanup(http_trace.stop)
+
+    @ddt.data(
+        ("http://nova:8774/v2.1/servers/detail?all_tenants=1",
+         "/v2.1/servers/detail"),
+        ("http://nova/v2.1/0f1e6a8b2c3d4e5f6a7b8c9d0e1f2a3b/servers/"
+         "6bf3b6c6-8b2a-4b3e-9a8e-1f0e7d3c2b1a/action",
+         "/v2.1/{id}/servers/{id}/action"),
+        ("/flavors/42", "/flavors/{id}"),
+        ("http://keystone:5000", "/"))
+    @ddt.unpack
+    def test_get_url_template(self, url, expected):
+        self.assertEqual(expected, http_trace.get_url_template(url))
+
+    def test_install(self):
+        session = mock.Mock()
+        request = session.request
+        request.return_value.url = "http://glance/v2/images/1"
+        request.return_value.status_code = 204
+        request.return_value.headers = {}
+        http_trace.install(session)
+
+        # nothing is recorded until recording is started
+        session.request("/images/1", "delete")
+        self.assertEqual([], http_trace.pop())
+
+        http_trace.start()
+        self.assertEqual(request.return_value,
+                         session.request(
+                             "/images/1", "delete",
+                             endpoint_filter={"service_type": "image"}))
+        request.assert_called_with(
+            "/images/1", "delete", endpoint_filter={"service_type": "image"})
+
+        records = http_trace.pop()
+        self.assertEqual(
+            [{"method": "DELETE", "service_type": "image",
+              "url": "/v2/images/{id}", "status": 204, "bytes": None,
+              "started_at": mock.ANY, "finished_at": mock.ANY}],
+            records)
+        self.assertEqual([], http_trace.pop())
+
+    def test_install_request_fails(self):
+        session = mock.Mock()
+        not_found = type("NotFound", (Exception, ), {"http_status": 404,
+                                                     "response": None})
+        session.request.side_effect = [not_found(), ValueError()]
+        http_trace.install(session)
+        http_trace.start()
+
+        self.assertRaises(not_found, session.request,
+                          "http://cinder/volumes/1", "get")
+        self.assertRaises(ValueError, session.request,
+                          "http://cinder/volumes/1", "get")
+
+        records = http_trace.stop()
+        self.assertEqual([404, None], [r["status"] for r in records])
+        self.assertEqual(["cinder"] * 2,
+                         [r["service_type"] for r in records])
+
+    def test_add_to_atomic_actions(self):
+        atomic_actions = [
+            {"name": "a", "started_at": 1, "finished_at": 4,
+             "children": [{"name": "b", "started_at": 2, "finished_at": 3,
+                           "children": []}]},
+            {"name": "c", "started_at": 5, "children": []}]
+        records = [
+            {"method": "GET", "service_type": "compute", "url": "/servers",
+             "status": 200, "started_at": 2.5, "finished_at": 2.6},
+            {"method": "POST", "service_type": "compute", "url": "/servers",
+             "status": 500, "started_at": 1.5, "finished_at": 1.6},
+            {"method": "GET", "service_type": "image", "url": "/images",
+             "status": 200, "started_at": 0.5, "finished_at": 0.6},
+            {"method": "GET", "service_type": "volume", "url": "/volumes",
+             "status": None, "started_at": 6, "finished_at": 7}]
+
+        http_trace.add_to_atomic_actions(atomic_actions, records)
+
+        self.assertEqual(
+            [{"name": "GET image /images", "started_at": 0.5,
+              "finished_at": 0.6, "children": []},
+             {"name": "a", "started_at": 1, "finished_at": 4,
+              "children": [
+                  {"name": "POST compute /servers", "started_at": 1.5,
+                   "finished_at": 1.6, "children": [], "failed": True},
+                  {"name": "b", "started_at": 2, "finished_at": 3,
+                   "children": [
+                       {"name": "GET compute /servers", "started_at": 2.5,
+                        "finished_at": 2.6, "children": []}]}]},
+             {"name": "c", "started_at": 5,
+              "children": [
+                  {"name": "GET volume /volumes", "started_at": 6,
+                   "finished_at": 7, "children": [], "failed": True}]}],
+            atomic_actions)
+
+    def test_get_output(self):
+        records = [
+            {"method": "GET", "service_type": "compute", "url": "/servers",
+             "status": 200, "bytes": 42, "started_at": 1, "finished_at": 1.5},
+            {"method": "GET", "service_type": "compute", "url": "/servers",
+             "status": None, "bytes": None, "started_at": 2,
+             "finished_at": 2.25}]
+
+        additive, complete = http_trace.get_output(records)
+
+        self.assertIsNone(charts.validate_output("additive", additive))
+        self.assertIsNone(charts.validate_output("complete", complete))
+        self.assertEqual([["GET compute /servers", 0.5],
+                          ["GET compute /servers", 0.25]], additive["data"])
+        self.assertEqual([["GET", "compute", "/servers", 200, 0.5, 42],
+                          ["GET", "compute", "/servers", "n/a", 0.25, "n/a"]],
+                         complete["data"]["rows"])
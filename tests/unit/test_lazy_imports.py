@@ -0,0 +1,55 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import os
+import subprocess
+import sys
+
+import rally_openstack
+from tests.unit import test
+
+
+# NOTE: plugins are discovered by importing all modules of the package, the
+#   same way rally does it for the path from rally_plugins entry point.
+DISCOVERY = """
+import pkgutil
+import sys
+
+import rally_openstack
+
+for loader, name, _is_pkg in pkgutil.walk_packages(
+        rally_openstack.__path__, prefix="rally_openstack."):
+    __import__(name)
+
+lazy_modules = %r
+print(",".join(sorted(
+    name for name in sys.modules
+    if name.split(".")[0] in lazy_modules and sys.modules[name])))
+"""
+
+
+class LazyImportsTestCase(test.TestCase):
+
+    # NOTE: these libraries are used only by a few plugins and take a
+    #   noticeable time to import, so discovery of plugins should not import
+    #   them.
+    LAZY_MODULES = ("kubernetes", "neutronclient", "osprofiler")
+
+    def test_plugin_discovery_does_not_import_lazy_modules(self):
+        root = os.path.dirname(os.path.dirname(rally_openstack.__file__))
+        output = subprocess.check_output(
+            [sys.executable, "-c", DISCOVERY % (self.LAZY_MODULES,)],
+            cwd=root)
+
+        self.assertEqual("", output.decode("utf-8").strip())
@@ -13,6 +13,8 @@
 #    License for the specific language governing permissions and limitations
 #    under the License.
 
+import datetime as dt
+
 import ddt
 import mock
 
@@ -154,6 +156,50 @@ class CachedTestCase(test.TestCase):
         clients.clear()
         self.assertEqual({}, clients.cache)
 
+    def test_cached_handles(self):
+        clients = osclients.Clients({"auth_url": "url", "username": "user",
+                                     "password": "pass"})
+
+        @osclients.configure(self.id())
+        class SomeClient(osclients.OSClient):
+            create_client = mock.MagicMock()
+
+        with mock.patch.object(osclients.OSClient, "get",
+                               return_value=SomeClient) as mock_get:
+            handle = getattr(clients, self.id())
+            self.assertIs(handle, getattr(clients, self.id()))
+            self.assertEqual(handle.create_client.return_value, handle())
+            mock_get.assert_called_once_with(self.id())
+
+            # handles are bound to the cache, so they are dropped with it
+            clients.clear()
+            self.assertIsNot(handle, getattr(clients, self.id()))
+            self.assertEqual(2, mock_get.call_count)
+
+        self.assertRaises(AttributeError, getattr, clients, "_foo")
+
+    def test_cached_handles_fast_path(self):
+        clients = osclients.Clients({"auth_url": "url", "username": "user",
+                                     "password": "pass"})
+
+        @osclients.configure(self.id())
+        class SomeClient(osclients.OSClient):
+            create_client = mock.MagicMock()
+
+        with mock.patch.object(osclients.OSClient, "get",
+                               return_value=SomeClient) as mock_get:
+            client = getattr(clients, self.id())()
+            # the handle is an attribute, so __getattr__ is not called again
+            self.assertIn(self.id(), vars(clients))
+            handle = getattr(clients, self.id())
+            for i in range(3):
+                self.assertIs(handle, getattr(clients, self.id()))
+                self.assertIs(client, getattr(clients, self.id())())
+
+        mock_get.assert_called_once_with(self.id())
+        SomeClient.create_client.assert_called_once_with()
+        self.assertEqual(self.id(), handle._cache_key)
+
 
 @ddt.ddt
 class TestCreateKeystoneClient(test.TestCase, OSClientTestCaseUtils):
@@ -256,6 +302,39 @@ class TestCreateKeystoneClient(test.TestCase, OSClientTestCaseUtils):
              mock.call(auth=self.ksa_identity_plugin, timeout=180.0,
                        verify=True, cert=None)])
 
+    def test_keystone_get_session_with_shared_pool(self):
+        cfg.CONF.set_override("share_http_connection_pool", True,
+                              "openstack")
+        self.addCleanup(cfg.CONF.clear_override,
+                        "share_http_connection_pool", "openstack")
+        credential = oscredential.OpenStackCredential(
+            "http://auth_url/v3", "user", "pass", "tenant",
+            api_info={"keystone": {"version": "3"}})
+        self.set_up_keystone_mocks()
+        keystone = osclients.Keystone(credential, {}, {})
+
+        with mock.patch("%s._get_http_session" % PATH) as mock_get:
+            keystone.get_session()
+            mock_get.assert_called_once_with()
+        self.ksa_session.Session.assert_called_once_with(
+            auth=self.ksa_identity_plugin, timeout=180.0, verify=True,
+            cert=None, session=mock_get.return_value)
+
+    @mock.patch("%s.http_trace.install" % PATH)
+    def test_keystone_get_session_with_http_tracing(self, mock_install):
+        cfg.CONF.set_override("trace_http_requests", True, "openstack")
+        self.addCleanup(cfg.CONF.clear_override, "trace_http_requests",
+                        "openstack")
+        credential = oscredential.OpenStackCredential(
+            "http://auth_url/v3", "user", "pass", "tenant",
+            api_info={"keystone": {"version": "3"}})
+        self.set_up_keystone_mocks()
+        keystone = osclients.Keystone(credential, {}, {})
+
+        keystone.get_session()
+        mock_install.assert_called_once_with(
+            self.ksa_session.Session.return_value)
+
     def test_keystone_property(self):
         keystone = osclients.Keystone(self.credential, None, None)
         self.assertRaises(exceptions.RallyException, lambda: keystone.keystone)
@@ -277,6 +356,93 @@ class TestCreateKeystoneClient(test.TestCase, OSClientTestCaseUtils):
         keystone.auth_ref
         mock_keystone_get_session.assert_called_once_with()
 
+    @mock.patch("%s.Keystone.get_session" % PATH)
+    def test_auth_ref_shared(self, mock_keystone_get_session):
+        cfg.CONF.set_override("share_keystone_auth", True, "openstack")
+        self.addCleanup(cfg.CONF.clear_override, "share_keystone_auth",
+                        "openstack")
+        session = mock.MagicMock()
+        auth_plugin = mock.MagicMock()
+        mock_keystone_get_session.return_value = (session, auth_plugin)
+
+        auth_ref = osclients.Keystone(self.credential, None, {}).auth_ref
+        self.assertEqual(auth_plugin.get_access.return_value, auth_ref)
+
+        auth_plugin.reset_mock()
+        # another cache, but the same credential
+        keystone = osclients.Keystone(self.credential, None, {})
+        self.assertEqual(auth_ref, keystone.auth_ref)
+        self.assertFalse(auth_plugin.get_access.called)
+        self.assertEqual(auth_ref, auth_plugin.auth_ref)
+
+        cfg.CONF.set_override("share_keystone_auth", False, "openstack")
+        keystone = osclients.Keystone(self.credential, None, {})
+        keystone.auth_ref
+        auth_plugin.get_access.assert_called_once_with(session)
+
+    @mock.patch("%s.Keystone.get_session" % PATH)
+    def test_auth_ref_expires(self, mock_keystone_get_session):
+        session = mock.MagicMock()
+        auth_plugin = mock.MagicMock()
+        mock_keystone_get_session.return_value = (session, auth_plugin)
+        old_auth_ref = mock.Mock(expires=dt.datetime.utcnow())
+        old_auth_ref.will_expire_soon.return_value = True
+        new_auth_ref = mock.Mock(expires=dt.datetime.utcnow())
+        new_auth_ref.will_expire_soon.return_value = False
+        auth_plugin.auth_ref = old_auth_ref
+        auth_plugin.get_access.return_value = new_auth_ref
+        cache = {"keystone_auth_ref": old_auth_ref}
+        keystone = osclients.Keystone(self.credential, None, cache)
+
+        self.assertEqual(new_auth_ref, keystone.auth_ref)
+        old_auth_ref.will_expire_soon.assert_called_with(300)
+        auth_plugin.invalidate.assert_called_once_with()
+        auth_plugin.get_access.assert_called_once_with(session)
+
+        # new token is fresh enough
+        self.assertEqual(new_auth_ref, keystone.auth_ref)
+        auth_plugin.get_access.assert_called_once_with(session)
+
+    def test_auth_cache_invalidate(self):
+        auth_cache = osclients._AuthCache()
+        old_auth_ref = mock.Mock()
+        lock = auth_cache.lock("key")
+        auth_cache.set("key", old_auth_ref)
+
+        # another client has already stored a new token
+        auth_cache.invalidate("key", mock.Mock())
+        self.assertEqual(old_auth_ref, auth_cache._auth_refs["key"])
+        self.assertEqual(lock, auth_cache.lock("key"))
+
+        auth_cache.invalidate("key", old_auth_ref)
+        self.assertEqual({}, auth_cache._auth_refs)
+        # somebody may still hold or wait for the lock
+        self.assertEqual(lock, auth_cache.lock("key"))
+
+    def test__get_auth_cache_key(self):
+        keystone = osclients.Keystone(self.credential, {}, {})
+        key = keystone._get_auth_cache_key()
+        self.assertNotIn("pass", key)
+
+        credential = oscredential.OpenStackCredential(
+            "http://auth_url/v2.0", "user", "another pass", "tenant")
+        self.assertNotEqual(
+            key, osclients.Keystone(credential, {}, {})._get_auth_cache_key())
+
+    def test__evict_on_invalidate(self):
+        keystone = osclients.Keystone(self.credential, {}, {})
+        key = keystone._get_auth_cache_key()
+        auth_plugin = mock.Mock()
+        invalidate = auth_plugin.invalidate
+        osclients._auth_cache.set(key, auth_plugin.auth_ref)
+
+        keystone._evict_on_invalidate(auth_plugin)
+        # e.g. a request has failed with 401
+        self.assertEqual(invalidate.return_value, auth_plugin.invalidate())
+
+        invalidate.assert_called_once_with()
+        self.assertIsNone(osclients._auth_cache.get(key))
+
     @mock.patch("%s.LOG.exception" % PATH)
     @mock.patch("%s.logging.is_debug" % PATH)
     def test_auth_ref_fails(self, mock_is_debug, mock_log_exception):
@@ -396,6 +562,51 @@ class TestCreateKeystoneClient(test.TestCase, OSClientTestCaseUtils):
             e.format_message())
 
 
+@ddt.ddt
+class GetHTTPSessionTestCase(test.TestCase):
+
+    def setUp(self):
+        super(GetHTTPSessionTestCase, self).setUp()
+        patcher = mock.patch.dict("%s._http_adapters" % PATH, clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    @ddt.data(True, False)
+    def test__get_http_adapter(self, keepalive):
+        from keystoneauth1 import session
+
+        cfg.CONF.set_override("http_tcp_keepalive", keepalive, "openstack")
+        self.addCleanup(cfg.CONF.clear_override, "http_tcp_keepalive",
+                        "openstack")
+
+        adapter = osclients._get_http_adapter("https://example.com/v3")
+        self.assertEqual(keepalive,
+                         isinstance(adapter, session.TCPKeepAliveAdapter))
+        self.assertEqual(100, adapter._pool_maxsize)
+
+        self.assertIs(adapter,
+                      osclients._get_http_adapter("https://example.com/v2"))
+        self.assertIsNot(adapter,
+                         osclients._get_http_adapter("http://example.com"))
+        self.assertIsNot(adapter,
+                         osclients._get_http_adapter("https://example.org"))
+
+    def test__get_http_session(self):
+        import requests
+
+        http_session = osclients._get_http_session()
+        another_session = osclients._get_http_session()
+        self.assertIsInstance(http_session, requests.Session)
+        self.assertIsNot(http_session, another_session)
+        self.assertIsNot(http_session.cookies, another_session.cookies)
+
+        adapter = http_session.get_adapter("https://example.com:8774/v2.1")
+        self.assertIs(adapter,
+                      another_session.get_adapter("https://example.com:8774"))
+        self.assertIsNot(adapter,
+                         http_session.get_adapter("https://example.com:9292"))
+
+
 @ddt.ddt
 class OSClientsTestCase(test.TestCase):
 
@@ -0,0 +1,184 @@
+# All Rights Reserved.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License"); you may
+#    not use this file except in compliance with the License. You may obtain
+#    a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#    WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#    License for the specific language governing permissions and limitations
+#    under the License.
+
+import fixtures
+import mock
+from rally.common import cfg
+from rally import exceptions
+from rally.task.processing import charts
+
+from rally_openstack import polling
+from tests.unit import test
+
+
+POLLING = "rally_openstack.polling"
+
+
+class FakeClock(object):
+    def __init__(self):
+        self.now = 0.0
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class FakeResource(object):
+    def __init__(self, statuses):
+        self.statuses = list(statuses)
+        self.status = self.statuses.pop(0)
+
+    def update(self, resource):
+        if not self.statuses:
+            raise exceptions.GetResourceNotFound(resource=resource)
+        self.status = self.statuses.pop(0)
+        return self
+
+
+class PollingTestCase(test.TestCase):
+
+    def setUp(self):
+        super(PollingTestCase, self).setUp()
+        cfg.CONF.set_override("adaptive_polling", True, "openstack")
+        self.addCleanup(cfg.CONF.clear_override, "adaptive_polling",
+                        "openstack")
+        self.addCleanup(polling.stop)
+        self.addCleanup(polling.reset_history)
+        self.clock = FakeClock()
+        self.useFixture(fixtures.MockPatch("%s.time" % POLLING,
+                                           new=self.clock))
+        self.useFixture(fixtures.MockPatch("%s.random.uniform" % POLLING,
+                                           return_value=1))
+
+    @mock.patch("%s.utils.wait_for_status" % POLLING)
+    def test_wait_for_status_without_adaptive_polling(
+            self, mock_wait_for_status):
+        cfg.CONF.set_override("adaptive_polling", False, "openstack")
+
+        self.assertEqual(
+            mock_wait_for_status.return_value,
+            polling.wait_for_status("resource", ready_statuses=["ACTIVE"],
+                                    check_interval=3))
+        mock_wait_for_status.assert_called_once_with(
+            "resource", ready_statuses=["ACTIVE"], check_interval=3)
+
+    def test_wait_for_status(self):
+        resource = FakeResource(["BUILD", "BUILD", "BUILD", "active"])
+        polling.start()
+
+        self.assertEqual(resource, polling.wait_for_status(
+            resource, ready_statuses=["ACTIVE"],
+            update_resource=resource.update, check_interval=1))
+
+        # backoff 0.2, 0.4 between polls
+        self.assertAlmostEqual(0.6, self.clock.now)
+        self.assertEqual(
+            [{"resource": "FakeResource", "started_at": 0.0,
+              "finished_at": self.clock.now, "polls": 3, "wasted": 0.4}],
+            [dict(r, wasted=round(r["wasted"], 3)) for r in polling.pop()])
+        # the resource became ready between the last two polls
+        self.assertEqual(
+            [0.4], [round(d, 3) for d in polling._history[
+                ("FakeResource", ("ACTIVE",), False)]])
+
+    def test_wait_for_status_deleted(self):
+        resource = FakeResource(["DELETING"])
+
+        self.assertIsNone(polling.wait_for_status(
+            resource, ready_statuses=["DELETED"],
+            update_resource=resource.update, check_deletion=True))
+        # nothing is recorded until recording is started
+        self.assertEqual([], polling.pop())
+
+    def test_wait_for_status_failed(self):
+        resource = FakeResource(["BUILD", "BUILD", "ERROR"])
+
+        self.assertRaises(exceptions.GetResourceErrorStatus,
+                          polling.wait_for_status, resource,
+                          ready_statuses=["ACTIVE"],
+                          failure_statuses=["ERROR"],
+                          update_resource=resource.update)
+
+    def test_wait_for_status_failed_by_default(self):
+        resource = FakeResource(["BUILD", "ERROR"] + ["BUILD"] * 100)
+
+        self.assertRaises(exceptions.GetResourceErrorStatus,
+                          polling.wait_for_status, resource,
+                          ready_statuses=["ACTIVE"],
+                          update_resource=resource.update,
+                          timeout=60, check_interval=1)
+        self.assertLess(self.clock.now, 60)
+
+    def test_wait_for_status_timeout(self):
+        resource = FakeResource(["BUILD"] * 100)
+
+        self.assertRaises(exceptions.TimeoutException,
+                          polling.wait_for_status, resource,
+                          ready_statuses=["ACTIVE"],
+                          update_resource=resource.update,
+                          timeout=5, check_interval=1)
+        self.assertLessEqual(self.clock.now, 6)
+
+    def test_wait_for_status_wrong_arguments(self):
+        self.assertRaises(ValueError, polling.wait_for_status, "resource",
+                          ready_statuses="ACTIVE", update_resource=mock.Mock())
+        self.assertRaises(ValueError, polling.wait_for_status, "resource",
+                          ready_statuses=["ACTIVE"],
+                          failure_statuses=["active"],
+                          update_resource=mock.Mock())
+        self.assertRaises(ValueError, polling.wait_for_status, "resource",
+                          ready_statuses=["ACTIVE"])
+
+    def test_poller_backoff(self):
+        poller = polling.Poller("key", check_interval=1)
+
+        self.assertEqual([0.2, 0.4, 0.8, 1, 1],
+                         [poller.get_delay(0) for i in range(5)])
+
+    def test_poller_learns_durations(self):
+        poller = polling.Poller("key", check_interval=5)
+        for duration in range(20, 41):
+            poller.add_duration(duration)
+
+        poller = polling.Poller("key", check_interval=5)
+        self.assertEqual((22, 38), poller.window)
+        # sleep until resources of the kind usually become ready
+        self.assertEqual(20, poller.get_delay(2))
+        # poll more often than the check interval within the window
+        self.assertEqual(1.6, poller.get_delay(25))
+        # backoff after the window
+        self.assertEqual([0.2, 0.4], [poller.get_delay(40),
+                                      poller.get_delay(41)])
+
+    def test_get_output(self):
+        atomic_actions = [
+            {"name": "nova.boot_server", "started_at": 1, "finished_at": 10,
+             "children": [{"name": "nova.wait", "started_at": 2,
+                           "finished_at": 9, "children": []}]}]
+        records = [
+            {"resource": "Server", "started_at": 2.5, "finished_at": 8,
+             "polls": 3, "wasted": 0.5},
+            {"resource": "Volume", "started_at": 11, "finished_at": 12,
+             "polls": 1, "wasted": 0}]
+
+        additive, complete = polling.get_output(atomic_actions, records)
+
+        self.assertIsNone(charts.validate_output("additive", additive))
+        self.assertIsNone(charts.validate_output("complete", complete))
+        self.assertEqual([["nova.wait", 0.5], ["n/a", 0]], additive["data"])
+        self.assertEqual([["nova.wait", "Server", 3, 0.5, 5.5],
+                          ["n/a", "Volume", 1, 0, 1]],
+                         complete["data"]["rows"])
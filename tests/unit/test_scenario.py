@@ -15,12 +15,18 @@
 import ddt
 import fixtures
 import mock
+from rally.common import cfg
+from rally.task import atomic
 
 from rally_openstack.credential import OpenStackCredential
+from rally_openstack import http_trace
+from rally_openstack import polling
 from rally_openstack import scenario as base_scenario
 from tests.unit import test
 
 
+SCN = "rally_openstack.scenario"
+
 CREDENTIAL_WITHOUT_HMAC = OpenStackCredential(
     "auth_url",
     "username",
@@ -103,8 +109,8 @@ class OpenStackScenarioTestCase(test.TestCase):
               ([("admin", CREDENTIAL_WITHOUT_HMAC),
                 ("user", CREDENTIAL_WITHOUT_HMAC)], 0))
     @ddt.unpack
-    @mock.patch("rally_openstack.scenario.profiler.init")
-    @mock.patch("rally_openstack.scenario.profiler.get")
+    @mock.patch("osprofiler.profiler.init")
+    @mock.patch("osprofiler.profiler.get")
     def test_profiler_init(self, users_credentials,
                            expected_call_count,
                            mock_profiler_get,
@@ -164,3 +170,162 @@ class OpenStackScenarioTestCase(test.TestCase):
         self.assertEqual(self.context["tenants"][tenant_id],
                          self.context["tenant"])
         self.assertEqual(expected_tenant_id, tenant_id)
+
+    def _set_users(self, users_per_tenant=(2, 2)):
+        self.context["users"] = []
+        self.context["tenants"] = {}
+        for tid, users_num in zip(("foo", "bar"), users_per_tenant):
+            users = [{"id": "%s-%s" % (tid, i), "tenant_id": tid}
+                     for i in range(users_num)]
+            self.context["users"] += users
+            self.context["tenants"][tid] = {"name": tid, "users": users}
+
+    def test__choose_user_round_robin_precomputed(self):
+        self._set_users()
+        self.context["user_choice_method"] = "round_robin"
+        # the order of tenants is taken from the users context
+        self.context["tenant_ids"] = ["foo", "bar"]
+        self.context["iteration"] = 1
+
+        scenario = base_scenario.OpenStackScenario()
+        scenario._choose_user(self.context)
+        self.assertEqual("foo-0", self.context["user"]["id"])
+        self.assertEqual(self.context["tenants"]["foo"],
+                         self.context["tenant"])
+
+    @mock.patch("%s.random.choice" % SCN,
+                side_effect=lambda seq: seq[-1])
+    def test__choose_user_random_tenant(self, mock_choice):
+        self._set_users(users_per_tenant=(1, 5))
+        self.context["user_choice_method"] = "random_tenant"
+
+        scenario = base_scenario.OpenStackScenario()
+        scenario._choose_user(self.context)
+        self.assertEqual("foo-0", self.context["user"]["id"])
+        self.assertEqual(self.context["tenants"]["foo"],
+                         self.context["tenant"])
+        self.assertEqual(
+            [mock.call(["bar", "foo"]),
+             mock.call(self.context["tenants"]["foo"]["users"])],
+            mock_choice.call_args_list)
+
+    def test__choose_user_least_recently_used(self):
+        self.addCleanup(base_scenario.forget_user_choices, "task_uuid")
+        self._set_users()
+        self.context["user_choice_method"] = "least_recently_used"
+        self.context["task"] = {"uuid": "task_uuid"}
+
+        chosen = []
+        for i in range(8):
+            context = dict(self.context)
+            base_scenario.OpenStackScenario()._choose_user(context)
+            chosen.append(context["user"]["id"])
+            self.assertEqual(
+                context["tenants"][context["user"]["tenant_id"]],
+                context["tenant"])
+
+        # all users are used before any user is used again
+        self.assertEqual(4, len(set(chosen[:4])))
+        self.assertEqual(chosen[:4], chosen[4:])
+
+        base_scenario.forget_user_choices("task_uuid")
+        self.assertNotIn("task_uuid", base_scenario._lru_users)
+
+    def _get_scenario_cls(self):
+        class Scenario(base_scenario.OpenStackScenario):
+            def run(self, action):
+                with atomic.ActionTimer(self, "nova.boot_server"):
+                    return action()
+        return Scenario
+
+    def _get_traced_session(self, side_effect=None):
+        cfg.CONF.set_override("trace_http_requests", True, "openstack")
+        self.addCleanup(cfg.CONF.clear_override, "trace_http_requests",
+                        "openstack")
+        self.addCleanup(http_trace.stop)
+        session = mock.Mock()
+        session.request.return_value.url = "http://nova/servers/42"
+        session.request.return_value.status_code = 200
+        session.request.return_value.headers = {"Content-Length": "10"}
+        session.request.side_effect = side_effect
+        return http_trace.install(session)
+
+    def test_run_with_http_requests(self):
+        session = self._get_traced_session()
+
+        def action():
+            for i in range(2):
+                session.request("/servers/42", "get",
+                                endpoint_filter={"service_type": "compute"})
+            return "result"
+
+        scenario = self._get_scenario_cls()(self.context)
+        self.assertFalse(http_trace.is_started())
+        self.assertEqual("result", scenario.run(action))
+
+        # requests made after the iteration are not recorded
+        self.assertFalse(http_trace.is_started())
+        session.request("/servers/42", "delete")
+        self.assertEqual([], http_trace.pop())
+
+        actions = scenario.atomic_actions()
+        self.assertEqual(["nova.boot_server"], [a["name"] for a in actions])
+        self.assertEqual(["GET compute /servers/{id}"] * 2,
+                         [a["name"] for a in actions[0]["children"]])
+        self.assertEqual(1, len(scenario._output["additive"]))
+        self.assertEqual(2, len(scenario._output["additive"][0]["data"]))
+        self.assertEqual(
+            [["GET", "compute", "/servers/{id}", 200, mock.ANY, 10]] * 2,
+            scenario._output["complete"][0]["data"]["rows"])
+
+    def test_run_with_http_requests_fails(self):
+        session = self._get_traced_session(side_effect=ValueError)
+
+        scenario = self._get_scenario_cls()(self.context)
+        self.assertRaises(ValueError, scenario.run,
+                          lambda: session.request("/servers", "get"))
+
+        self.assertFalse(http_trace.is_started())
+        self.assertEqual(
+            [["GET", "-", "/servers", "n/a", mock.ANY, "n/a"]],
+            scenario._output["complete"][0]["data"]["rows"])
+
+    def test_run_nested_with_http_requests(self):
+        session = self._get_traced_session()
+        scenario_cls = self._get_scenario_cls()
+        inner = scenario_cls(self.context)
+        outer = scenario_cls(self.context)
+
+        outer.run(lambda: inner.run(
+            lambda: session.request("/servers", "get")))
+
+        # the request is recorded once by the outer scenario
+        self.assertEqual({"additive": [], "complete": []}, inner._output)
+        self.assertEqual(1, len(outer._output["complete"][0]["data"]["rows"]))
+
+    def test_run_without_http_tracing(self):
+        scenario = self._get_scenario_cls()(self.context)
+
+        self.assertNotIn("run", scenario.__dict__)
+        self.assertIsNone(scenario.run(lambda: None))
+        self.assertEqual({"additive": [], "complete": []}, scenario._output)
+
+    def test_run_with_polls(self):
+        cfg.CONF.set_override("adaptive_polling", True, "openstack")
+        self.addCleanup(cfg.CONF.clear_override, "adaptive_polling",
+                        "openstack")
+        self.addCleanup(polling.stop)
+        self.addCleanup(polling.reset_history)
+        resource = mock.Mock(status="ACTIVE")
+
+        scenario = self._get_scenario_cls()(self.context)
+        scenario.run(lambda: polling.wait_for_status(
+            resource, ready_statuses=["ACTIVE"], update_resource=lambda r: r))
+
+        self.assertFalse(polling.is_started())
+        self.assertEqual(["nova.boot_server"],
+                         [a["name"] for a in scenario.atomic_actions()])
+        self.assertEqual([["nova.boot_server", 0]],
+                         scenario._output["additive"][0]["data"])
+        self.assertEqual([["nova.boot_server", "Mock", 1, 0, mock.ANY]],
+                         scenario._output["complete"][0]["data"]["rows"])
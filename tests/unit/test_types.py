@@ -110,6 +110,144 @@ class OpenStackResourceTypeTestCase(test.TestCase):
         self.assertIn("with name 'Fake' is ambiguous, possible matches",
                       e.format_message())
 
+    def test__list_resources(self):
+
+        @types.configure(name=self.id())
+        class FooType(types.OpenStackResourceType):
+            def pre_process(self, resource_spec, config):
+                pass
+
+        self.addCleanup(types.invalidate_resolution_cache)
+        credential = mock.Mock()
+        context = {"admin": {"credential": credential},
+                   "task": {"uuid": "task_uuid"}}
+        loader = mock.Mock(return_value=[fakes.FakeResource(name="foo")])
+
+        index, cached = FooType(context)._list_resources("foo.bar", loader)
+        self.assertFalse(cached)
+        self.assertEqual(loader.return_value, index.resources)
+        self.assertEqual((index, True),
+                         FooType(context)._list_resources("foo.bar", loader))
+        self.assertEqual(1, loader.call_count)
+
+        # other filters, tasks and projects have their own resources
+        FooType(context)._list_resources("foo.bar", loader,
+                                         list_kwargs={"a": 1})
+        FooType({"admin": {"credential": credential},
+                 "task": {"uuid": "another_task"}})._list_resources(
+            "foo.bar", loader)
+        FooType({"admin": {"credential": mock.Mock()},
+                 "task": {"uuid": "task_uuid"}})._list_resources(
+            "foo.bar", loader)
+        self.assertEqual(4, loader.call_count)
+
+        # projects with the same name in different domains are different
+        for domain in ("foo", "bar"):
+            credential = mock.Mock(auth_url="http://example.com",
+                                   region_name="RegionOne",
+                                   tenant_name="project",
+                                   project_domain_name=domain)
+            FooType({"admin": {"credential": credential},
+                     "task": {"uuid": "task_uuid"}})._list_resources(
+                "foo.bar", loader)
+        self.assertEqual(6, loader.call_count)
+
+        # nothing is cached without credentials
+        FooType({})._list_resources("foo.bar", loader)
+        FooType({})._list_resources("foo.bar", loader)
+        self.assertEqual(8, loader.call_count)
+
+    def test__resolve_refreshes_cached_resources(self):
+
+        @types.configure(name=self.id())
+        class FooType(types.OpenStackResourceType):
+            def pre_process(self, resource_spec, config):
+                pass
+
+        self.addCleanup(types.invalidate_resolution_cache)
+        ftype = FooType({"admin": {"credential": mock.Mock()}})
+        loader = mock.Mock(side_effect=[
+            [fakes.FakeResource(name="foo")],
+            [fakes.FakeResource(name="foo"), fakes.FakeResource(name="bar")]])
+
+        def finder(index):
+            return ftype._find_resource({"name": "bar", "accurate": True},
+                                        index)
+
+        self.assertRaises(exceptions.InvalidScenarioArgument,
+                          ftype._resolve, "foo.bar", loader, finder)
+        self.assertEqual(1, loader.call_count)
+
+        # the resource is created after the resources were cached
+        self.assertEqual("bar",
+                         ftype._resolve("foo.bar", loader, finder).name)
+        self.assertEqual(2, loader.call_count)
+
+    def test__resolve_refreshes_deleted_resources(self):
+
+        @types.configure(name=self.id())
+        class FooType(types.OpenStackResourceType):
+            def pre_process(self, resource_spec, config):
+                pass
+
+        self.addCleanup(types.invalidate_resolution_cache)
+        ftype = FooType({"admin": {"credential": mock.Mock()}})
+        deleted = fakes.FakeResource(name="foo", id="1")
+        recreated = fakes.FakeResource(name="foo", id="2")
+        loader = mock.Mock(side_effect=[[deleted], [recreated]])
+        checker = mock.Mock(side_effect=[True, Exception("Not found")])
+
+        def finder(index):
+            return ftype._find_resource({"name": "foo", "accurate": True},
+                                        index)
+
+        self.assertEqual(deleted, ftype._resolve("foo.bar", loader, finder,
+                                                 checker=checker))
+        self.assertFalse(checker.called)
+        self.assertEqual(deleted, ftype._resolve("foo.bar", loader, finder,
+                                                 checker=checker))
+        checker.assert_called_once_with(deleted)
+
+        # the resource is deleted and created again with the same name
+        self.assertEqual(recreated, ftype._resolve("foo.bar", loader, finder,
+                                                   checker=checker))
+        self.assertEqual(2, loader.call_count)
+        checker.assert_called_with(deleted)
+
+
+class ResourceIndexTestCase(test.TestCase):
+
+    def test_lookups(self):
+        resources = [fakes.FakeResource(name="foo", id="1"),
+                     fakes.FakeResource(name="foo", id="2"),
+                     fakes.FakeResource(name="bar", id="3")]
+        index = types.ResourceIndex(resources)
+
+        self.assertEqual(3, len(index))
+        self.assertEqual(resources, list(index))
+        self.assertEqual(resources[:2], index.get_by_name("foo"))
+        self.assertEqual([], index.get_by_name("baz"))
+        self.assertEqual(resources[2:], index.get_by_id("3"))
+        self.assertEqual(resources[2:], index.search("ar$"))
+
+        self.assertEqual(resources[:2], index.get_candidates({"name": "foo"}))
+        self.assertEqual(resources[:2], index.get_candidates({"name": "f"}))
+        self.assertEqual(resources[2:], index.get_candidates({"regex": "a"}))
+        self.assertEqual(resources[:1], index.get_candidates({"id": "1"}))
+        self.assertEqual([], index.get_candidates({}))
+
+    @mock.patch("rally_openstack.types.re.compile")
+    def test_search_compiles_pattern_once(self, mock_compile):
+        index = types.ResourceIndex([fakes.FakeResource(name="foo")])
+        self.assertEqual(index.search("fo"), index.search("fo"))
+        mock_compile.assert_called_once_with("fo")
+
+    def test_dict_resources(self):
+        index = types.ResourceIndex([{"name": "foo", "id": "1"}])
+        self.assertEqual([{"name": "foo", "id": "1"}],
+                         index.get_by_name("foo"))
+        self.assertEqual([{"name": "foo", "id": "1"}], index.get_by_id("1"))
+
 
 class FlavorTestCase(test.TestCase):
 
@@ -170,6 +308,41 @@ class FlavorTestCase(test.TestCase):
                           self.type_cls.pre_process,
                           resource_spec=resource_spec, config={})
 
+    def test_preprocess_lists_flavors_once(self):
+        self.addCleanup(types.invalidate_resolution_cache)
+        context = {"admin": {"credential": mock.Mock()}}
+        novaclient = mock.Mock()
+        novaclient.flavors.list.return_value = list(
+            self.clients.nova().flavors.list())
+        for name, flavor_id in (("m1.nano", "42"), ("m1.tiny", "1")):
+            type_cls = types.Flavor(context=context)
+            type_cls._clients = mock.Mock()
+            type_cls._clients.nova.return_value = novaclient
+            self.assertEqual(flavor_id, type_cls.pre_process(
+                resource_spec={"name": name}, config={}))
+        novaclient.flavors.list.assert_called_once_with()
+        novaclient.flavors.get.assert_called_once_with("1")
+
+    def test_preprocess_relists_recreated_flavor(self):
+        self.addCleanup(types.invalidate_resolution_cache)
+        context = {"admin": {"credential": mock.Mock()}}
+        novaclient = mock.Mock()
+        novaclient.flavors.list.side_effect = [
+            [fakes.FakeResource(name="m1.rally", id="1")],
+            [fakes.FakeResource(name="m1.rally", id="2")]]
+        novaclient.flavors.get.side_effect = Exception("Not found")
+
+        flavor_ids = []
+        for i in range(2):
+            type_cls = types.Flavor(context=context)
+            type_cls._clients = mock.Mock()
+            type_cls._clients.nova.return_value = novaclient
+            flavor_ids.append(type_cls.pre_process(
+                resource_spec={"name": "m1.rally"}, config={}))
+
+        self.assertEqual(["1", "2"], flavor_ids)
+        novaclient.flavors.get.assert_called_once_with("1")
+
 
 class EC2FlavorTestCase(test.TestCase):
 
@@ -109,6 +109,33 @@ class RequiredOpenStackValidatorTestCase(test.TestCase):
                          e.message)
 
 
+class CheckPerTenantTestCase(test.TestCase):
+
+    def test__check_per_tenant(self):
+        users = [{"id": "u1", "tenant_id": "t1"},
+                 {"id": "u2", "tenant_id": "t1"},
+                 {"id": "u3", "tenant_id": "t2"}]
+
+        self.assertEqual(
+            [(users[0], "u1"), (users[2], "u3")],
+            validators._check_per_tenant(users, lambda u: u["id"]))
+        self.assertEqual(
+            [(users[2], "u3")],
+            validators._check_per_tenant(users, lambda u: u["id"],
+                                         skip_first=True))
+
+    def test__check_per_tenant_fails(self):
+        users = [{"id": "u1", "tenant_id": "t1"},
+                 {"id": "u2", "tenant_id": "t2"}]
+
+        def check(user):
+            raise KeyError(user["id"])
+
+        e = self.assertRaises(KeyError, validators._check_per_tenant,
+                              users, check)
+        self.assertEqual(("u1", ), e.args)
+
+
 @ddt.ddt
 class ImageExistsValidatorTestCase(test.TestCase):
 
@@ -185,6 +212,53 @@ class ImageExistsValidatorTestCase(test.TestCase):
 
             self.assertEqual("Image 'fake_image' not found", e.message)
 
+    @mock.patch("%s.openstack_types.GlanceImage" % PATH)
+    def test_validator_checks_every_tenant(self, mock_glance_image):
+        mock_glance_image.return_value.pre_process.return_value = "image_id"
+        config = {"args": {"image": {"name": "foo"}}}
+        users = [{"credential": mock.MagicMock(), "tenant_id": "t1"},
+                 {"credential": mock.MagicMock(), "tenant_id": "t1"},
+                 {"credential": mock.MagicMock(), "tenant_id": "t2"}]
+        self.context["users"] = users
+        for user in users:
+            user["credential"].clients.return_value.glance.return_value\
+                .images.get.return_value = {"visibility": "private"}
+
+        self.validator.validate(self.context, config, None, None)
+
+        self.assertEqual(
+            [mock.call(context={"admin": {"credential": users[0][
+                "credential"]}}),
+             mock.call(context={"admin": {"credential": users[2][
+                 "credential"]}})],
+            mock_glance_image.call_args_list)
+        self.assertFalse(users[1]["credential"].clients.called)
+
+    @mock.patch("%s.openstack_types.GlanceImage" % PATH)
+    def test_validator_public_image(self, mock_glance_image):
+        mock_glance_image.return_value.pre_process.return_value = "image_id"
+        config = {"args": {"image": {"name": "foo"}}}
+        users = [{"credential": mock.MagicMock(), "tenant_id": "t1"},
+                 {"credential": mock.MagicMock(), "tenant_id": "t2"}]
+        self.context["users"] = users
+        users[0]["credential"].clients.return_value.glance.return_value\
+            .images.get.return_value = {"visibility": "public"}
+
+        self.validator.validate(self.context, config, None, None)
+
+        mock_glance_image.assert_called_once_with(
+            context={"admin": {"credential": users[0]["credential"]}})
+        self.assertFalse(users[1]["credential"].clients.called)
+
+    @mock.patch("%s.openstack_types.GlanceImage" % PATH)
+    def test_validator_without_users(self, mock_glance_image):
+        config = {"args": {"image": {"name": "foo"}}}
+        self.context["users"] = []
+
+        self.assertIsNone(
+            self.validator.validate(self.context, config, None, None))
+        self.assertFalse(mock_glance_image.called)
+
 
 @ddt.ddt
 class ExternalNetworkExistsValidatorTestCase(test.TestCase):
@@ -17,6 +17,7 @@ import ddt
 import mock
 
 from neutronclient.common import exceptions as neutron_exceptions
+from rally.common import cfg
 from rally.common import utils
 
 from rally_openstack import consts
@@ -37,6 +38,7 @@ class NeutronWrapperTestCase(test.TestCase):
         self.owner = Owner()
         self.owner.generate_random_name = mock.Mock()
         super(NeutronWrapperTestCase, self).setUp()
+        self.addCleanup(network.invalidate_capabilities)
 
     def get_wrapper(self, *skip_cidrs, **kwargs):
         return network.NeutronWrapper(mock.Mock(), self.owner, config=kwargs)
@@ -61,11 +63,89 @@ class NeutronWrapperTestCase(test.TestCase):
 
     def test_external_networks(self):
         wrap = self.get_wrapper()
-        wrap.client.list_networks.return_value = {"networks": "foo_networks"}
-        self.assertEqual("foo_networks", wrap.external_networks)
+        wrap.client.list_networks.return_value = {"networks": ["foo_net"]}
+        self.assertEqual(["foo_net"], wrap.external_networks)
         wrap.client.list_networks.assert_called_once_with(
             **{"router:external": True})
 
+    @mock.patch("rally_openstack.wrappers.network.time.time")
+    def test_capabilities_cache(self, mock_time):
+        mock_time.return_value = 0
+        clients = mock.Mock()
+        clients.credential.auth_url = "http://example.com"
+        clients.credential.region_name = "RegionOne"
+        neutron = clients.neutron.return_value
+        neutron.list_extensions.return_value = {
+            "extensions": [{"alias": "ext-gw-mode"}]}
+        neutron.list_networks.return_value = {"networks": [{"id": "ext"}]}
+
+        wrap = network.NeutronWrapper(clients, self.owner)
+        self.assertTrue(wrap.ext_gw_mode_enabled)
+        self.assertEqual([{"id": "ext"}], wrap.external_networks)
+
+        # another wrapper for the same cloud uses the cache
+        wrap = network.NeutronWrapper(clients, self.owner)
+        self.assertTrue(wrap.supports_extension("ext-gw-mode")[0])
+        self.assertEqual([{"id": "ext"}], wrap.external_networks)
+        self.assertEqual(1, neutron.list_extensions.call_count)
+        self.assertEqual(1, neutron.list_networks.call_count)
+
+        # the cache is expired
+        mock_time.return_value = (
+            network.CONF.openstack.neutron_capabilities_cache_ttl + 1)
+        self.assertTrue(wrap.ext_gw_mode_enabled)
+        self.assertEqual(2, neutron.list_extensions.call_count)
+
+        network.invalidate_capabilities(wrap.cloud)
+        self.assertTrue(wrap.ext_gw_mode_enabled)
+        self.assertEqual(3, neutron.list_extensions.call_count)
+
+    def test_capabilities_cache_per_project(self):
+        clients = {}
+        for project in ("foo", "bar"):
+            clients[project] = mock.Mock()
+            clients[project].credential.auth_url = "http://example.com"
+            clients[project].credential.region_name = "RegionOne"
+            clients[project].credential.tenant_name = project
+            neutron = clients[project].neutron.return_value
+            neutron.list_extensions.return_value = {"extensions": []}
+            neutron.list_networks.return_value = {
+                "networks": [{"id": "%s-ext" % project}]}
+
+        for project in ("foo", "bar", "foo"):
+            wrap = network.NeutronWrapper(clients[project], self.owner)
+            self.assertEqual([{"id": "%s-ext" % project}],
+                             wrap.external_networks)
+            self.assertFalse(wrap.supports_extension("ext-gw-mode")[0])
+
+        foo_neutron = clients["foo"].neutron.return_value
+        bar_neutron = clients["bar"].neutron.return_value
+        self.assertEqual(1, foo_neutron.list_networks.call_count)
+        self.assertEqual(1, bar_neutron.list_networks.call_count)
+        # extensions are the same for all projects of the cloud
+        self.assertEqual(1, foo_neutron.list_extensions.call_count
+                         + bar_neutron.list_extensions.call_count)
+
+        network.invalidate_capabilities(wrap.cloud)
+        self.assertEqual({}, network._capabilities)
+
+    def test_capabilities_cache_disabled(self):
+        cfg.CONF.set_override("neutron_capabilities_cache_ttl", 0,
+                              "openstack")
+        self.addCleanup(cfg.CONF.clear_override,
+                        "neutron_capabilities_cache_ttl", "openstack")
+        clients = mock.Mock()
+        clients.credential.auth_url = "http://example.com"
+        clients.credential.region_name = None
+        clients.neutron.return_value.list_extensions.return_value = {}
+        wrap = network.NeutronWrapper(clients, self.owner)
+
+        wrap.supports_extension("foo")
+        wrap.supports_extension("foo")
+
+        self.assertEqual(
+            2, clients.neutron.return_value.list_extensions.call_count)
+
     def test_get_network(self):
         wrap = self.get_wrapper()
         neutron_net = {"id": "foo_id",
@@ -177,6 +257,64 @@ class NeutronWrapperTestCase(test.TestCase):
                          "cidr": "cidr-%d" % i}})
              for i in range(subnets_num)])
 
+    def test_create_networks(self):
+        service = self.get_wrapper()
+        service._generate_cidr = mock.Mock(return_value="foo_cidr")
+        service.create_router = mock.Mock(
+            side_effect=[{"id": "router-1"}, {"id": "router-2"}])
+        service.client.create_network.return_value = {
+            "networks": [{"id": "net-%d" % i, "name": "name-%d" % i,
+                          "status": "ACTIVE"} for i in (1, 2)]}
+        service.client.create_subnet.return_value = {
+            "subnets": [{"id": "subnet-%d-%d" % (n, i),
+                         "network_id": "net-%d" % n}
+                        for n in (1, 2) for i in (1, 2)]}
+
+        nets = service.create_networks(
+            "foo_tenant", 2, subnets_num=2, add_router=True,
+            network_create_args={"fakearg": "fake"})
+
+        name = self.owner.generate_random_name.return_value
+        service.client.create_network.assert_called_once_with(
+            {"networks": [{"tenant_id": "foo_tenant", "name": name,
+                           "fakearg": "fake"}] * 2})
+        service.client.create_subnet.assert_called_once_with(
+            {"subnets": [{"name": name,
+                          "enable_dhcp": True,
+                          "network_id": "net-%d" % n,
+                          "tenant_id": "foo_tenant",
+                          "ip_version": service.SUBNET_IP_VERSION,
+                          "dns_nameservers": ["8.8.8.8", "8.8.4.4"],
+                          "cidr": "foo_cidr"}
+                         for n in (1, 2) for i in (1, 2)]})
+        self.assertEqual(
+            [{"id": "net-%d" % n, "name": "name-%d" % n, "status": "ACTIVE",
+              "external": False, "tenant_id": "foo_tenant",
+              "router_id": "router-%d" % n,
+              "subnets": ["subnet-%d-1" % n, "subnet-%d-2" % n]}
+             for n in (1, 2)],
+            nets)
+        self.assertEqual(
+            [mock.call("router-%d" % n, {"subnet_id": "subnet-%d-%d" % (n, i)})
+             for n in (1, 2) for i in (1, 2)],
+            service.client.add_interface_router.call_args_list)
+
+    def test_create_networks_fails(self):
+        service = self.get_wrapper()
+        service.delete_network = mock.Mock()
+        service.client.create_network.return_value = {
+            "networks": [{"id": "net-1", "name": "name-1",
+                          "status": "ACTIVE"}]}
+        service.client.create_subnet.side_effect = ValueError("Oops")
+
+        self.assertRaises(ValueError, service.create_networks,
+                          "foo_tenant", 1, subnets_num=1)
+
+        service.delete_network.assert_called_once_with(
+            {"id": "net-1", "name": "name-1", "status": "ACTIVE",
+             "external": False, "tenant_id": "foo_tenant",
+             "router_id": None, "subnets": []})
+
     def test_create_network_with_router(self):
         service = self.get_wrapper()
         service.create_router = mock.Mock(return_value={"id": "foo_router"})
@@ -469,6 +607,7 @@ class NeutronWrapperTestCase(test.TestCase):
             {"extensions": [{"alias": "extension"}]})
         self.assertFalse(wrap.supports_extension("dummy-group")[0])
 
+        network.invalidate_capabilities(wrap.cloud)
         wrap.client.list_extensions.return_value = {}
         self.assertFalse(wrap.supports_extension("extension")[0])
 